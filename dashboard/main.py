@@ -14,12 +14,21 @@ from datetime import datetime, timedelta
 import time
 import os
 
+try:
+    # Binary traffic store (src/ingest), importable when the repository root is on
+    # sys.path (python -m streamlit run dashboard/main.py)
+    from src.ingest.store import read_traffic
+except ImportError:
+    def read_traffic(path):
+        return pd.read_csv(path, parse_dates=["timestamp"])
+
 from utils.data_handler import (
     fetch_current_metrics,
     fetch_predictions,
     fetch_scaling_recommendation,
     fetch_simulation_results,
     fetch_cost_report,
+    fetch_traffic_window,
     fetch_forecast,
     setup_auto_refresh
 )
@@ -216,7 +225,9 @@ st.divider()
 st.markdown("## 💰 Cost Analysis & Savings Report")
 st.markdown("**ĐIỂM CỘNG**: So sánh chi phí Static Deployment vs AutoScaling với giả định unit cost.")
 
-col_hours, col_btn = st.columns([2, 1])
+col_start, col_hours, col_btn = st.columns([1, 2, 1])
+with col_start:
+    sim_start = st.date_input("Simulation Start", value=None, help="Ngày bắt đầu mô phỏng (mặc định: đầu dữ liệu)")
 with col_hours:
     sim_hours = st.slider("Simulation Duration (hours)", 1, 168, 24, help="Chọn số giờ để mô phỏng chi phí")
 with col_btn:
@@ -224,7 +235,16 @@ with col_btn:
 
 if run_cost_report:
     with st.spinner("🧮 Calculating costs using real NASA traffic data..."):
-        cost_report = fetch_cost_report(API_URL, sim_hours)
+        cost_report = fetch_cost_report(API_URL, sim_hours, sim_start.isoformat() if sim_start else None)
+        if cost_report:
+            # same window, aggregated server-side from prefix sums
+            window_start = pd.Timestamp(cost_report['start']).tz_localize(None)
+            window = fetch_traffic_window(
+                API_URL,
+                start=window_start.isoformat(),
+                end=(window_start + pd.Timedelta(hours=sim_hours)).isoformat(),
+                metrics="request_count"
+            )
     
     if cost_report:
         # Cost comparison cards
@@ -271,6 +291,8 @@ if run_cost_report:
             """, unsafe_allow_html=True)
         
         # Conclusion box
+        load = window['metrics']['request_count'] if window else None
+        avg_load_note = f" | 📈 Avg load: {load['mean']:,.0f} req/15min" if load and load['mean'] is not None else ""
         st.markdown(f"""
             <div style='background: linear-gradient(90deg, #1a1a2e 0%, #16213e 100%);
                         padding: 20px; border-radius: 10px; border-left: 4px solid #f39c12; margin-top: 20px;'>
@@ -278,7 +300,7 @@ if run_cost_report:
                 <p style='color: #ddd; margin: 0;'>{cost_report['conclusion']}</p>
                 <p style='color: #888; margin-top: 10px; font-size: 12px;'>
                     📊 Data points analyzed: {cost_report['data_points_used']} | 
-                    🔄 Scaling events: {cost_report['scaling_events']}
+                    🔄 Scaling events: {cost_report['scaling_events']}{avg_load_note}
                 </p>
             </div>
         """, unsafe_allow_html=True)
@@ -298,10 +320,11 @@ if st.button("🧪 Run Cost Simulation with REAL DATA", use_container_width=True
         st.error(f"❌ Data file not found at {DATA_FILE_PATH}. Please run 'python src/data_pipeline.py' first.")
     else:
         with st.spinner("Loading data and calculating costs... This may take a moment."):
-            # Load real data
-            df_sim = pd.read_csv(DATA_FILE_PATH)
+            # Load real data (memory-mapped store next to the CSV)
+            df_sim = read_traffic(DATA_FILE_PATH)
             # Sample first 2000 rows (~33 hours) for speed in demo
-            df_sample = df_sim.head(2000)
+            df_sample = df_sim.head(2000).copy()
+            df_sample['timestamp'] = df_sample['timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S')
             traffic_payload = df_sample.to_dict(orient="records")
             
             sim_results = fetch_simulation_results(API_URL, traffic_payload)
@@ -416,12 +416,12 @@ def fetch_simulation_results(api_url: str, traffic_data: list) -> dict | None:
 # =============================================================================
 # API FUNCTION: GET /cost-report (NEW - FOR BONUS POINTS)
 # =============================================================================
-def fetch_cost_report(api_url: str, simulation_hours: int = 24) -> dict | None:
+def fetch_cost_report(api_url: str, simulation_hours: int = 24, start: str | None = None) -> dict | None:
     """
     Fetches cost comparison report between Static and AutoScaling.
     
     API ENDPOINT:
-        GET {api_url}/cost-report?simulation_hours=24
+        GET {api_url}/cost-report?simulation_hours=24&start=1995-07-10T00:00
     
     WHAT IT RETURNS:
         {
@@ -441,15 +441,19 @@ def fetch_cost_report(api_url: str, simulation_hours: int = 24) -> dict | None:
     ARGUMENTS:
         api_url (str): Base URL of the backend API
         simulation_hours (int): Number of hours to simulate (default 24)
+        start (str): Start of the simulated period (default: start of the data)
     
     RETURNS:
         dict: Cost report if successful
         None: If request fails
     """
+    params = {"simulation_hours": simulation_hours}
+    if start is not None:
+        params["start"] = start
     try:
         response = requests.get(
             f"{api_url}/cost-report",
-            params={"simulation_hours": simulation_hours},
+            params=params,
             timeout=30
         )
         
@@ -472,6 +476,66 @@ def fetch_cost_report(api_url: str, simulation_hours: int = 24) -> dict | None:
         return None
 
 
+# =============================================================================
+# API FUNCTION: GET /traffic/window
+# =============================================================================
+def fetch_traffic_window(api_url: str, start: str | None = None, end: str | None = None,
+                         resolution: str = "15m", metrics: str | None = None) -> dict | None:
+    """
+    Fetches sum / count / mean of the traffic metrics over any time window.
+    
+    API ENDPOINT:
+        GET {api_url}/traffic/window?start=1995-07-10&end=1995-07-11&resolution=15m
+    
+    WHAT IT RETURNS:
+        {
+            "resolution": "15m",
+            "start": "1995-07-10 00:00:00-04:00",
+            "end": "1995-07-10 23:45:00-04:00",
+            "bins": 96,
+            "metrics": {
+                "request_count": {"sum": 53101.0, "count": 96, "mean": 553.1},
+                ...
+            }
+        }
+    
+    ARGUMENTS:
+        api_url (str): Base URL of the backend API
+        start (str): Window start, inclusive (default: start of the data)
+        end (str): Window end, exclusive (default: end of the data)
+        resolution (str): Traffic table (1m, 5m, 15m, ...)
+        metrics (str): Comma-separated metric names (default: all)
+    
+    RETURNS:
+        dict: Window statistics if successful
+        None: If request fails
+    """
+    params = {"resolution": resolution}
+    for key, value in (("start", start), ("end", end), ("metrics", metrics)):
+        if value is not None:
+            params[key] = value
+    try:
+        response = requests.get(f"{api_url}/traffic/window", params=params, timeout=REQUEST_TIMEOUT)
+        
+        if response.status_code == 200:
+            return response.json()
+        else:
+            st.error(f"❌ Traffic Window API Error: {response.status_code}")
+            return None
+            
+    except requests.exceptions.ConnectionError:
+        st.error("🔌 Cannot connect to Backend for traffic window.")
+        return None
+        
+    except requests.exceptions.Timeout:
+        st.error("⏱️ Traffic window request timed out.")
+        return None
+        
+    except requests.exceptions.RequestException as e:
+        st.error(f"❌ Traffic window network error: {e}")
+        return None
+
+
 # =============================================================================
 # API FUNCTION: GET /forecast (NEW - COMPETITION REQUIRED)
 # =============================================================================
@@ -6,6 +6,9 @@ import os
 import random
 import json
 
+# Binary traffic store (src/ingest)
+from src.ingest.store import open_traffic
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -69,6 +72,14 @@ class XGBoostPredictor:
             'day_cos': np.cos(2 * np.pi * ts.dayofweek / 7),
         }
     
+    @staticmethod
+    def _hourly_mean(hour, values):
+        """{hour: mean of the non-NaN values in that hour of the day}"""
+        ok = np.isfinite(values)
+        sums = np.bincount(hour[ok], weights=values[ok], minlength=24)
+        counts = np.bincount(hour[ok], minlength=24)
+        return {h: sums[h] / counts[h] for h in range(24) if counts[h]}
+    
     def _statistical_forecast(self, base_time, steps):
         """
         Statistical fallback when XGBoost is not available.
@@ -78,13 +89,13 @@ class XGBoostPredictor:
         data_path = "processed_data/nasa_traffic_15m.csv"
         
         try:
-            df = pd.read_csv(data_path, parse_dates=['timestamp'])
-            df['hour'] = pd.to_datetime(df['timestamp']).dt.hour
-            df['day_of_week'] = pd.to_datetime(df['timestamp']).dt.dayofweek
+            # Memory-mapped once per process; every later call reuses the same pages
+            series = open_traffic(data_path)
+            hour = (series.epoch + (series.tz_offset or 0) * 60) // 3600 % 24
             
-            # Calculate hourly averages
-            hourly_avg = df.groupby('hour')['request_count'].mean().to_dict()
-            bytes_avg = df.groupby('hour')['total_bytes'].mean().to_dict()
+            # Calculate hourly averages (NaN outage bins skipped, like groupby().mean())
+            hourly_avg = self._hourly_mean(hour, series.column('request_count'))
+            bytes_avg = self._hourly_mean(hour, series.column('total_bytes'))
             
         except Exception as e:
             logger.warning(f"Could not load historical data: {e}")
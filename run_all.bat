@@ -16,7 +16,7 @@ echo [2/3] Starting Backend API (Port 8000)...
 start "Backend API" cmd /k "uvicorn app:app --reload"
 
 echo [3/3] Starting Dashboard UI (Port 8501)...
-start "Streamlit Dashboard" cmd /k "streamlit run dashboard/main.py"
+start "Streamlit Dashboard" cmd /k "python -m streamlit run dashboard/main.py"
 
 echo.
 echo ========================================================
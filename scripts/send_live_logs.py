@@ -0,0 +1,82 @@
+"""
+================================================================================
+SCRIPT: scripts/send_live_logs.py
+ROLE: M1 (Data Engineer)
+PURPOSE: Replay an access log into the live listener (src/ingest/live.py).
+================================================================================
+
+Sends the lines of a log file over TCP (one stream per connection) or UDP
+(syslog-style datagrams with a "<PRI>" header) as fast as the listener
+accepts them, then prints the achieved lines per second.
+
+Replay is not paced in event time: with several connections, the ones
+that fall behind send lines older than the listener's allowed lateness,
+which it drops and counts as late.
+
+Usage:
+    python scripts/send_live_logs.py DATA/test.txt --connections 4
+    python scripts/send_live_logs.py DATA/test.txt --udp --lines-per-datagram 8
+"""
+
+import argparse
+import asyncio
+import socket
+import time
+
+# Bytes written per TCP send
+CHUNK_BYTES = 256 * 1024
+
+
+def read_lines(path: str, limit: int = None) -> list:
+    """Raw lines (bytes, newline kept) of a log file"""
+    with open(path, "rb") as f:
+        lines = f.readlines() if limit is None else [line for _, line in zip(range(limit), f)]
+    return [line if line.endswith(b"\n") else line + b"\n" for line in lines]
+
+
+async def send_tcp(lines: list, host: str, port: int, connections: int):
+    """Deal the lines round-robin over several connections (like concurrent web nodes); drain() waits whenever the server pushes back"""
+    async def one(part):
+        _, writer = await asyncio.open_connection(host, port)
+        buf = b"".join(part)
+        for i in range(0, len(buf), CHUNK_BYTES):
+            writer.write(buf[i:i + CHUNK_BYTES])
+            await writer.drain()
+        writer.close()
+        await writer.wait_closed()
+
+    await asyncio.gather(*(one(lines[i::connections]) for i in range(connections)))
+
+
+def send_udp(lines: list, host: str, port: int, per_datagram: int):
+    """Syslog-style datagrams of per_datagram lines each (UDP: no delivery guarantee)"""
+    header = time.strftime("<134>%b %d %H:%M:%S ").encode() + socket.gethostname().encode() + b" httpd: "
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    for i in range(0, len(lines), per_datagram):
+        sock.sendto(b"".join(header + line for line in lines[i:i + per_datagram]), (host, port))
+    sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a log file into the live listener")
+    parser.add_argument("path", help="access log (Common Log Format)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5140)
+    parser.add_argument("--connections", type=int, default=4, help="parallel TCP connections")
+    parser.add_argument("--udp", action="store_true", help="send syslog datagrams instead of TCP")
+    parser.add_argument("--lines-per-datagram", type=int, default=8)
+    parser.add_argument("--limit", type=int, default=None, help="send only the first N lines")
+    args = parser.parse_args()
+
+    lines = read_lines(args.path, args.limit)
+    start = time.perf_counter()
+    if args.udp:
+        send_udp(lines, args.host, args.port, args.lines_per_datagram)
+    else:
+        asyncio.run(send_tcp(lines, args.host, args.port, args.connections))
+    elapsed = time.perf_counter() - start
+    print(f"Sent {len(lines):,} lines in {elapsed:.2f}s ({len(lines) / elapsed:,.0f} lines/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,75 +1,64 @@
+import numpy as np
 import pandas as pd
-import re
 import os
-from datetime import datetime
+
+from ingest.aggregate import rollup
+from ingest.layer1 import write_layer1
+from ingest.readers import resolve_log_path
+from ingest.merge import merge_frames
+from ingest.cardinality import HLL_FREQ, DistinctBins
+from ingest.quantiles import QUANTILE_FREQ, QuantileBins
+from ingest.content import CONTENT_FREQ, ContentBins
+from ingest.sessions import SessionBins
+from ingest.timestamps import from_datetime_index, to_datetime_index
+from ingest.backends import get_backend
+from ingest.fastparse import BYTES_MISSING, concat_blocks
+from ingest.paths import DATA_DIR, OUTPUT_DIR
 
 # Define file paths
-input_train = r'c:\Users\eleven\Documents\AUTOSCALING_ANALYSIS\DATA\train.txt'
-input_test = r'c:\Users\eleven\Documents\AUTOSCALING_ANALYSIS\DATA\test.txt'
-output_dir = r'c:\Users\eleven\Documents\AUTOSCALING_ANALYSIS\processed_data'
+input_train = os.path.join(DATA_DIR, 'train.txt')
+input_test = os.path.join(DATA_DIR, 'test.txt')
+output_dir = OUTPUT_DIR
+
+# Parser backend (ingest.backends): 'numpy' fast path or the 'regex' reference
+ENGINE = 'numpy'
+
+# Traffic resolutions written; '1s' and '10s' may be added for sub-minute series
+INTERVALS = [('1min', 'nasa_traffic_1m.csv'), ('5min', 'nasa_traffic_5m.csv'), ('15min', 'nasa_traffic_15m.csv')]
+
+# Also write the full cleaned log as CSV (the columnar store is always written)
+SAVE_CLEAN_CSV = False
 
 # Ensure output directory exists
 os.makedirs(output_dir, exist_ok=True)
 
-# Regex for parsing Common Log Format (extended to capture what we need)
-# Example: 199.72.81.55 - - [01/Jul/1995:00:00:01 -0400] "GET /history/apollo/ HTTP/1.0" 200 6245
-# Regex for parsing Common Log Format (extended to capture what we need)
-# Example: 199.72.81.55 - - [01/Jul/1995:00:00:01 -0400] "GET /history/apollo/ HTTP/1.0" 200 6245
-log_pattern = re.compile(r'(?P<host>\S+) - - \[(?P<timestamp>.*?)\] "(?P<request>.*?)" (?P<status>\d{3}) (?P<bytes>\S+)')
-
-def parse_line(line):
-    match = log_pattern.match(line)
-    if match:
-        data = match.groupdict()
-        # Handle bytes being '-' which means 0
-        if data['bytes'] == '-':
-            data['bytes'] = 0
-        else:
-            try:
-                data['bytes'] = int(data['bytes'])
-            except ValueError:
-                data['bytes'] = 0
-        
-        # Parse Request (Method, Path, Protocol)
-        # Some requests might be malformed or simple like "GET /"
-        request_parts = data['request'].split()
-        if len(request_parts) >= 2:
-            data['method'] = request_parts[0]
-            data['path'] = request_parts[1]
-            data['protocol'] = request_parts[2] if len(request_parts) > 2 else ''
-        else:
-            data['method'] = ''
-            data['path'] = data['request']
-            data['protocol'] = ''
-            
-        return data
-    return None
-
-def process_file(filepath, chunk_size=100000):
+def process_file(filepath):
     print(f"Processing {filepath}...")
-    records = []
-    
-    # We will read line by line to avoid memory issues with huge files
-    with open(filepath, 'r', encoding='latin-1') as f:
-        for i, line in enumerate(f):
-            parsed = parse_line(line)
-            if parsed:
-                records.append(parsed)
-            
-            if i % 500000 == 0 and i > 0:
-                print(f"  Parsed {i} lines...")
-
-    df = pd.DataFrame(records)
+
+    # Shared Common Log Format parser (same records as src/process_logs.py)
+    # (.gz / .bz2 logs are decompressed on a background thread, never to disk)
+    blocks = get_backend(ENGINE).iter_blocks(resolve_log_path(filepath), fields=True)
+    block = concat_blocks(list(blocks), fields=True)
+    print(f"  Parsed {block['lines']:,} lines, {block['matched']:,} matched")
+
+    df = pd.DataFrame({
+        # epoch + UTC offset -> tz-aware timestamps
+        'timestamp': to_datetime_index(block['epoch'], block['tz_offset']),
+        'host': block['host'],
+        'method': block['method'],
+        'path': block['url'],
+        'protocol': block['protocol'],
+        'status': block['status'],
+        # Handle bytes being '-' (or not a number) which means 0
+        'bytes': np.where(block['bytes'] == BYTES_MISSING, 0, block['bytes']),
+        # ...but it is no response size: kept apart for the size quantiles
+        'bytes_missing': block['bytes'] == BYTES_MISSING,
+    })
     print(f"  Finished parsing. Total records: {len(df)}")
-    
-    # Convert timestamp to datetime
-    print("  Converting timestamps...")
-    # Format: 01/Jul/1995:00:00:01 -0400
-    df['timestamp'] = pd.to_datetime(df['timestamp'], format='%d/%b/%Y:%H:%M:%S %z', errors='coerce')
-    
+
     # Drop rows with invalid dates
     df = df.dropna(subset=['timestamp'])
-    
+
     return df
 
 # Process both files
@@ -78,14 +67,16 @@ df_test = process_file(input_test)
 
 # Combine datasets
 print("Combining datasets...")
-df_full = pd.concat([df_train, df_test])
-df_full = df_full.sort_values('timestamp')
+# each file is nearly time-ordered: k-way merge instead of concat + global sort
+df_full = merge_frames([df_train, df_test], key='timestamp')
 
 # Save Full Cleaned Dataset (with IP and Path)
-print("Saving full cleaned dataset (nasa_logs_clean.csv)...")
+print("Saving full cleaned dataset (nasa_logs_clean/)...")
 # Select relevant columns
 cols = ['timestamp', 'host', 'method', 'path', 'status', 'bytes']
-df_full[cols].to_csv(os.path.join(output_dir, 'nasa_logs_clean.csv'), index=False)
+write_layer1(df_full[cols], os.path.join(output_dir, 'nasa_logs_clean'))
+if SAVE_CLEAN_CSV:
+    df_full[cols].to_csv(os.path.join(output_dir, 'nasa_logs_clean.csv'), index=False)
 print("  Saved full logs.")
 
 # Set timestamp as index for resampling
@@ -100,25 +91,64 @@ df_full['status_4xx'] = ((df_full['status'] >= 400) & (df_full['status'] < 500))
 df_full['status_5xx'] = ((df_full['status'] >= 500) & (df_full['status'] < 600)).astype(int)
 
 # Define Resampling Function
-def resample_and_save(df, interval, filename):
+def resample_traffic(df, interval):
     print(f"Resampling to {interval}...")
     # Resample counts (requests) and sum (bytes)
-    resampled = df.resample(interval).agg({
-        'path': 'count', # Total requests
+    # (status is set on every record; path is None for malformed request lines)
+    return df.resample(interval).agg({
+        'status': 'count', # Total requests
         'bytes': 'sum',
         'status_2xx': 'sum',
         'status_3xx': 'sum',
         'status_4xx': 'sum',
         'status_5xx': 'sum'
-    }).rename(columns={'path': 'requests_count', 'bytes': 'bytes_sum'})
-    
+    }).rename(columns={'status': 'requests_count', 'bytes': 'bytes_sum'})
+
+def save_traffic(resampled, filename):
     output_path = os.path.join(output_dir, filename)
     resampled.to_csv(output_path)
     print(f"  Saved to {output_path}")
 
-# Resample to 1min, 5min, 15min
-resample_and_save(df_full, '1min', 'nasa_traffic_1m.csv')
-resample_and_save(df_full, '5min', 'nasa_traffic_5m.csv')
-resample_and_save(df_full, '15min', 'nasa_traffic_15m.csv')
+# Resample the full log once per second; every interval is rolled up from those bins,
+# adding the burst columns (peak_rps, p95_rps, max_second_bytes) in the same pass
+traffic_1s = resample_traffic(df_full, '1s')
+
+# Distinct hosts per 1min bin as HyperLogLog registers; coarser bins merge registers
+print("Counting distinct hosts...")
+hosts = DistinctBins('host')
+ok, epoch, tz_offset = from_datetime_index(df_full.index)
+hosts.add(epoch[ok], tz_offset[ok], df_full['host'].to_numpy(dtype=object)[ok])
+
+# Per-request size quantiles (bytes_p50/p95/p99) from mergeable 1min sketches;
+# '-' sizes are skipped (BYTES_MISSING), as in src/process_logs.py
+sizes = QuantileBins()
+sizes.add(epoch[ok], tz_offset[ok],
+          np.where(df_full['bytes_missing'].to_numpy(), BYTES_MISSING, df_full['bytes'].to_numpy())[ok])
+
+# Requests and bytes per content class (static / html / script / other)
+content = ContentBins()
+content.add(epoch[ok], tz_offset[ok], df_full['path'].to_numpy(dtype=object)[ok], df_full['bytes'].to_numpy()[ok])
+
+# Host sessions (30 min inactivity timeout): active_sessions / new_sessions per interval
+print("Sessionizing hosts...")
+sessions = SessionBins()
+sessions.add(epoch[ok], tz_offset[ok], df_full['host'].to_numpy(dtype=object)[ok])
+
+for interval, filename in INTERVALS:
+    print(f"Rolling up to {interval}...")
+    traffic = rollup(traffic_1s, '1s', interval, burst_from=('requests_count', 'bytes_sum'))
+    if pd.Timedelta(interval) % pd.Timedelta(HLL_FREQ) == pd.Timedelta(0):
+        est = (hosts if interval == HLL_FREQ else hosts.rollup(interval)).to_series()
+        traffic['unique_hosts'] = est.reindex(traffic.index, fill_value=0).clip(upper=traffic['requests_count'])
+    if pd.Timedelta(interval) % pd.Timedelta(QUANTILE_FREQ) == pd.Timedelta(0):
+        q = (sizes if interval == QUANTILE_FREQ else sizes.rollup(interval)).to_frame()
+        traffic = traffic.join(q)
+    if pd.Timedelta(interval) % pd.Timedelta(CONTENT_FREQ) == pd.Timedelta(0):
+        c = (content if interval == CONTENT_FREQ else content.rollup(interval)).to_frame().set_index('timestamp')
+        traffic = traffic.join(c.reindex(traffic.index, fill_value=0))
+    if interval in sessions.freqs:
+        s = sessions.to_frame(interval).set_index('timestamp')
+        traffic = traffic.join(s.reindex(traffic.index, fill_value=0))
+    save_traffic(traffic, filename)
 
 print("Data Engineering Complete.")
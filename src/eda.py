@@ -21,6 +21,9 @@ import warnings
 import os
 warnings.filterwarnings('ignore')
 
+from ingest.outages import empty_runs
+from ingest.store import read_traffic
+
 # Set style
 plt.style.use('seaborn-v0_8-whitegrid')
 plt.rcParams['figure.figsize'] = (14, 6)
@@ -36,9 +39,10 @@ print("="*60)
 DATA_DIR = 'processed_data'
 
 # Load different resolutions
-df_1m = pd.read_csv(f'{DATA_DIR}/nasa_traffic_1m.csv', parse_dates=['timestamp'])
-df_5m = pd.read_csv(f'{DATA_DIR}/nasa_traffic_5m.csv', parse_dates=['timestamp'])
-df_15m = pd.read_csv(f'{DATA_DIR}/nasa_traffic_15m.csv', parse_dates=['timestamp'])
+# (memory-mapped binary store next to the CSVs; imported from them on first use)
+df_1m = read_traffic(f'{DATA_DIR}/nasa_traffic_1m.csv')
+df_5m = read_traffic(f'{DATA_DIR}/nasa_traffic_5m.csv')
+df_15m = read_traffic(f'{DATA_DIR}/nasa_traffic_15m.csv')
 
 print(f"1-minute data: {len(df_1m):,} rows")
 print(f"5-minute data: {len(df_5m):,} rows")
@@ -82,9 +86,20 @@ print("="*60)
 
 outage_rows = df[df['is_outage'] == 1]
 print(f"Outage rows: {len(outage_rows)} ({len(outage_rows)/len(df)*100:.2f}%)")
-print(f"Outage start: {outage_rows['timestamp'].min()}")
-print(f"Outage end: {outage_rows['timestamp'].max()}")
-print(f"Outage duration: {(outage_rows['timestamp'].max() - outage_rows['timestamp'].min())}")
+
+# Outage windows = runs of is_outage bins (detected by process_logs, any number of them)
+run_starts, run_ends = empty_runs(df['is_outage'].to_numpy() == 1)
+outage_windows = list(zip(df['timestamp'].iloc[run_starts], df['timestamp'].iloc[run_ends - 1]))
+outage_hours = sum((end - start).total_seconds() for start, end in outage_windows) / 3600
+print(f"Outage windows: {len(outage_windows)}")
+for start, end in outage_windows:
+    print(f"  {start} -> {end} ({end - start})")
+
+
+def shade_outages(ax, color='red', label='Outage Period'):
+    """One shaded span per outage window (labelled once)"""
+    for i, (start, end) in enumerate(outage_windows):
+        ax.axvspan(start, end, alpha=0.3, color=color, label=label if i == 0 else None)
 
 # Check NaN values
 print("\n--- NaN Values per Column ---")
@@ -107,8 +122,7 @@ fig, axes = plt.subplots(2, 1, figsize=(16, 10))
 # Request count
 ax1 = axes[0]
 ax1.plot(df['timestamp'], df['request_count'], linewidth=0.5, alpha=0.8)
-ax1.axvspan(outage_rows['timestamp'].min(), outage_rows['timestamp'].max(), 
-            alpha=0.3, color='red', label='Outage Period')
+shade_outages(ax1)
 ax1.set_ylabel('Request Count (per 5min)')
 ax1.set_title('NASA HTTP Traffic - Request Count Over Time')
 ax1.legend()
@@ -118,8 +132,7 @@ ax1.xaxis.set_major_locator(mdates.WeekdayLocator(interval=1))
 # Total bytes
 ax2 = axes[1]
 ax2.plot(df['timestamp'], df['total_bytes']/1e6, linewidth=0.5, alpha=0.8, color='green')
-ax2.axvspan(outage_rows['timestamp'].min(), outage_rows['timestamp'].max(), 
-            alpha=0.3, color='red', label='Outage Period')
+shade_outages(ax2)
 ax2.set_ylabel('Total Bytes (MB per 5min)')
 ax2.set_xlabel('Date')
 ax2.set_title('NASA HTTP Traffic - Bytes Transferred Over Time')
@@ -265,8 +278,7 @@ test_data = df[df['timestamp'] > train_end]
 ax.plot(train_data['timestamp'], train_data['request_count'], linewidth=0.5, label='Train', color='blue')
 ax.plot(test_data['timestamp'], test_data['request_count'], linewidth=0.5, label='Test', color='orange')
 ax.axvline(train_end, color='red', linestyle='--', linewidth=2, label='Train/Test Split')
-ax.axvspan(outage_rows['timestamp'].min(), outage_rows['timestamp'].max(), 
-           alpha=0.3, color='gray', label='Outage')
+shade_outages(ax, color='gray', label='Outage')
 ax.set_xlabel('Date')
 ax.set_ylabel('Request Count (per 5min)')
 ax.set_title('Train/Test Split (Train: July + Aug 1-22, Test: Aug 23-31)')
@@ -296,8 +308,8 @@ Dataset Overview:
 - Total Records: {len(df):,}
 
 Missing Data (Outage):
-- Outage Period: {outage_rows['timestamp'].min()} to {outage_rows['timestamp'].max()}
-- Duration: ~37.7 hours
+- Outage Windows: {len(outage_windows)} ({'; '.join(f"{a} to {b}" for a, b in outage_windows)})
+- Duration: ~{outage_hours:.1f} hours
 - Affected Records: {len(outage_rows):,} ({len(outage_rows)/len(df)*100:.2f}%)
 
 Traffic Statistics (excluding outage):
@@ -20,13 +20,24 @@ import pandas as pd
 import numpy as np
 from typing import Literal
 
+try:
+    # imported as src.handle_missing_data (from the repository root)
+    from .ingest.rrd import read_traffic_history
+except ImportError:
+    # run or imported from src/ (python handle_missing_data.py)
+    from ingest.rrd import read_traffic_history
+
 
 class MissingDataHandler:
     """Handle missing data in NASA traffic time series."""
     
     def __init__(self, filepath: str):
-        """Load time series data."""
-        self.df = pd.read_csv(filepath, parse_dates=['timestamp'])
+        """
+        Load time series data through the round-robin traffic store next to
+        the CSV (its archive of the file's resolution), or from the binary
+        traffic store / CSV when that store does not hold it.
+        """
+        self.df = read_traffic_history(filepath)
         self.df = self.df.sort_values('timestamp').reset_index(drop=True)
         
         # Identify metric columns (exclude timestamp and flags)
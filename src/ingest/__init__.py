@@ -0,0 +1,28 @@
+"""
+Shared log-ingest building blocks for the NASA HTTP log pipeline.
+
+Modules:
+- clf:        regex Common Log Format parser (reference implementation)
+- backends:   pluggable parser backends (regex, numpy) yielding the same blocks
+- fastparse:  vectorized NumPy whole-buffer parser with regex fallback
+- timestamps: fixed-width CLF timestamp decoder (scalar + array, memoized)
+- aggregate:  streaming time-bin accumulators (TrafficBins) and rollups
+- requestlog: compact typed in-memory request log (interned text codes, growable arrays)
+- store:      memory-mapped binary traffic store (one .npy per column) behind the traffic CSVs
+- windows:    binary-search time-range index with per-metric prefix sums (O(1) window sum/mean/count)
+- rrd:        round-robin multi-resolution store (fixed retention per resolution, fine-to-coarse compaction)
+- layer1:     columnar, dictionary-encoded parsed-log store (per-day partitions)
+- incremental: checkpointed tail-mode ingest with rotation handling
+- readers:    plain/gzip/bz2 log readers with a pipelined decompression thread
+- merge:      heap-based k-way merge of nearly time-ordered block streams
+- sketches:   per-bin Space-Saving top-K sketches (urls, hosts) with range queries
+- cardinality: per-bin HyperLogLog distinct counts (unique hosts), mergeable registers
+- quantiles:  per-bin DDSketch-style response-size quantiles (bytes_p50/p95/p99)
+- content:    memoized URL content classes (static/html/script/other) and per-class bins
+- routes:     sparse CSR traffic matrix of time bins x top-N URL prefixes
+- sessions:   bounded streaming host sessionizer (active_sessions / new_sessions per bin)
+- outages:    seasonal zero-run outage detection (vectorized RLE) and interval masks
+- paths:      data / output directories (AUTOSCALING_DATA_DIR / AUTOSCALING_OUTPUT_DIR)
+- bench:      synthetic CLF log generator and per-backend/stage benchmark harness
+- live:       asyncio TCP/UDP (syslog) log listener with backpressure feeding in-memory bins
+"""
@@ -0,0 +1,355 @@
+"""
+Streaming traffic aggregation.
+
+TrafficBins folds parsed records straight into fixed-width time-bin
+accumulators (request_count, total_bytes, status_2xx..5xx), so memory
+grows with the number of bins instead of the number of requests. Bins are
+aligned on local time like DataFrame.resample on the tz-aware timestamps,
+and to_frame() returns the same table as make_traffic_ts() in
+src/process_logs.py.
+
+Coarser resolutions never need another pass over the log: rollup() (and
+TrafficBins.rollup) reduce whole blocks of finer bins, which costs O(bins).
+Rolled up from 1-second bins, each coarse bin can also carry burst
+statistics (BURST_COLUMNS): the busiest second's request count, the 95th
+percentile of its per-second request counts and the busiest second's bytes.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .fastparse import BYTES_MISSING
+from .timestamps import to_datetime_index
+
+TRAFFIC_COLUMNS = ("request_count", "total_bytes", "status_2xx", "status_3xx", "status_4xx", "status_5xx")
+
+# status_2xx..status_5xx are status // 100 == 2..5
+_STATUS_CLASSES = 4
+
+# Per-bin burst statistics derived from the 1-second bins inside each bin
+BURST_COLUMNS = ("peak_rps", "p95_rps", "max_second_bytes")
+
+# Percentile of the per-second request counts reported as p95_rps
+BURST_PERCENTILE = 95
+
+# Block reductions available to rollup(); NaN is skipped like resample() does
+_ROLLUP_OPS = {"sum": np.add, "max": np.fmax, "min": np.fmin}
+
+
+def freq_to_seconds(freq: str) -> int:
+    """Bin width in seconds for a pandas frequency string ('1min', '15min', ...)"""
+    seconds = pd.Timedelta(freq if freq[:1].isdigit() else "1" + freq).total_seconds()
+    if seconds < 1 or seconds != int(seconds):
+        raise ValueError(f"Unsupported bin width: {freq}")
+    return int(seconds)
+
+
+def _block_starts(keys: np.ndarray) -> np.ndarray:
+    """Start positions of the runs of equal (sorted) coarse-bin keys"""
+    return np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+
+
+def _local_seconds(index: pd.DatetimeIndex) -> np.ndarray:
+    """Wall-clock seconds since 1970-01-01 (the time resample() bins on)"""
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return ((index - pd.Timestamp(0)) // pd.Timedelta(seconds=1)).to_numpy(dtype=np.int64)
+
+
+def status_class_counts(idx: np.ndarray, status: np.ndarray, n: int) -> np.ndarray:
+    """
+    status_2xx..status_5xx counts per bin as an (n, 4) int64 matrix.
+
+    idx is each record's bin (0..n-1); one bincount over (bin, status // 100)
+    pairs fills all four columns. Missing (NaN) statuses are not counted.
+    """
+    status = np.asarray(status)
+    if status.dtype.kind == "f":
+        ok = np.isfinite(status)
+        idx, status = idx[ok], status[ok]
+    cls = status.astype(np.int64) // 100 - 2
+    keep = (cls >= 0) & (cls < _STATUS_CLASSES)
+    by_class = np.bincount(idx[keep] * _STATUS_CLASSES + cls[keep], minlength=n * _STATUS_CLASSES)
+    return by_class.reshape(n, _STATUS_CLASSES)
+
+
+def status_code_matrix(idx: np.ndarray, status: np.ndarray, n: int) -> tuple:
+    """
+    Per-bin counts of every distinct status code in the same kind of pass.
+
+    Returns (codes, matrix): the sorted codes present (200, 304, 404, ...)
+    and an (n, len(codes)) int32 matrix of counts, so any status column is
+    a matrix column away.
+    """
+    status = np.asarray(status)
+    if status.dtype.kind == "f":
+        ok = np.isfinite(status)
+        idx, status = idx[ok], status[ok]
+    status = status.astype(np.int64)
+    if len(status) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros((n, 0), dtype=np.int32)
+    # present codes via a bincount over the code values, then a lookup table to columns
+    lo = int(status.min())
+    present = np.bincount(status - lo)
+    codes = np.flatnonzero(present) + lo
+    lut = np.zeros(len(present), dtype=np.int64)
+    lut[codes - lo] = np.arange(len(codes))
+    k = len(codes)
+    counts = np.bincount(idx * k + lut[status - lo], minlength=n * k)
+    return codes, counts.reshape(n, k).astype(np.int32)
+
+
+def burst_stats(seconds: np.ndarray, requests: np.ndarray, nbytes: np.ndarray, width: int) -> tuple:
+    """
+    Burst statistics of width-second bins from per-second totals.
+
+    seconds are the (sorted, unique) local second numbers of the requests /
+    nbytes totals; seconds that are not listed count as idle. Returns
+    (first bin number, {column: array}) covering every bin from the first
+    to the last listed second.
+    """
+    first = int(seconds[0]) // width
+    n = int(seconds[-1]) // width - first + 1
+    # one row of `width` seconds per bin; a single reduction along the row
+    pos = np.asarray(seconds, dtype=np.int64) - first * width
+    req = np.zeros(n * width, dtype=np.int64)
+    req[pos] = requests
+    byt = np.zeros(n * width, dtype=np.asarray(nbytes).dtype)
+    byt[pos] = nbytes
+    req, byt = req.reshape(n, width), byt.reshape(n, width)
+    return first, {
+        "peak_rps": req.max(axis=1),
+        "p95_rps": np.percentile(req, BURST_PERCENTILE, axis=1),
+        "max_second_bytes": byt.max(axis=1),
+    }
+
+
+def rollup(df: pd.DataFrame, base_freq: str, freq: str, how: dict = None, burst_from: tuple = None) -> pd.DataFrame:
+    """
+    Roll a table indexed by timestamp at base_freq (e.g. 1min traffic) up to
+    the coarser freq by reducing whole blocks of base bins.
+
+    Columns are summed unless how maps them to "max" or "min". The result
+    equals resampling the original records at freq directly.
+
+    burst_from=(requests column, bytes column) adds BURST_COLUMNS, which
+    needs 1-second base bins.
+    """
+    width, base = freq_to_seconds(freq), freq_to_seconds(base_freq)
+    if width % base:
+        raise ValueError(f"{freq} is not a multiple of {base_freq}")
+    if burst_from is not None and base != 1:
+        raise ValueError(f"Burst statistics need 1s base bins, not {base_freq}")
+    if len(df) == 0:
+        return df.copy()
+
+    local = _local_seconds(df.index)
+    keys = local // width
+    starts = _block_starts(keys)
+
+    out = {}
+    for col in df.columns:
+        op = _ROLLUP_OPS[(how or {}).get(col, "sum")]
+        values = df[col].to_numpy()
+        if op is np.add and values.dtype.kind == "f":
+            values = np.nan_to_num(values, nan=0.0)
+        out[col] = op.reduceat(values, starts)
+
+    if burst_from is not None:
+        req_col, bytes_col = burst_from
+        nbytes = df[bytes_col].to_numpy()
+        if nbytes.dtype.kind == "f":
+            nbytes = np.nan_to_num(nbytes, nan=0.0)
+        first, stats = burst_stats(local, df[req_col].to_numpy(), nbytes, width)
+        for col, values in stats.items():
+            out[col] = values[keys[starts] - first]
+
+    # first base bin of each block, floored to the coarse bin start
+    index = df.index[starts] - pd.to_timedelta(local[starts] - keys[starts] * width, unit="s")
+    return pd.DataFrame(out, index=index.rename(df.index.name))
+
+
+class TrafficBins:
+    """Per-bin request/byte/status counters over a growing time range."""
+
+    # Counter columns, in matrix order (subclasses count other things per bin)
+    COLUMNS = TRAFFIC_COLUMNS
+
+    def __init__(self, freq: str, tz_offset: int = None, max_bins: int = None):
+        self.freq = freq
+        self.width = freq_to_seconds(freq)
+        # UTC offset (minutes) the bins are aligned to; first record's if None
+        self.tz_offset = tz_offset
+        # longest span (bins) the dense array may grow to, None for unbounded
+        self.max_bins = max_bins
+        self.first_bin = None
+        self.n_bins = 0
+        self.has_missing_bytes = False
+        # BURST_COLUMNS arrays, set by rollup(..., burst=True)
+        self.burst = None
+        self._counts = np.zeros((0, len(self.COLUMNS)), dtype=np.int64)
+
+    def __len__(self) -> int:
+        return self.n_bins
+
+    def _reserve(self, lo: int, hi: int):
+        """Make bins lo..hi (inclusive, absolute bin numbers) addressable"""
+        first = lo if self.first_bin is None else self.first_bin
+        new_first = min(first, lo)
+        new_n = max(first + self.n_bins, hi + 1) - new_first
+        if self.max_bins is not None and new_n > self.max_bins:
+            raise ValueError(f"Bins {lo}..{hi} would span {new_n} bins (max {self.max_bins})")
+        self.first_bin = first
+        shift = self.first_bin - new_first
+        if shift or new_n > len(self._counts):
+            # grow geometrically so appending bins stays amortised O(1)
+            cap = max(new_n, 2 * len(self._counts)) if new_n > len(self._counts) else len(self._counts)
+            if self.max_bins is not None:
+                cap = min(cap, max(self.max_bins, len(self._counts)))
+            counts = np.zeros((cap, len(self.COLUMNS)), dtype=np.int64)
+            counts[shift:shift + self.n_bins] = self._counts[:self.n_bins]
+            self._counts = counts
+        self.first_bin = new_first
+        self.n_bins = new_n
+
+    def add(self, epoch: np.ndarray, tz_offset: np.ndarray, status: np.ndarray, nbytes: np.ndarray):
+        """Fold records (epoch seconds, UTC offset minutes, status, bytes with BYTES_MISSING for '-')"""
+        if len(epoch) == 0:
+            return
+        if self.tz_offset is None:
+            self.tz_offset = int(tz_offset[0])
+
+        b = (np.asarray(epoch, dtype=np.int64) + self.tz_offset * 60) // self.width
+        lo, hi = int(b.min()), int(b.max())
+        self._reserve(lo, hi)
+        idx = b - lo
+        n = hi - lo + 1
+
+        missing = nbytes == BYTES_MISSING
+        self.has_missing_bytes |= bool(missing.any())
+        weights = np.where(missing, 0, nbytes).astype(np.float64)
+
+        sums = np.zeros((n, len(self.COLUMNS)), dtype=np.int64)
+        sums[:, 0] = np.bincount(idx, minlength=n)
+        sums[:, 1] = np.rint(np.bincount(idx, weights=weights, minlength=n)).astype(np.int64)
+
+        sums[:, 2:] = status_class_counts(idx, status, n)
+
+        start = lo - self.first_bin
+        self._counts[start:start + n] += sums
+
+    def add_block(self, block: dict):
+        """Fold a parsed fastparse block"""
+        self.add(block["epoch"], block["tz_offset"], block["status"], block["bytes"])
+
+    def merge(self, other: "TrafficBins"):
+        """Add another TrafficBins with the same width into this one"""
+        if other.width != self.width:
+            raise ValueError("Cannot merge bins of different widths")
+        if other.n_bins == 0:
+            return
+        if self.tz_offset is None:
+            self.tz_offset = other.tz_offset
+        elif other.tz_offset != self.tz_offset:
+            raise ValueError("Cannot merge bins aligned to different UTC offsets")
+        self._reserve(other.first_bin, other.first_bin + other.n_bins - 1)
+        start = other.first_bin - self.first_bin
+        self._counts[start:start + other.n_bins] += other._counts[:other.n_bins]
+        self.has_missing_bytes |= other.has_missing_bytes
+
+    def trim(self, first_bin: int):
+        """Drop every bin before first_bin (absolute bin number), e.g. past a retention window"""
+        if self.first_bin is None or first_bin <= self.first_bin:
+            return
+        drop = min(first_bin - self.first_bin, self.n_bins)
+        self._counts = self._counts[drop:self.n_bins].copy()
+        self.n_bins -= drop
+        self.first_bin = first_bin if self.n_bins else None
+
+    def window(self, lo: int, hi: int) -> "TrafficBins":
+        """Copy of bins lo..hi-1 (absolute bin numbers, clipped to the bins held)"""
+        out = type(self)(self.freq, self.tz_offset)
+        out.has_missing_bytes = self.has_missing_bytes
+        if self.first_bin is None:
+            return out
+        lo = max(lo, self.first_bin)
+        hi = min(hi, self.first_bin + self.n_bins)
+        if hi > lo:
+            out._counts = self._counts[lo - self.first_bin:hi - self.first_bin].copy()
+            out.first_bin = lo
+            out.n_bins = hi - lo
+        return out
+
+    def rollup(self, freq: str, burst: bool = False) -> "TrafficBins":
+        """
+        Coarser TrafficBins built from these bins in O(bins).
+
+        burst=True also fills out.burst (BURST_COLUMNS); these bins must be
+        1 second wide for that.
+        """
+        out = type(self)(freq, self.tz_offset)
+        if out.width % self.width:
+            raise ValueError(f"{freq} is not a multiple of {self.freq}")
+        if burst and self.width != 1:
+            raise ValueError(f"Burst statistics need 1s bins, not {self.freq}")
+        out.has_missing_bytes = self.has_missing_bytes
+        if self.n_bins == 0:
+            return out
+        bins = self.first_bin + np.arange(self.n_bins, dtype=np.int64)
+        keys = bins * self.width // out.width
+        counts = self._counts[:self.n_bins]
+        out._counts = np.add.reduceat(counts, _block_starts(keys), axis=0)
+        out.first_bin = int(keys[0])
+        out.n_bins = len(out._counts)
+        if burst:
+            # per-second bins are gap-free, so every coarse bin is covered
+            _, out.burst = burst_stats(bins, counts[:, 0], counts[:, 1], out.width)
+        return out
+
+    def state(self) -> dict:
+        """Arrays describing the bins (for np.savez / from_state)"""
+        return {
+            "width": np.int64(self.width),
+            "tz_offset": np.int64(self.tz_offset if self.tz_offset is not None else 0),
+            "has_tz": np.bool_(self.tz_offset is not None),
+            "first_bin": np.int64(self.first_bin if self.first_bin is not None else 0),
+            "has_missing_bytes": np.bool_(self.has_missing_bytes),
+            "counts": self._counts[:self.n_bins],
+        }
+
+    @classmethod
+    def from_state(cls, freq: str, state: dict) -> "TrafficBins":
+        """Rebuild bins saved with state()"""
+        bins = cls(freq, int(state["tz_offset"]) if bool(state["has_tz"]) else None)
+        if bins.width != int(state["width"]):
+            raise ValueError(f"Saved bins are {int(state['width'])}s wide, not {freq}")
+        bins._counts = np.array(state["counts"], dtype=np.int64).reshape(-1, len(cls.COLUMNS))
+        bins.n_bins = len(bins._counts)
+        bins.first_bin = int(state["first_bin"]) if bins.n_bins else None
+        bins.has_missing_bytes = bool(state["has_missing_bytes"])
+        return bins
+
+    def total(self, column: str = "request_count") -> int:
+        """Sum of one counter over all bins"""
+        return int(self._counts[:self.n_bins, self.COLUMNS.index(column)].sum())
+
+    def to_frame(self) -> pd.DataFrame:
+        """Traffic table with the columns and dtypes of make_traffic_ts()"""
+        burst_cols = BURST_COLUMNS if self.burst is not None else ()
+        if self.n_bins == 0:
+            return pd.DataFrame(columns=("timestamp",) + self.COLUMNS + burst_cols)
+        bins = self.first_bin + np.arange(self.n_bins, dtype=np.int64)
+        epoch = bins * self.width - self.tz_offset * 60
+        counts = self._counts[:self.n_bins]
+
+        df = pd.DataFrame({"timestamp": to_datetime_index(epoch, np.full(self.n_bins, self.tz_offset))})
+        for i, col in enumerate(self.COLUMNS):
+            df[col] = counts[:, i]
+        if self.has_missing_bytes:
+            # the row-based path sums a float column when any bytes were '-'
+            df["total_bytes"] = df["total_bytes"].astype("float64")
+        for col in burst_cols:
+            df[col] = self.burst[col]
+        if self.burst is not None and self.has_missing_bytes:
+            df["max_second_bytes"] = df["max_second_bytes"].astype("float64")
+        return df
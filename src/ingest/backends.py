@@ -0,0 +1,121 @@
+"""
+Pluggable log parser backends.
+
+Every backend turns raw log bytes into the same fastparse-style blocks
+(epoch, tz_offset, status, bytes [+ host, method, url, protocol] and the
+'lines' / 'matched' counters), so the aggregators, the Layer 1 writer and
+the benchmark never depend on which parser produced them:
+
+- regex: clf.parse_line per line (the reference implementation)
+- numpy: fastparse whole-buffer parser (regex only for rejected lines)
+
+A backend provides parse_buffer(data, fields) for newline-aligned byte
+ranges and iter_blocks(path, fields) for whole (possibly compressed) files.
+New ones are added with register_backend() and become selectable by name
+everywhere an engine is chosen (process_logs --engine, bench_ingest).
+"""
+
+import io
+import itertools
+from typing import Callable, NamedTuple
+
+import numpy as np
+
+from .clf import parse_line
+from .fastparse import BYTES_MISSING, iter_clf_blocks, parse_clf_buffer
+from .readers import iter_line_chunks, open_log
+
+# Lines parsed per block by the regex backend
+REGEX_CHUNK_LINES = 200_000
+
+# Field columns of a parsed record, in clf.parse_line order
+RECORD_FIELDS = ("timestamp", "host", "method", "url", "protocol", "status", "bytes")
+
+
+class Backend(NamedTuple):
+    parse_buffer: Callable
+    iter_blocks: Callable
+    description: str = ""
+
+
+def parse_lines(lines) -> tuple:
+    """Parse an iterable of log lines into per-field column lists"""
+    cols = {k: [] for k in RECORD_FIELDS}
+    line_count = 0
+    matched_count = 0
+
+    for line in lines:
+        line_count += 1
+        rec = parse_line(line.rstrip("\n"))
+        if rec is None:
+            continue
+
+        matched_count += 1
+        if rec[0] is None:
+            # unparseable timestamp
+            continue
+
+        for k, v in zip(cols, rec):
+            cols[k].append(v)
+
+    return cols, line_count, matched_count
+
+
+def lines_block(cols: dict, line_count: int, matched_count: int, fields: bool = False) -> dict:
+    """Convert regex-parsed column lists into a fastparse-style block"""
+    ts = cols["timestamp"]
+    block = {
+        "epoch": np.array([int(t.timestamp()) for t in ts], dtype=np.int64),
+        "tz_offset": np.array([t.utcoffset().total_seconds() // 60 for t in ts], dtype=np.int16),
+        "status": np.array(cols["status"], dtype=np.int16),
+        "bytes": np.array([BYTES_MISSING if b is None else b for b in cols["bytes"]], dtype=np.int64),
+        "lines": line_count,
+        "matched": matched_count,
+    }
+    if fields:
+        for name in ("host", "method", "url", "protocol"):
+            block[name] = np.array(cols[name], dtype=object)
+    return block
+
+
+def buffer_lines(data) -> io.TextIOWrapper:
+    """Lines of a byte buffer, decoded and split like open(path, "r", encoding="latin-1")"""
+    return io.TextIOWrapper(io.BytesIO(data), encoding="latin-1", errors="replace")
+
+
+def _regex_buffer(data, fields: bool = False) -> dict:
+    return lines_block(*parse_lines(buffer_lines(data)), fields=fields)
+
+
+def _regex_blocks(path: str, fields: bool = False):
+    with open_log(path) as f:
+        while True:
+            chunk = list(itertools.islice(f, REGEX_CHUNK_LINES))
+            if not chunk:
+                return
+            yield lines_block(*parse_lines(chunk), fields=fields)
+
+
+def chunked_blocks(parse_buffer: Callable) -> Callable:
+    """iter_blocks for a backend that only parses buffers: newline-aligned chunks of the file"""
+    def iter_blocks(path: str, fields: bool = False):
+        for chunk in iter_line_chunks(path):
+            yield parse_buffer(chunk, fields=fields)
+    return iter_blocks
+
+
+BACKENDS = {
+    "regex": Backend(_regex_buffer, _regex_blocks, "per-line LOG_RE (reference)"),
+    "numpy": Backend(parse_clf_buffer, iter_clf_blocks, "vectorized whole-buffer parser"),
+}
+
+
+def register_backend(name: str, parse_buffer: Callable, iter_blocks: Callable = None, description: str = ""):
+    """Add (or replace) a parser backend; iter_blocks defaults to chunked_blocks(parse_buffer)"""
+    BACKENDS[name] = Backend(parse_buffer, iter_blocks or chunked_blocks(parse_buffer), description)
+
+
+def get_backend(name: str) -> Backend:
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown parser engine: {name}")
+    return BACKENDS[name]
@@ -0,0 +1,197 @@
+"""
+Synthetic Common Log Format generator and parser benchmark harness.
+
+write_synthetic_log() writes NASA-like access logs of any size with a
+configurable share of malformed lines, so parser changes can be measured
+without the real data:
+
+- garbage:   random text (no LOG_RE match)
+- truncated: a valid line cut short (no LOG_RE match)
+- bad_ts:    impossible timestamp (matched, dropped as unparseable)
+- tab:       valid record with a tab separator (matched, but off the
+             vectorized fast path, so it exercises the regex fallback)
+
+run_benchmark() times every (backend, stage) pair in a fresh process, so
+each peak RSS is that run's alone:
+
+- read:      raw (decompressed) bytes only, the I/O floor
+- parse:     backend blocks without text fields
+- fields:    backend blocks with host/method/url/protocol
+- aggregate: parse + fold into 1min TrafficBins (the streaming pipeline)
+
+It reports lines/s, MB/s (of uncompressed log text), match rate and peak RSS.
+"""
+
+import bz2
+import gzip
+import math
+import multiprocessing
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from .aggregate import TrafficBins
+from .backends import BACKENDS, get_backend
+from .readers import iter_raw_chunks
+
+STAGES = ("read", "parse", "fields", "aggregate")
+
+# Kinds of malformed lines, drawn in these proportions
+MALFORMED_KINDS = {"garbage": 0.4, "truncated": 0.3, "bad_ts": 0.2, "tab": 0.1}
+
+# First synthetic timestamp (local time, -0400 like the NASA logs)
+SYNTH_START = pd.Timestamp("1995-07-01 00:00:00")
+SYNTH_TZ = "-0400"
+
+# Mean requests per second of the synthetic traffic
+SYNTH_RATE = 20
+
+# Lines generated and written per batch
+SYNTH_BATCH = 100_000
+
+_HOSTS = 5000
+_URLS = ("/", "/images/NASA-logosmall.gif", "/images/KSC-logosmall.gif", "/shuttle/countdown/",
+         "/shuttle/countdown/count.gif", "/history/apollo/", "/shuttle/missions/sts-71/mission-sts-71.html",
+         "/cgi-bin/imagemap/countdown?99,176", "/images/ksclogo-medium.gif", "/htbin/cdt_main.pl")
+_STATUS = np.array([200, 304, 302, 404, 500])
+_STATUS_P = np.array([0.89, 0.07, 0.025, 0.0145, 0.0005])
+_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+_OPENERS = {None: open, "gz": gzip.open, "bz2": bz2.open}
+
+
+def _clf_ts(t: pd.Timestamp) -> str:
+    return f"{t.day:02d}/{_MONTHS[t.month - 1]}/{t.year}:{t.hour:02d}:{t.minute:02d}:{t.second:02d} {SYNTH_TZ}"
+
+
+def _synthetic_lines(rng: np.random.Generator, n: int, start_second: int, malformed_rate: float) -> tuple:
+    """n log lines from start_second on; returns (lines, kinds of the malformed ones, next second)"""
+    seconds = start_second + np.cumsum(rng.poisson(1.0, n)) // SYNTH_RATE
+    hosts = rng.zipf(1.3, n) % _HOSTS
+    urls = rng.zipf(1.5, n) % len(_URLS)
+    status = rng.choice(_STATUS, n, p=_STATUS_P)
+    nbytes = rng.integers(0, 60_000, n)
+    dash = (status != 200) & (rng.random(n) < 0.8)
+
+    stamps = {}
+    lines = []
+    for s, h, u, st, b, d in zip(seconds.tolist(), hosts.tolist(), urls.tolist(), status.tolist(),
+                                 nbytes.tolist(), dash.tolist()):
+        ts = stamps.get(s)
+        if ts is None:
+            ts = stamps[s] = _clf_ts(SYNTH_START + pd.Timedelta(seconds=s))
+        lines.append(f'host{h}.example.com - - [{ts}] "GET {_URLS[u]} HTTP/1.0" {st} {"-" if d else b}')
+
+    bad = np.flatnonzero(rng.random(n) < malformed_rate)
+    kinds = rng.choice(list(MALFORMED_KINDS), len(bad), p=list(MALFORMED_KINDS.values()))
+    for i, kind in zip(bad.tolist(), kinds.tolist()):
+        line = lines[i]
+        if kind == "garbage":
+            lines[i] = "".join(rng.choice(list("abcdefgh ]/[:-\""), 40))
+        elif kind == "truncated":
+            lines[i] = line[:int(rng.integers(1, line.index('"') + 1))]
+        elif kind == "bad_ts":
+            lines[i] = line.replace(line[line.index("[") + 1:line.index("[") + 3], "32", 1)
+        else:
+            lines[i] = line.replace(" ", "\t", 1)
+
+    return lines, kinds.tolist(), int(seconds[-1]) + 1
+
+
+def write_synthetic_log(path: str, lines: int, malformed_rate: float = 0.01, seed: int = 0,
+                        compress: str = None) -> dict:
+    """
+    Write a synthetic access log of the given number of lines (plain, or
+    compress="gz" / "bz2"). Returns the counts a parser should reproduce:
+    lines, expected matched (LOG_RE) lines, records and text bytes.
+    """
+    rng = np.random.default_rng(seed)
+    kinds = dict.fromkeys(MALFORMED_KINDS, 0)
+    nbytes = 0
+    second = 0
+    with _OPENERS[compress](path, "wb") as f:
+        for lo in range(0, lines, SYNTH_BATCH):
+            batch, bad, second = _synthetic_lines(rng, min(SYNTH_BATCH, lines - lo), second, malformed_rate)
+            data = ("\n".join(batch) + "\n").encode("latin-1")
+            f.write(data)
+            nbytes += len(data)
+            for kind in bad:
+                kinds[kind] += 1
+    matched = lines - kinds["garbage"] - kinds["truncated"]
+    return {"lines": lines, "matched": matched, "records": matched - kinds["bad_ts"],
+            "bytes": nbytes, **{f"malformed_{k}": v for k, v in kinds.items()}}
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB (NaN where it cannot be read)"""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset / 2**20
+        except (ImportError, AttributeError):
+            return math.nan
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def run_stage(path: str, backend: str, stage: str) -> dict:
+    """Time one stage of one backend over a log file (in this process)"""
+    rss_before = peak_rss_mb()
+    lines = matched = records = 0
+    start = time.perf_counter()
+    if stage == "read":
+        for chunk in iter_raw_chunks(path):
+            lines += chunk.count(b"\n")
+    else:
+        bins = TrafficBins("1min") if stage == "aggregate" else None
+        for block in get_backend(backend).iter_blocks(path, fields=stage == "fields"):
+            lines += block["lines"]
+            matched += block["matched"]
+            records += len(block["epoch"])
+            if bins is not None:
+                bins.add_block(block)
+    seconds = time.perf_counter() - start
+    return {"backend": backend, "stage": stage, "lines": lines, "matched": matched, "records": records,
+            "seconds": seconds, "rss_before_mb": rss_before, "peak_rss_mb": peak_rss_mb()}
+
+
+def run_benchmark(path: str, backends: tuple = tuple(BACKENDS), stages: tuple = STAGES,
+                  repeat: int = 1, text_bytes: int = None) -> pd.DataFrame:
+    """
+    Run every (backend, stage) pair in a fresh spawned process, best of repeat.
+
+    text_bytes is the uncompressed size of the log for MB/s (measured by a
+    read pass when not given). The read stage does not depend on the
+    backend and runs once. The spawned processes only see the backends
+    defined in ingest/backends.py, not ones registered at runtime.
+    """
+    for name in backends:
+        get_backend(name)
+    runs = [("-", "read")] if "read" in stages else []
+    runs += [(b, s) for b in backends for s in stages if s != "read"]
+
+    ctx = multiprocessing.get_context("spawn")
+    rows = []
+    for backend, stage in runs:
+        best = None
+        for _ in range(repeat):
+            # one process per run: its peak RSS belongs to this run alone
+            with ctx.Pool(1) as pool:
+                row = pool.apply(run_stage, (path, backend, stage))
+            if best is None or row["seconds"] < best["seconds"]:
+                best = row
+        rows.append(best)
+
+    if text_bytes is None:
+        text_bytes = sum(len(chunk) for chunk in iter_raw_chunks(path))
+    df = pd.DataFrame(rows)
+    df["lines_per_s"] = df["lines"] / df["seconds"]
+    df["mb_per_s"] = text_bytes / 2**20 / df["seconds"]
+    df["match_rate"] = np.where(df["stage"] == "read", np.nan, df["matched"] / df["lines"].clip(lower=1))
+    return df[["backend", "stage", "lines", "matched", "records", "match_rate", "seconds",
+               "lines_per_s", "mb_per_s", "rss_before_mb", "peak_rss_mb"]]
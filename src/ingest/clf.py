@@ -0,0 +1,80 @@
+"""
+Common Log Format (CLF) regex parser.
+
+This is the reference per-line parser used by src/process_logs.py; faster
+backends (see fastparse.py) must produce exactly the same records and fall
+back to parse_line() for anything they do not recognise.
+"""
+
+import re
+
+from .timestamps import ClfTimestampDecoder
+
+# === REGEX PATTERNS ===
+
+# Regex 1: Parse log line into host/timestamp/request/status/bytes
+LOG_RE = re.compile(
+    r'^(?P<host>\S+)\s+'          # host/ip
+    r'\S+\s+\S+\s+'               # ignore ident/user (- -)
+    r'\[(?P<ts>[^\]]+)\]\s+'      # [23/Aug/1995:00:00:00 -0400]
+    r'"(?P<request>[^"]*)"\s+'    # "GET /... HTTP/1.0"
+    r'(?P<status>\d{3})\s+'       # 200
+    r'(?P<bytes>\S+)\s*$'         # 7087 or -
+)
+
+# Regex 2: Parse request into method/url/protocol
+REQ_RE = re.compile(
+    r'^(?P<method>\S+)\s+(?P<url>\S+)(?:\s+(?P<protocol>\S+))?$'
+)
+
+
+# Consecutive log lines mostly share the same second
+_TS_DECODER = ClfTimestampDecoder()
+
+
+def parse_ts(ts: str):
+    """Parse timestamp with timezone (same result as strptime with '%z')"""
+    return _TS_DECODER.datetime(ts)
+
+
+def split_request(req: str) -> tuple:
+    """Split a request string into (method, url, protocol); None when malformed"""
+    rm = REQ_RE.match(req)
+    if not rm:
+        return None, None, None
+    return rm.group("method"), rm.group("url"), rm.group("protocol")
+
+
+def parse_line(line: str):
+    """
+    Parse one log line (without its trailing newline).
+
+    Returns None when LOG_RE does not match. Otherwise returns the tuple
+    (timestamp, host, method, url, protocol, status, bytes); bytes is None
+    for '-' or a non-numeric field, and timestamp is None (with every later field None) when the
+    bracketed timestamp could not be parsed.
+    """
+    m = LOG_RE.match(line)
+    if not m:
+        return None
+    d = m.groupdict()
+
+    # timestamp
+    try:
+        ts = parse_ts(d["ts"])
+    except:
+        return None, d["host"], None, None, None, None, None
+
+    # status
+    status = int(d["status"])
+
+    # bytes: '-' (or any non-numeric field) => NaN
+    try:
+        bytes_ = int(d["bytes"])
+    except ValueError:
+        bytes_ = None
+
+    # request split
+    method, url, protocol = split_request(d["request"])
+
+    return ts, d["host"], method, url, protocol, status, bytes_
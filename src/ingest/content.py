@@ -0,0 +1,118 @@
+"""
+Content-class split of the traffic (static assets, HTML pages, scripts).
+
+Every URL is mapped to one of CONTENT_CLASSES by precompiled lookups:
+script prefixes (/cgi-bin/, /htbin/) and query strings first, then the
+lower-cased extension through one dict. Directory and extension-less
+paths count as HTML pages.
+
+Classification runs once per distinct URL: a block's URLs are factorized
+and only values not yet in the memo are classified, so the per-line cost
+is one hash lookup. ContentBins then keeps request and byte counters per
+class and bin (a TrafficBins with other columns), which roll up to
+coarser resolutions like the traffic counters do.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .aggregate import TrafficBins
+from .fastparse import BYTES_MISSING
+from .timestamps import from_datetime_index
+
+CONTENT_CLASSES = ("static", "html", "script", "other")
+STATIC, HTML, SCRIPT, OTHER = range(len(CONTENT_CLASSES))
+
+# Bin width of the per-class counters; coarser resolutions are rolled up from it
+CONTENT_FREQ = "1min"
+
+CONTENT_COLUMNS = (tuple(f"requests_{c}" for c in CONTENT_CLASSES)
+                   + tuple(f"bytes_{c}" for c in CONTENT_CLASSES))
+
+SCRIPT_PREFIXES = ("/cgi-bin/", "/htbin/")
+
+_SUFFIX_CLASS = {}
+_SUFFIX_CLASS.update(dict.fromkeys(
+    (".gif", ".jpg", ".jpeg", ".png", ".xbm", ".bmp", ".ico", ".tif", ".tiff", ".css", ".js",
+     ".mpg", ".mpeg", ".mov", ".avi", ".wav", ".au", ".aif", ".aiff", ".mp3",
+     ".pdf", ".ps", ".zip", ".gz", ".z", ".tar", ".txt", ".doc"), STATIC))
+_SUFFIX_CLASS.update(dict.fromkeys((".html", ".htm", ".shtml"), HTML))
+_SUFFIX_CLASS.update(dict.fromkeys((".pl", ".cgi", ".sh", ".exe", ".bat", ".php", ".asp"), SCRIPT))
+
+# Memo of classified URLs; cleared when it reaches the limit
+_MEMO = {}
+_MEMO_LIMIT = 1_000_000
+
+
+def classify_url(url: str) -> int:
+    """Content class (index into CONTENT_CLASSES) of one URL"""
+    if not isinstance(url, str):
+        return OTHER
+    path, _, query = url.partition("?")
+    if query or path.startswith(SCRIPT_PREFIXES):
+        return SCRIPT
+    name = path[path.rfind("/") + 1:]
+    dot = name.rfind(".")
+    if dot < 0:
+        # directory index or extension-less page
+        return HTML
+    return _SUFFIX_CLASS.get(name[dot:].lower(), OTHER)
+
+
+def classify_urls(urls) -> np.ndarray:
+    """Content classes (int8) of an array of URLs, classifying each distinct URL once"""
+    codes, uniques = pd.factorize(np.asarray(urls, dtype=object))
+    if len(_MEMO) + len(uniques) > _MEMO_LIMIT:
+        _MEMO.clear()
+    lut = np.empty(len(uniques) + 1, dtype=np.int8)
+    for i, url in enumerate(uniques):
+        cls = _MEMO.get(url)
+        if cls is None:
+            cls = _MEMO[url] = classify_url(url)
+        lut[i] = cls
+    # code -1 (None) indexes the trailing OTHER
+    lut[-1] = OTHER
+    return lut[codes]
+
+
+class ContentBins(TrafficBins):
+    """Requests and bytes per content class and time bin."""
+
+    COLUMNS = CONTENT_COLUMNS
+
+    def __init__(self, freq: str = CONTENT_FREQ, tz_offset: int = None):
+        super().__init__(freq, tz_offset)
+
+    def add(self, epoch: np.ndarray, tz_offset: np.ndarray, urls: np.ndarray, nbytes: np.ndarray):
+        """Fold records (epoch seconds, UTC offset minutes, url, bytes with BYTES_MISSING for '-')"""
+        if len(epoch) == 0:
+            return
+        if self.tz_offset is None:
+            self.tz_offset = int(tz_offset[0])
+
+        b = (np.asarray(epoch, dtype=np.int64) + self.tz_offset * 60) // self.width
+        lo, hi = int(b.min()), int(b.max())
+        self._reserve(lo, hi)
+        n = hi - lo + 1
+        k = len(CONTENT_CLASSES)
+
+        # one bincount per measure over (bin, class) pairs
+        pair = (b - lo) * k + classify_urls(urls)
+        nbytes = np.asarray(nbytes, dtype=np.float64)
+        weights = np.where((nbytes == BYTES_MISSING) | np.isnan(nbytes), 0.0, nbytes)
+        sums = np.empty((n, 2 * k), dtype=np.int64)
+        sums[:, :k] = np.bincount(pair, minlength=n * k).reshape(n, k)
+        sums[:, k:] = np.rint(np.bincount(pair, weights=weights, minlength=n * k)).reshape(n, k)
+
+        start = lo - self.first_bin
+        self._counts[start:start + n] += sums
+
+    def add_block(self, block: dict):
+        """Fold a parsed block that carries urls (fastparse fields=True)"""
+        self.add(block["epoch"], block["tz_offset"], block["url"], block["bytes"])
+
+    def add_frame(self, df: pd.DataFrame):
+        """Fold a parsed-log DataFrame (tz-aware 'timestamp' column, NaN bytes count as 0)"""
+        ok, epoch, tz_offset = from_datetime_index(df["timestamp"])
+        nbytes = df["bytes"].to_numpy(dtype=np.float64, na_value=np.nan)
+        self.add(epoch[ok], tz_offset[ok], df["url"].to_numpy(dtype=object)[ok], nbytes[ok])
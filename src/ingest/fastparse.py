@@ -0,0 +1,333 @@
+"""
+Vectorized whole-buffer Common Log Format parser.
+
+Instead of running LOG_RE line by line, the buffer is viewed as a uint8
+array and every field boundary is located with NumPy operations on the
+positions of newlines, brackets, quotes and spaces. Timestamp, status and
+bytes are decoded straight into typed arrays.
+
+Only lines with the canonical shape
+
+    host ident user [dd/Mon/yyyy:HH:MM:SS +zzzz] "request" ddd bytes
+
+(single spaces, no other whitespace) take the fast path. Everything else
+is handed to the regex parser in clf.py, so the result is always identical
+to parsing the same text with clf.parse_line().
+
+Returned blocks are dicts of column arrays in file order:
+- epoch:     int64 seconds since 1970-01-01 UTC
+- tz_offset: int16 UTC offset in minutes (-240 for -0400)
+- status:    int16
+- bytes:     int64, BYTES_MISSING for '-'
+- host, method, url, protocol: object arrays (only with fields=True)
+plus the scalar counters 'lines' and 'matched' (LOG_RE matches).
+"""
+
+import io
+import mmap
+import numpy as np
+
+from .clf import parse_line
+from .timestamps import TS_LEN, decode_fixed_width
+from .readers import is_compressed, iter_line_chunks
+
+# Sentinel stored in the bytes column for '-'
+BYTES_MISSING = -1
+
+# Read whole files in newline-aligned blocks of this size
+BLOCK_SIZE = 64 * 1024 * 1024
+
+# Longest bytes field decoded on the fast path (fits in int64)
+_MAX_BYTES_DIGITS = 18
+
+_NL, _CR, _SP = 10, 13, 32
+_LBRACKET, _RBRACKET, _QUOTE = ord("["), ord("]"), ord('"')
+
+# Bytes that Python's str-mode \s matches besides the plain space; lines
+# containing any of them are left to the regex path.
+_BAD_WS = np.zeros(256, dtype=bool)
+_BAD_WS[[9, 10, 11, 12, 13, 28, 29, 30, 31, 133, 160]] = True
+
+# Every byte the fast path needs the position of
+_SPECIAL = _BAD_WS.copy()
+_SPECIAL[[_SP, _LBRACKET, _RBRACKET, _QUOTE]] = True
+
+# Width of the fixed windows read at the timestamp and at the status field
+_WINDOW = 32
+
+
+def _first_at_or_after(positions: np.ndarray, starts: np.ndarray, missing: int) -> np.ndarray:
+    """For each start, the first value in sorted positions >= start (or missing)"""
+    idx = np.searchsorted(positions, starts)
+    out = np.full(len(starts), missing, dtype=np.int64)
+    ok = idx < len(positions)
+    out[ok] = positions[idx[ok]]
+    return out
+
+
+def _decode_uints(g: np.ndarray, length: np.ndarray) -> tuple:
+    """
+    Decode the first length[i] ASCII digits of each row of the uint8 array g.
+
+    Returns (ok, values); ok is False where a run contains a non-digit.
+    """
+    ok = np.ones(len(g), dtype=bool)
+    values = np.zeros(len(g), dtype=np.int64)
+    width = int(length.max()) if len(g) else 0
+    for k in range(width):
+        # Horner step for every run that is still longer than k
+        d = g[:, k] - np.uint8(48)
+        live = k < length
+        ok &= (d <= 9) | ~live
+        values = np.where(live, values * 10 + d, values)
+    return ok, values
+
+
+def _fast_lines(arr: np.ndarray, starts: np.ndarray, ends: np.ndarray, special: np.ndarray) -> dict:
+    """
+    Locate and decode every canonical line; returns the fast-path mask and
+    the field positions/values for the lines where it is True.
+
+    special holds the sorted positions of every byte flagged in _SPECIAL.
+    """
+    n = len(arr)
+    count = len(starts)
+    kind = arr[special]
+    spaces = special[kind == _SP]
+    bad = special[_BAD_WS[kind]]
+
+    def count_in(positions, a, b):
+        return np.searchsorted(positions, b) - np.searchsorted(positions, a)
+
+    def gather(positions, idx):
+        """positions[idx], or n where idx falls outside positions"""
+        out = np.full(len(idx), n, dtype=np.int64)
+        inside = (idx >= 0) & (idx < len(positions))
+        out[inside] = positions[idx[inside]]
+        return out
+
+    ok = (ends > starts) & (count_in(bad, starts, ends) == 0)
+
+    lb = _first_at_or_after(special[kind == _LBRACKET], starts, n)
+    rb = _first_at_or_after(special[kind == _RBRACKET], np.minimum(lb + 1, n), n)
+    quotes = special[kind == _QUOTE]
+    q1 = _first_at_or_after(quotes, np.minimum(rb + 1, n), n)
+    q2 = _first_at_or_after(quotes, np.minimum(q1 + 1, n), n)
+
+    # host ident user: exactly three single-space separated tokens before '['
+    i0 = np.searchsorted(spaces, starts)
+    sp0, sp1, sp2, sp3, sp4 = (gather(spaces, i0 + k) for k in range(5))
+    ok &= (sp0 > starts) & (sp1 > sp0 + 1) & (sp2 > sp1 + 1) & (sp2 == lb - 1) & (lb < ends)
+
+    # [timestamp] "request" ddd bytes
+    ok &= rb == lb + 1 + TS_LEN
+    ok &= (q1 == rb + 2) & (q2 + 6 < ends)
+    # the only other spaces before the request: inside the timestamp and after ']'
+    ok &= (sp3 == lb + 21) & (sp4 == rb + 1)
+
+    # ' ddd ' after the request, and no space inside the bytes field
+    last_sp = gather(spaces, np.searchsorted(spaces, ends) - 1)
+    ok &= last_sp == q2 + 5
+    b_len = ends - q2 - 6
+    ok &= b_len <= _MAX_BYTES_DIGITS
+
+    # fixed-width windows: 26 timestamp bytes / status + bytes field
+    sel = np.flatnonzero(ok)
+    padded = np.zeros(n + _WINDOW, dtype=np.uint8)
+    padded[:n] = arr
+    windows = np.lib.stride_tricks.sliding_window_view(padded, _WINDOW)
+    ts_ok, epoch, tz_offset = decode_fixed_width(windows[lb[sel] + 1])
+
+    q2s = q2[sel]
+    tail = windows[q2s + 1]
+    ts_ok &= tail[:, 0] == _SP
+    sd = tail[:, 1:4] - np.uint8(48)
+    ts_ok &= (sd <= 9).all(axis=1)
+    sd = sd.astype(np.int16)
+    status = sd[:, 0] * 100 + sd[:, 1] * 10 + sd[:, 2]
+
+    # bytes: '-' or digits
+    lens = b_len[sel]
+    digits = tail[:, 5:5 + _MAX_BYTES_DIGITS]
+    is_dash = (lens == 1) & (digits[:, 0] == ord("-"))
+    num_ok, nbytes = _decode_uints(digits, lens)
+    ts_ok &= is_dash | num_ok
+    nbytes[is_dash] = BYTES_MISSING
+
+    keep = ts_ok
+    sel = sel[keep]
+    mask = np.zeros(count, dtype=bool)
+    mask[sel] = True
+    return {
+        "mask": mask,
+        "index": sel,
+        "epoch": epoch[keep],
+        "tz_offset": tz_offset[keep],
+        "status": status[keep],
+        "bytes": nbytes[keep],
+        "host_end": sp0[sel],
+        "req_start": q1[sel] + 1,
+        "req_end": q2s[keep],
+    }
+
+
+def _split_requests(text: str, starts: np.ndarray, ends: np.ndarray) -> tuple:
+    """Split request strings into method/url/protocol lists (REQ_RE semantics)"""
+    method, url, protocol = [], [], []
+    for a, b in zip(starts.tolist(), ends.tolist()):
+        req = text[a:b]
+        parts = req.split()
+        # REQ_RE: 2 or 3 tokens, no leading/trailing whitespace
+        if 2 <= len(parts) <= 3 and req[:1] != " " and req[-1:] != " ":
+            method.append(parts[0])
+            url.append(parts[1])
+            protocol.append(parts[2] if len(parts) == 3 else None)
+        else:
+            method.append(None)
+            url.append(None)
+            protocol.append(None)
+    return method, url, protocol
+
+
+def _fallback_lines(buf, starts: np.ndarray, ends: np.ndarray, terminated: np.ndarray):
+    """Yield (line_no, text) for lines left to the regex path, split like text-mode open()"""
+    for i, a, b, t in zip(range(len(starts)), starts.tolist(), ends.tolist(), terminated.tolist()):
+        raw = bytes(buf[a:b + 1 if t else b])
+        if b"\r" not in raw:
+            yield i, raw.decode("latin-1").rstrip("\n")
+            continue
+        # universal newlines: a bare '\r' also ends a line
+        for line in io.TextIOWrapper(io.BytesIO(raw), encoding="latin-1", errors="replace"):
+            yield i, line.rstrip("\n")
+
+
+def parse_clf_buffer(buf, fields: bool = False) -> dict:
+    """
+    Parse a bytes-like buffer of log lines into typed column arrays.
+
+    Line splitting follows text-mode open() (universal newlines), so the
+    rows, 'lines' and 'matched' counters match a LOG_RE loop over the same
+    text. With fields=True host/method/url/protocol are materialised too.
+    """
+    arr = np.frombuffer(buf, dtype=np.uint8)
+    n = len(arr)
+    # cheap superset of _SPECIAL by comparisons, refined on the few hits
+    flagged = arr <= _QUOTE
+    flagged |= arr == _LBRACKET
+    flagged |= arr == _RBRACKET
+    flagged |= arr >= 133
+    special = np.flatnonzero(flagged)
+    special = special[_SPECIAL[arr[special]]]
+    nl = special[arr[special] == _NL]
+    starts = np.concatenate(([0], nl + 1)).astype(np.int64)
+    ends = np.concatenate((nl, [n])).astype(np.int64)
+    terminated = np.concatenate((np.ones(len(nl), dtype=bool), [False]))
+    if n == 0 or arr[-1] == _NL:
+        starts, ends, terminated = starts[:-1], ends[:-1], terminated[:-1]
+
+    # '\r\n' counts as a single terminator
+    crlf = terminated & (ends > starts)
+    crlf[crlf] = arr[ends[crlf] - 1] == _CR
+    content_ends = ends - crlf
+
+    fast = _fast_lines(arr, starts, content_ends, special)
+    sel = fast["index"]
+    line_no = sel.astype(np.int64)
+    epoch, tz_offset = fast["epoch"], fast["tz_offset"]
+    status, nbytes = fast["status"], fast["bytes"]
+
+    if fields:
+        text = bytes(buf).decode("latin-1")
+        host = [text[a:b] for a, b in zip(starts[sel].tolist(), fast["host_end"].tolist())]
+        method, url, protocol = _split_requests(text, fast["req_start"], fast["req_end"])
+
+    # regex path for everything the fast path rejected
+    slow = np.flatnonzero(~fast["mask"])
+    lines = len(starts)
+    matched = len(sel)
+    fb_rows = []
+    for i, line in _fallback_lines(buf, starts[slow], ends[slow], terminated[slow]):
+        lines += 1
+        rec = parse_line(line)
+        if rec is None:
+            continue
+        matched += 1
+        if rec[0] is not None:
+            fb_rows.append((int(slow[i]),) + rec)
+    # each rejected line was counted once above before being re-split
+    lines -= len(slow)
+
+    if fb_rows:
+        fb_no = np.array([r[0] for r in fb_rows], dtype=np.int64)
+        fb_off = np.array([r[1].utcoffset().total_seconds() // 60 for r in fb_rows], dtype=np.int64)
+        fb_epoch = np.array([int(r[1].timestamp()) for r in fb_rows], dtype=np.int64)
+        fb_status = np.array([r[6] for r in fb_rows], dtype=np.int64)
+        fb_bytes = np.array([BYTES_MISSING if r[7] is None else r[7] for r in fb_rows], dtype=np.int64)
+
+        order = np.argsort(np.concatenate((line_no, fb_no)), kind="stable")
+        epoch = np.concatenate((epoch, fb_epoch))[order]
+        tz_offset = np.concatenate((tz_offset, fb_off))[order]
+        status = np.concatenate((status, fb_status))[order]
+        nbytes = np.concatenate((nbytes, fb_bytes))[order]
+        if fields:
+            order = order.tolist()
+            merged = []
+            for fast_col, k in ((host, 2), (method, 3), (url, 4), (protocol, 5)):
+                col = fast_col + [r[k] for r in fb_rows]
+                merged.append([col[j] for j in order])
+            host, method, url, protocol = merged
+
+    block = {
+        "epoch": epoch.astype(np.int64),
+        "tz_offset": tz_offset.astype(np.int16),
+        "status": status.astype(np.int16),
+        "bytes": nbytes.astype(np.int64),
+        "lines": lines,
+        "matched": matched,
+    }
+    if fields:
+        block["host"] = np.array(host, dtype=object)
+        block["method"] = np.array(method, dtype=object)
+        block["url"] = np.array(url, dtype=object)
+        block["protocol"] = np.array(protocol, dtype=object)
+    return block
+
+
+def concat_blocks(blocks: list, fields: bool = False) -> dict:
+    """Concatenate parsed blocks (same fields) into one block"""
+    if not blocks:
+        return parse_clf_buffer(b"", fields=fields)
+    out = {k: np.concatenate([b[k] for b in blocks]) for k in blocks[0] if k not in ("lines", "matched")}
+    out["lines"] = sum(b["lines"] for b in blocks)
+    out["matched"] = sum(b["matched"] for b in blocks)
+    return out
+
+
+def iter_clf_blocks(path: str, fields: bool = False, block_size: int = BLOCK_SIZE):
+    """
+    Memory-map a log file and yield parsed blocks of about block_size bytes.
+    Compressed logs are streamed through a decompression thread instead.
+    """
+    if is_compressed(path):
+        for chunk in iter_line_chunks(path, chunk_size=block_size):
+            yield parse_clf_buffer(chunk, fields=fields)
+        return
+    with open(path, "rb") as f:
+        size = f.seek(0, 2)
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = 0
+            while start < size:
+                end = min(start + block_size, size)
+                if end < size:
+                    cut = mm.rfind(b"\n", start, end)
+                    # a single line longer than block_size: extend to its end
+                    end = cut + 1 if cut >= 0 else (mm.find(b"\n", end) + 1 or size)
+                yield parse_clf_buffer(memoryview(mm)[start:end], fields=fields)
+                start = end
+
+
+def parse_clf_file(path: str, fields: bool = False, block_size: int = BLOCK_SIZE) -> dict:
+    """Parse a whole log file with the vectorized parser"""
+    return concat_blocks(list(iter_clf_blocks(path, fields=fields, block_size=block_size)), fields=fields)
@@ -0,0 +1,199 @@
+"""
+Incremental (tail-mode) ingest with persisted byte-offset checkpoints.
+
+Instead of re-parsing every log from the start on each run, IncrementalIngest
+remembers, per input file, how far it has read (offset of the last complete
+line), the file's inode and a fingerprint of its first bytes, together with
+the accumulated base-resolution TrafficBins. The next run parses only the
+newly appended lines and folds them into the saved bins; a bin that was
+still filling up (the partial last bin) simply keeps accumulating.
+
+Log rotation is detected by an inode change, a shrinking file (truncation)
+or a changed fingerprint. The unread tail of the old file is drained from
+'<path>.1' when the rotated file is still there, then the new file is read
+from offset 0.
+
+Compressed archives (.gz/.bz2) cannot be tailed: they are ingested once
+and skipped on later runs while their inode and size are unchanged.
+
+Everything is saved in a single compressed .npz (per-second bins are
+mostly zeros) written atomically, so bins and offsets can never get out
+of step.
+
+Only the last CHECKPOINT_RETENTION of bins is kept: compact() moves the
+floor up to the local midnight before that horizon and drops the bins
+below it, which are final and live on in the exported tables. Lines that
+still arrive for bins below the floor are dropped by drop_late().
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from .aggregate import TrafficBins
+from .fastparse import BLOCK_SIZE, iter_clf_blocks, parse_clf_buffer
+from .readers import is_compressed
+
+# Bytes at the start of a file hashed to recognise it after rotation
+FINGERPRINT_BYTES = 1024
+
+# Suffixes tried (in order) when looking for the rotated-away file
+ROTATED_SUFFIXES = (".1",)
+
+# Seconds of bins kept before the newest one (the floor is rounded down to a local midnight)
+CHECKPOINT_RETENTION = 86400
+
+
+def _fingerprint(path: str, length: int) -> str:
+    """Hash of the first min(length, FINGERPRINT_BYTES) bytes"""
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read(min(length, FINGERPRINT_BYTES))).hexdigest()
+
+
+class IncrementalIngest:
+    """Checkpointed append-only ingest of access logs into TrafficBins."""
+
+    def __init__(self, state_path: str, freq: str = "1min", block_size: int = BLOCK_SIZE):
+        self.state_path = state_path
+        self.freq = freq
+        self.block_size = block_size
+        self.checkpoints = {}
+        self.bins = TrafficBins(freq)
+        # first bin still kept (everything before it is final), None before the first compact()
+        self.floor = None
+        if os.path.exists(state_path):
+            self.load()
+
+    def load(self):
+        """Read bins and checkpoints from state_path"""
+        with np.load(self.state_path) as z:
+            state = {k: z[k] for k in z.files}
+        self.checkpoints = json.loads(str(state.pop("checkpoints")))
+        floor = state.pop("floor", None)
+        self.floor = None if floor is None else int(floor)
+        self.bins = TrafficBins.from_state(self.freq, state)
+
+    def save(self):
+        """Write bins and checkpoints atomically"""
+        floor = {} if self.floor is None else {"floor": np.int64(self.floor)}
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, checkpoints=np.array(json.dumps(self.checkpoints)), **floor,
+                                **self.bins.state())
+        os.replace(tmp, self.state_path)
+
+    def drop_late(self) -> int:
+        """Drop bins below the floor (lines for already final bins); returns the requests dropped"""
+        if self.floor is None or self.bins.first_bin is None or self.bins.first_bin >= self.floor:
+            return 0
+        late = self.bins.window(self.bins.first_bin, self.floor).total()
+        self.bins.trim(self.floor)
+        return late
+
+    def compact(self, retention: int = CHECKPOINT_RETENTION):
+        """Raise the floor to the local midnight before newest bin - retention and drop the bins below it"""
+        if self.bins.first_bin is None:
+            return
+        day = 86400 // self.bins.width
+        newest = self.bins.first_bin + self.bins.n_bins - 1
+        floor = (newest - retention // self.bins.width) // day * day
+        if self.floor is None or floor > self.floor:
+            self.floor = floor
+        self.bins.trim(self.floor)
+
+    def _fold(self, path: str, start: int, final: bool) -> tuple:
+        """
+        Parse path from byte offset start and fold records into the bins.
+
+        Stops after the last complete line unless final (a rotated file that
+        will not grow any more). Returns (new offset, lines, matched).
+        """
+        offset, lines, matched = start, 0, 0
+        with open(path, "rb") as f:
+            f.seek(start)
+            tail = b""
+            while True:
+                chunk = f.read(self.block_size)
+                if not chunk:
+                    break
+                data = tail + chunk
+                cut = data.rfind(b"\n") + 1
+                tail = data[cut:]
+                if cut == 0:
+                    continue
+                block = parse_clf_buffer(data[:cut])
+                self.bins.add_block(block)
+                offset += cut
+                lines += block["lines"]
+                matched += block["matched"]
+            if final and tail:
+                block = parse_clf_buffer(tail)
+                self.bins.add_block(block)
+                offset += len(tail)
+                lines += block["lines"]
+                matched += block["matched"]
+        return offset, lines, matched
+
+    def _rotated(self, path: str, cp: dict, st: os.stat_result) -> bool:
+        """True when path is no longer the file the checkpoint refers to"""
+        if st.st_ino != cp["inode"] or st.st_size < cp["offset"]:
+            return True
+        return cp["offset"] > 0 and _fingerprint(path, cp["offset"]) != cp["fingerprint"]
+
+    def _drain_rotated(self, path: str, cp: dict) -> tuple:
+        """Finish the unread tail of the rotated-away file, if it can be found"""
+        for suffix in ROTATED_SUFFIXES:
+            old = path + suffix
+            if not os.path.exists(old):
+                continue
+            st = os.stat(old)
+            if st.st_ino == cp["inode"] and st.st_size >= cp["offset"]:
+                print(f"  Rotation detected, draining {old} from byte {cp['offset']:,}")
+                _, lines, matched = self._fold(old, cp["offset"], final=True)
+                return lines, matched
+        print("  Rotation detected, rotated file not found; unread tail is lost")
+        return 0, 0
+
+    def _update_archive(self, key: str, path: str, st: os.stat_result, cp: dict) -> tuple:
+        """Ingest a compressed archive once; it must not change afterwards"""
+        if cp is not None:
+            if cp["inode"] == st.st_ino and cp["offset"] == st.st_size:
+                return 0, 0
+            raise ValueError(f"Compressed log changed since it was ingested: {path}")
+        lines = matched = 0
+        for block in iter_clf_blocks(path, block_size=self.block_size):
+            self.bins.add_block(block)
+            lines += block["lines"]
+            matched += block["matched"]
+        self.checkpoints[key] = {"inode": st.st_ino, "offset": st.st_size, "fingerprint": ""}
+        return lines, matched
+
+    def update(self, path: str) -> tuple:
+        """
+        Ingest whatever was appended to path since the last checkpoint.
+
+        Returns (lines, matched) parsed in this call.
+        """
+        key = os.path.abspath(path)
+        st = os.stat(path)
+        cp = self.checkpoints.get(key)
+        if is_compressed(path):
+            return self._update_archive(key, path, st, cp)
+        lines = matched = 0
+
+        start = 0
+        if cp is not None:
+            if self._rotated(path, cp, st):
+                lines, matched = self._drain_rotated(path, cp)
+            else:
+                start = cp["offset"]
+
+        offset, new_lines, new_matched = self._fold(path, start, final=False)
+        self.checkpoints[key] = {
+            "inode": st.st_ino,
+            "offset": offset,
+            "fingerprint": _fingerprint(path, offset),
+        }
+        return lines + new_lines, matched + new_matched
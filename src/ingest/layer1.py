@@ -0,0 +1,224 @@
+"""
+Columnar, dictionary-encoded store for the Layer 1 parsed logs.
+
+Replaces the per-request CSVs (nasa_logs_parsed.csv / nasa_logs_clean.csv),
+which repeat host, url, method and protocol as text on every row. Layout:
+
+    <store>/
+        meta.json                 schema, UTC offset, partitions
+        dict_<column>.json        one global dictionary per text column
+        day=1995-07-01/
+            timestamp.npy         int64 epoch seconds (UTC)
+            status.npy            int16
+            bytes.npy             int32, BYTES_MISSING for '-'
+            <text column>.npy     int8/16/32 dictionary codes, -1 for None
+        day=1995-07-02/ ...
+
+Partitions hold one local calendar day each, so readers can load only the
+columns and days they need (np.load with mmap_mode is used for this).
+A row's day follows its own UTC offset. When the offsets differ (a zone
+with DST, or timestamps from several zones) every partition also holds
+tz_offset.npy (int16 minutes), and meta.json has tz_offset null.
+"""
+
+import json
+import os
+import shutil
+from datetime import timezone
+
+import numpy as np
+import pandas as pd
+
+from .fastparse import BYTES_MISSING
+from .timestamps import to_datetime_index
+
+FORMAT_VERSION = 1
+
+# Numeric columns with a fixed on-disk type
+_FIXED_DTYPES = {"status": np.int16, "bytes": np.int32}
+
+
+def _code_dtype(n_values: int):
+    """Smallest signed integer type that holds codes 0..n_values-1 and -1"""
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_values <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def _day_name(day: int) -> str:
+    return "day=" + str(np.datetime64(day, "D"))
+
+
+def _timestamps_and_offsets(values: pd.Series) -> tuple:
+    """(UTC epoch seconds, UTC offset minutes per row, zone name or None) of tz-aware timestamps"""
+    if isinstance(values.dtype, pd.DatetimeTZDtype):
+        ts = pd.DatetimeIndex(values)
+        utc = ts.tz_convert("UTC").tz_localize(None)
+        epoch = ((utc - pd.Timestamp(0)) // pd.Timedelta(seconds=1)).to_numpy(np.int64)
+        offsets = ((ts.tz_localize(None) - utc) // pd.Timedelta(minutes=1)).to_numpy(np.int16)
+        zone = None if isinstance(ts.tz, timezone) else str(ts.tz)
+        return epoch, offsets, zone
+    # object column of Timestamps with different fixed offsets
+    try:
+        utc = pd.DatetimeIndex(pd.to_datetime(values, utc=True)).tz_localize(None)
+        offsets = np.array([t.utcoffset().total_seconds() // 60 for t in values], dtype=np.int16)
+    except (TypeError, AttributeError, ValueError):
+        raise ValueError("Layer 1 store needs tz-aware timestamps")
+    epoch = ((utc - pd.Timestamp(0)) // pd.Timedelta(seconds=1)).to_numpy(np.int64)
+    return epoch, offsets, None
+
+
+def write_layer1(df: pd.DataFrame, path: str) -> dict:
+    """
+    Write a parsed-log DataFrame (tz-aware 'timestamp' column) to a store.
+
+    Text columns are dictionary-encoded, 'status' is stored as int16 and
+    'bytes' as int32 with NaN mapped to BYTES_MISSING. Rows keep their
+    original order inside each day, which is the local day of the row's
+    own UTC offset. Returns the metadata written.
+    """
+    if "timestamp" not in df.columns:
+        raise ValueError("Layer 1 store needs a 'timestamp' column")
+
+    if df["timestamp"].dtype.kind == "M" and not isinstance(df["timestamp"].dtype, pd.DatetimeTZDtype):
+        raise ValueError("Layer 1 store needs tz-aware timestamps")
+    epoch, offsets, zone = _timestamps_and_offsets(df["timestamp"])
+    mixed = len(np.unique(offsets)) > 1
+    tz_offset = None if mixed else int(offsets[0]) if len(offsets) else 0
+    local_day = (epoch + offsets.astype(np.int64) * 60) // 86400
+
+    # encode every column once, globally
+    columns = {"timestamp": epoch}
+    if mixed:
+        columns["tz_offset"] = offsets
+    schema = {"timestamp": {"kind": "epoch"}}
+    dictionaries = {}
+    for col in df.columns:
+        if col == "timestamp":
+            continue
+        values = df[col]
+        if col in _FIXED_DTYPES or values.dtype.kind in "iufb":
+            nullable = bool(values.isna().any())
+            dtype = _FIXED_DTYPES.get(col, values.dtype if values.dtype.kind != "f" else np.float64)
+            if col == "bytes":
+                arr = values.fillna(BYTES_MISSING).to_numpy(np.int64)
+                if arr.size and arr.max() > np.iinfo(np.int32).max:
+                    dtype = np.int64
+                columns[col] = arr.astype(dtype)
+            else:
+                columns[col] = values.to_numpy(dtype)
+            schema[col] = {"kind": "numeric", "dtype": np.dtype(dtype).name,
+                           "nullable": nullable,
+                           # numpy type behind nullable extension columns (Int32 bytes -> int32)
+                           "source_dtype": getattr(values.dtype, "numpy_dtype", values.dtype).name}
+        else:
+            codes, uniques = pd.factorize(values, use_na_sentinel=True)
+            dictionaries[col] = [str(u) for u in uniques]
+            columns[col] = codes.astype(_code_dtype(len(uniques)))
+            schema[col] = {"kind": "dict", "dtype": columns[col].dtype.name}
+
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    os.makedirs(path)
+
+    order = np.argsort(local_day, kind="stable")
+    days, starts = np.unique(local_day[order], return_index=True)
+    bounds = list(starts) + [len(order)]
+    partitions = []
+    for day, lo, hi in zip(days, bounds[:-1], bounds[1:]):
+        rows = order[lo:hi]
+        if hi - lo == len(order) or np.all(np.diff(rows) == 1):
+            rows = slice(rows[0], rows[-1] + 1)
+        name = _day_name(int(day))
+        os.makedirs(os.path.join(path, name))
+        for col, arr in columns.items():
+            np.save(os.path.join(path, name, f"{col}.npy"), arr[rows])
+        partitions.append({"name": name, "rows": int(hi - lo)})
+
+    for col, values in dictionaries.items():
+        with open(os.path.join(path, f"dict_{col}.json"), "w", encoding="utf-8") as f:
+            json.dump(values, f, ensure_ascii=False)
+
+    meta = {
+        "version": FORMAT_VERSION,
+        "tz_offset": tz_offset,
+        "tz": zone,
+        "columns": list(df.columns),
+        "schema": schema,
+        "partitions": partitions,
+        "rows": int(len(df)),
+    }
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def read_layer1_meta(path: str) -> dict:
+    """Metadata of a Layer 1 store"""
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported Layer 1 store version: {meta.get('version')}")
+    return meta
+
+
+def layer1_days(path: str) -> list:
+    """Local calendar days ('1995-07-01', ...) present in a store"""
+    return [p["name"][len("day="):] for p in read_layer1_meta(path)["partitions"]]
+
+
+def read_layer1(path: str, columns: list = None, days: list = None, categorical: bool = False) -> pd.DataFrame:
+    """
+    Load (a subset of) a Layer 1 store back into a DataFrame.
+
+    columns: names to load (default all); days: local days to load as
+    'YYYY-MM-DD' strings (default all). Text columns come back as object
+    columns, or as pandas Categoricals with categorical=True (cheaper).
+    """
+    meta = read_layer1_meta(path)
+    schema = meta["schema"]
+    columns = list(meta["columns"]) if columns is None else list(columns)
+    unknown = [c for c in columns if c not in schema]
+    if unknown:
+        raise KeyError(f"Columns not in Layer 1 store: {unknown}")
+
+    parts = meta["partitions"]
+    if days is not None:
+        wanted = {"day=" + str(d) for d in days}
+        parts = [p for p in parts if p["name"] in wanted]
+
+    out = {}
+    for col in columns:
+        chunks = [np.load(os.path.join(path, p["name"], f"{col}.npy"), mmap_mode="r") for p in parts]
+        dtype = "int64" if col == "timestamp" else schema[col]["dtype"]
+        arr = np.concatenate(chunks) if chunks else np.zeros(0, dtype=dtype)
+        info = schema[col]
+
+        if info["kind"] == "epoch":
+            if meta["tz_offset"] is None:
+                offsets = np.concatenate([np.load(os.path.join(path, p["name"], "tz_offset.npy")) for p in parts]
+                                         or [np.zeros(0, dtype=np.int16)])
+            else:
+                offsets = np.full(len(arr), meta["tz_offset"], dtype=np.int16)
+            out[col] = to_datetime_index(arr, offsets)
+            if meta.get("tz"):
+                out[col] = out[col].tz_convert(meta["tz"])
+        elif info["kind"] == "dict":
+            with open(os.path.join(path, f"dict_{col}.json"), encoding="utf-8") as f:
+                values = json.load(f)
+            if categorical:
+                out[col] = pd.Categorical.from_codes(arr.astype(np.int64), categories=values)
+            else:
+                # -1 (None) indexes the trailing None
+                lut = np.empty(len(values) + 1, dtype=object)
+                lut[:-1] = values
+                out[col] = lut[arr]
+        elif col == "bytes" and info["nullable"]:
+            out[col] = np.where(arr == BYTES_MISSING, np.nan, arr.astype(np.float64))
+        else:
+            # widen back to the in-memory type (e.g. int64 bytes); text-typed numbers stay compact
+            source = np.dtype(info["source_dtype"]) if info["source_dtype"] != "object" else None
+            out[col] = np.asarray(arr).astype(source if source is not None and source.kind in "iufb" else info["dtype"])
+
+    return pd.DataFrame(out, columns=columns)
@@ -0,0 +1,368 @@
+"""
+Live ingest: an asyncio listener that folds access-log lines sent over the
+network (TCP streams and UDP syslog datagrams) into in-memory TrafficBins.
+
+- TCP: one reader per connection. Reads are cut at the last newline, and
+  the partial line is kept per connection until its newline arrives.
+  Complete chunks go into a bounded queue, and a reader blocks on a full
+  queue. It then stops reading its socket, so TCP flow control pushes back
+  on the sender.
+- UDP: datagrams (one or more lines each) are appended to a bounded buffer.
+  UDP cannot push back, so datagrams beyond UDP_BUFFER_BYTES are dropped
+  and counted.
+- A syslog header ("<PRI>Mmm dd hh:mm:ss host tag: ") in front of a line is
+  stripped. Plain CLF lines pass through unchanged.
+
+A single consumer task drains the queue in batches of up to BATCH_BYTES.
+Each batch is parsed with the vectorized fastparse parser in a worker
+thread, so the event loop keeps serving sockets meanwhile. The result is
+added to the bins on the loop thread, which is the same thread the API
+handlers read them from, so no lock is needed. Bins older than the
+retention window are trimmed.
+
+Event time, not arrival order, decides where a line counts. The watermark
+trails the newest event time seen (capped at the wall clock) by
+ALLOWED_LATENESS. Bins ending after
+the watermark stay open and late lines are added to them in place (bins
+are a dense array indexed by bin number, so nothing is ever re-sorted).
+Once the watermark passes the end of a bin, the bin is closed: it is final,
+handed to the subscribers, and lines that still arrive for it are dropped
+and counted as late.
+
+Lines with an implausible event time (behind the watermark by more than the
+retention, ahead of the wall clock by more than FUTURE_SLACK, or further than
+LIVE_MAX_SPAN past the open bins) are dropped and counted as out of range
+before they reach the bins, so one clock-skewed line cannot allocate years
+of bins or move the watermark.
+"""
+
+import asyncio
+import re
+import socket
+import time
+
+import numpy as np
+
+from .aggregate import TrafficBins, freq_to_seconds
+from .fastparse import parse_clf_buffer
+
+# Address and ports (TCP and UDP) the listener binds
+LIVE_HOST = "0.0.0.0"
+LIVE_PORT = 5140
+
+# Width of the live bins; coarser views are rolled up on read
+LIVE_FREQ = "1s"
+
+# Seconds of bins kept in memory
+LIVE_RETENTION = 6 * 3600
+
+# Seconds the watermark trails the newest event time (how late a line may arrive)
+ALLOWED_LATENESS = 60
+
+# Seconds a line's event time may run ahead of the wall clock before it is dropped as skewed
+FUTURE_SLACK = 300
+
+# Seconds past the oldest open bin a line may land (bounds the bins a skewed line can
+# allocate; long enough for a replayed log with a multi-day gap)
+LIVE_MAX_SPAN = 7 * 86400
+
+# Bytes read from a TCP connection at a time
+READ_SIZE = 256 * 1024
+
+# Longest partial line buffered per connection before it is discarded
+MAX_LINE = 64 * 1024
+
+# Queued TCP chunks before readers block (backpressure)
+QUEUE_CHUNKS = 256
+
+# Buffered UDP bytes before datagrams are dropped
+UDP_BUFFER_BYTES = 64 * 1024 * 1024
+
+# Kernel receive buffer requested for the UDP socket (absorbs bursts between loop turns;
+# capped by net.core.rmem_max)
+UDP_RCVBUF = 32 * 1024 * 1024
+
+# Bytes parsed per batch, and the longest wait for a batch to fill
+BATCH_BYTES = 8 * 1024 * 1024
+BATCH_DELAY = 0.1
+
+# "<PRI>" plus an optional RFC 3164 timestamp/host/tag in front of a line
+_SYSLOG_HEADER = re.compile(rb"^<\d{1,3}>(?:[A-Z][a-z]{2} [ \d]\d \d\d:\d\d:\d\d \S+ [^\s:]*: ?)?", re.M)
+
+
+def strip_syslog(buf: bytes) -> bytes:
+    """Remove syslog headers in front of the lines of buf (no-op for plain lines)"""
+    if buf.startswith(b"<") or b"\n<" in buf:
+        return _SYSLOG_HEADER.sub(b"", buf)
+    return buf
+
+
+def _select(block: dict, mask: np.ndarray) -> dict:
+    """Records of a parsed block where mask is set (counters are kept)"""
+    n = len(block["epoch"])
+    return {k: v[mask] if isinstance(v, np.ndarray) and len(v) == n else v for k, v in block.items()}
+
+
+class _UdpProtocol(asyncio.DatagramProtocol):
+    def __init__(self, ingest: "LiveIngest"):
+        self.ingest = ingest
+
+    def datagram_received(self, data: bytes, addr):
+        self.ingest._push_datagram(data)
+
+
+class LiveIngest:
+    """Network log listener feeding live TrafficBins."""
+
+    def __init__(self, freq: str = LIVE_FREQ, retention: int = LIVE_RETENTION,
+                 allowed_lateness: int = ALLOWED_LATENESS, max_span: int = LIVE_MAX_SPAN,
+                 queue_chunks: int = QUEUE_CHUNKS, batch_bytes: int = BATCH_BYTES):
+        width = freq_to_seconds(freq)
+        # held bins: up to twice the retention (trim is amortised) plus the open span
+        self.bins = TrafficBins(freq, max_bins=(2 * retention + max_span) // width + 2)
+        self.retention = retention
+        self.allowed_lateness = allowed_lateness
+        self.max_span = max_span
+        self.queue_chunks = queue_chunks
+        self.batch_bytes = batch_bytes
+        self.stats = {"connections": 0, "lines": 0, "matched": 0, "bytes": 0, "batches": 0,
+                      "late": 0, "out_of_range": 0, "closed_bins": 0, "dropped_datagrams": 0, "dropped_partial_lines": 0}
+        self.started_at = None
+        self._queue = None
+        self._udp_parts = []
+        self._udp_bytes = 0
+        self._servers = []
+        self._transports = []
+        self._consumer = None
+        self._latest = None
+        # first bin still open (every bin before it is final), None before the first line
+        self.closed_until = None
+        self._subscribers = []
+
+    @property
+    def running(self) -> bool:
+        return self._consumer is not None and not self._consumer.done()
+
+    async def start(self, host: str = LIVE_HOST, tcp_port: int = LIVE_PORT, udp_port: int = LIVE_PORT):
+        """Bind the TCP/UDP listeners (a port of None skips that transport) and start consuming"""
+        loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.queue_chunks)
+        if tcp_port is not None:
+            self._servers.append(await asyncio.start_server(self._handle_tcp, host, tcp_port,
+                                                            limit=READ_SIZE))
+        if udp_port is not None:
+            transport, _ = await loop.create_datagram_endpoint(lambda: _UdpProtocol(self),
+                                                               local_addr=(host, udp_port))
+            try:
+                transport.get_extra_info("socket").setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, UDP_RCVBUF)
+            except OSError:
+                pass
+            self._transports.append(transport)
+        self.started_at = time.time()
+        self._consumer = asyncio.create_task(self._consume())
+
+    async def stop(self):
+        """Close the listeners, fold whatever is still queued and close the open bins"""
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        for transport in self._transports:
+            transport.close()
+        self._servers, self._transports = [], []
+        if self._consumer is not None:
+            self._consumer.cancel()
+            try:
+                await self._consumer
+            except asyncio.CancelledError:
+                pass
+            self._consumer = None
+        while self._queue is not None and (not self._queue.empty() or self._udp_parts):
+            await self._drain_once(wait=False)
+        self._close_bins(final=True)
+
+    async def _handle_tcp(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.stats["connections"] += 1
+        pending = b""
+        try:
+            while True:
+                data = await reader.read(READ_SIZE)
+                if not data:
+                    break
+                cut = data.rfind(b"\n")
+                if cut < 0:
+                    pending += data
+                    if len(pending) > MAX_LINE:
+                        self.stats["dropped_partial_lines"] += 1
+                        pending = b""
+                    continue
+                chunk = pending + data[:cut + 1] if pending else data[:cut + 1]
+                pending = data[cut + 1:]
+                # blocks while the queue is full: the socket is not read meanwhile
+                await self._queue.put(chunk)
+            if pending:
+                await self._queue.put(pending + b"\n")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _push_datagram(self, data: bytes):
+        if self._udp_bytes + len(data) > UDP_BUFFER_BYTES:
+            self.stats["dropped_datagrams"] += 1
+            return
+        if not data.endswith(b"\n"):
+            data += b"\n"
+        self._udp_parts.append(data)
+        self._udp_bytes += len(data)
+
+    async def _next_batch(self, wait: bool) -> bytes:
+        """Up to batch_bytes of queued TCP chunks and buffered datagrams"""
+        parts, size = [], 0
+        if wait and self._queue.empty() and not self._udp_parts:
+            try:
+                chunk = await asyncio.wait_for(self._queue.get(), BATCH_DELAY)
+                parts.append(chunk)
+                size += len(chunk)
+            except asyncio.TimeoutError:
+                pass
+        while size < self.batch_bytes and not self._queue.empty():
+            chunk = self._queue.get_nowait()
+            parts.append(chunk)
+            size += len(chunk)
+        if self._udp_parts:
+            parts.extend(self._udp_parts)
+            size += self._udp_bytes
+            self._udp_parts, self._udp_bytes = [], 0
+        return b"".join(parts)
+
+    async def _drain_once(self, wait: bool = True):
+        if self._queue is None:
+            return
+        buf = await self._next_batch(wait)
+        if not buf:
+            return
+        # parse off the event loop; the bins are only touched on it
+        block = await asyncio.to_thread(parse_clf_buffer, strip_syslog(buf))
+        self._fold(block, len(buf))
+
+    async def _consume(self):
+        while True:
+            await self._drain_once()
+
+    def subscribe(self, callback):
+        """Call callback(TrafficBins) with every run of bins as they are closed (final)"""
+        self._subscribers.append(callback)
+
+    @property
+    def watermark(self):
+        """Event time (epoch seconds) up to which the bins are final, None before the first line"""
+        if self._latest is None:
+            return None
+        # never ahead of the wall clock: a line stamped in the future (within FUTURE_SLACK)
+        # must not close bins that on-time lines are still arriving for
+        return min(self._latest, int(time.time())) - self.allowed_lateness
+
+    def _in_range(self, epoch: np.ndarray, tz_offset: np.ndarray) -> np.ndarray:
+        """Mask of the records whose event time is plausible (see the module docstring)"""
+        ok = epoch <= time.time() + FUTURE_SLACK
+        if self.watermark is not None:
+            ok &= epoch >= self.watermark - self.retention
+        if not ok.any():
+            return ok
+        offset = self.bins.tz_offset if self.bins.tz_offset is not None else int(tz_offset[0])
+        b = (epoch + offset * 60) // self.bins.width
+        if self.closed_until is not None:
+            anchor = self.closed_until
+        else:
+            anchor = self.bins.first_bin if self.bins.first_bin is not None else int(b[ok].min())
+        return ok & (b < anchor + self.max_span // self.bins.width)
+
+    def _fold(self, block: dict, nbytes: int):
+        self.stats["lines"] += block["lines"]
+        self.stats["matched"] += block["matched"]
+        self.stats["bytes"] += nbytes
+        self.stats["batches"] += 1
+        epoch = block["epoch"]
+        if len(epoch) == 0:
+            return
+        in_range = self._in_range(epoch, block["tz_offset"])
+        if not in_range.all():
+            self.stats["out_of_range"] += int((~in_range).sum())
+            block = _select(block, in_range)
+            epoch = block["epoch"]
+            if len(epoch) == 0:
+                return
+        if self.closed_until is not None:
+            # lines for closed bins are too late: those bins were already published
+            b = (epoch + self.bins.tz_offset * 60) // self.bins.width
+            on_time = b >= self.closed_until
+            if not on_time.all():
+                self.stats["late"] += int((~on_time).sum())
+                block = _select(block, on_time)
+                epoch = block["epoch"]
+                if len(epoch) == 0:
+                    return
+        self.bins.add_block(block)
+        # only records that passed the range check move the watermark
+        top = int(epoch.max())
+        self._latest = top if self._latest is None else max(self._latest, top)
+        self._close_bins()
+        if self.bins.n_bins * self.bins.width > 2 * self.retention:
+            # amortised: trim once the window has doubled
+            self.bins.trim(min(self.closed_until,
+                               self.bins.first_bin + self.bins.n_bins - self.retention // self.bins.width))
+
+    def _close_bins(self, final: bool = False):
+        """Advance the watermark: finalize and publish every bin that ends at or before it (all if final)"""
+        if self._latest is None:
+            return
+        if final:
+            until = self.bins.first_bin + self.bins.n_bins
+        else:
+            # bins whose end (start + width) is at or before the watermark
+            until = (self.watermark + self.bins.tz_offset * 60 + 1) // self.bins.width
+        if self.closed_until is None:
+            if until <= self.bins.first_bin:
+                # nothing final yet: earlier lines may still extend the bins backwards
+                return
+            self.closed_until = self.bins.first_bin
+        if until <= self.closed_until:
+            return
+        closed = self.bins.window(self.closed_until, until)
+        self.closed_until = until
+        if closed.n_bins:
+            self.stats["closed_bins"] += closed.n_bins
+            for callback in self._subscribers:
+                callback(closed)
+
+    def frame(self, freq: str = None, last: int = None, include_open: bool = False):
+        """
+        Live traffic table (make_traffic_ts columns) at freq (default the live
+        width), last bins only. Only closed (final) bins unless include_open;
+        a coarse bin counts as closed once all of its live bins are.
+        """
+        bins = self.bins
+        if not include_open:
+            end = self.closed_until if self.closed_until is not None else (bins.first_bin or 0)
+            if freq is not None and freq != bins.freq:
+                step = max(freq_to_seconds(freq) // bins.width, 1)
+                end -= end % step
+            bins = bins.window(bins.first_bin or 0, end)
+        if freq is not None and freq != bins.freq:
+            bins = bins.rollup(freq)
+        df = bins.to_frame()
+        return df.tail(last).reset_index(drop=True) if last else df
+
+    def snapshot(self) -> dict:
+        """Counters plus queue depth and ingest rate since start"""
+        elapsed = time.time() - self.started_at if self.started_at else 0.0
+        return {**self.stats,
+                "running": self.running,
+                "queued_chunks": self._queue.qsize() if self._queue is not None else 0,
+                "buffered_udp_bytes": self._udp_bytes,
+                "bins": self.bins.n_bins,
+                "open_bins": (self.bins.n_bins if self.closed_until is None
+                              else max(self.bins.first_bin + self.bins.n_bins - self.closed_until, 0)
+                              if self.bins.n_bins else 0),
+                "watermark": self.watermark,
+                "lines_per_second": round(self.stats["lines"] / elapsed, 1) if elapsed else 0.0}
@@ -0,0 +1,116 @@
+"""
+Outage and gap detection on a binned request-count series.
+
+A run of empty bins is an outage when traffic was expected there. The
+seasonal profile gives each bin an expected count: the mean requests per
+bin for its hour of the local day. It is computed twice, first over every
+bin and then without the runs the first pass flagged, so an outage does
+not lower the level it is judged by while the empty runs of a quiet night
+still count towards the night's level. A run is flagged when both hold:
+
+- it lasts at least OUTAGE_MIN_GAP,
+- seeing no request over it is implausible under Poisson arrivals at the
+  expected level, i.e. P = exp(-expected) < OUTAGE_ALPHA.
+
+A quiet night therefore needs a much longer gap than a busy afternoon.
+Runs come from a vectorized run-length encoding of the empty-bin mask, and
+their expected counts from prefix sums. Any number of windows is supported.
+They are applied to a series of any resolution with one searchsorted over
+the sorted window starts.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .aggregate import _local_seconds, freq_to_seconds
+
+# Resolution the detector runs on
+OUTAGE_FREQ = "1min"
+
+# Shortest gap (seconds) reported as an outage
+OUTAGE_MIN_GAP = 5 * 60
+
+# Largest probability of the empty run under the seasonal rate
+OUTAGE_ALPHA = 1e-6
+
+# Seconds of the local day per seasonal profile slot
+PROFILE_SLOT = 3600
+
+
+def empty_runs(empty: np.ndarray) -> tuple:
+    """(starts, ends) positions of the runs of True in a bool array (ends exclusive)"""
+    edges = np.diff(np.r_[0, np.asarray(empty, dtype=np.int8), 0])
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def _expected_counts(dense: np.ndarray, slot: np.ndarray, seen: np.ndarray) -> np.ndarray:
+    """
+    Prefix sums of the expected requests per bin: the mean of the seen bins
+    of its profile slot (a slot with no seen bin takes the mean of all of them)
+    """
+    slot_bins = np.bincount(slot[seen], minlength=86400 // PROFILE_SLOT)
+    per_slot = np.bincount(slot[seen], weights=dense[seen], minlength=len(slot_bins)) / np.maximum(slot_bins, 1)
+    per_slot[slot_bins == 0] = dense[seen].mean() if seen.any() else 0.0
+    return np.r_[0.0, np.cumsum(per_slot[slot])]
+
+
+def detect_outages(index: pd.DatetimeIndex, counts: np.ndarray, freq: str = OUTAGE_FREQ,
+                   min_gap: int = OUTAGE_MIN_GAP, alpha: float = OUTAGE_ALPHA) -> pd.DataFrame:
+    """
+    Outage windows of a request-count series binned at freq.
+
+    Bins missing from index count as empty (NaN counts too). Returns one
+    row per window: start (first empty bin), end (end of the last one,
+    exclusive), bins and expected_requests. Both times are in index's tz.
+    """
+    columns = ["start", "end", "bins", "expected_requests"]
+    index = pd.DatetimeIndex(index)
+    if len(index) == 0:
+        return pd.DataFrame(columns=columns)
+    width = freq_to_seconds(freq)
+    local = _local_seconds(index) // width
+    first = int(local.min())
+    n = int(local.max()) - first + 1
+
+    dense = np.zeros(n, dtype=np.float64)
+    dense[local - first] = np.nan_to_num(np.asarray(counts, dtype=np.float64), nan=0.0)
+
+    starts, ends = empty_runs(dense == 0)
+    long_enough = (ends - starts) * width >= min_gap
+    slot = (((first + np.arange(n, dtype=np.int64)) * width) % 86400) // PROFILE_SLOT
+    threshold = -np.log(alpha)
+
+    # first pass over every bin: the empty runs of a quiet night are part of its level
+    expected = _expected_counts(dense, slot, np.ones(n, dtype=bool))
+    keep = long_enough & (expected[ends] - expected[starts] >= threshold)
+
+    # second pass without the runs flagged by the first (their zeros would lower the
+    # level they are judged by)
+    edges = np.zeros(n + 1, dtype=np.int64)
+    edges[starts[keep]] += 1
+    edges[ends[keep]] -= 1
+    expected = _expected_counts(dense, slot, np.cumsum(edges[:n]) == 0)
+    run_expected = expected[ends] - expected[starts]
+    keep = long_enough & (run_expected >= threshold)
+    starts, ends, run_expected = starts[keep], ends[keep], run_expected[keep]
+
+    origin = index.min()
+    step = pd.Timedelta(seconds=width)
+    return pd.DataFrame({
+        "start": origin + step * starts,
+        "end": origin + step * ends,
+        "bins": ends - starts,
+        "expected_requests": np.round(run_expected, 1),
+    }, columns=columns)
+
+
+def outage_mask(index: pd.DatetimeIndex, windows: pd.DataFrame) -> np.ndarray:
+    """True for every timestamp of index inside one of the windows [start, end)"""
+    index = pd.DatetimeIndex(index)
+    if len(windows) == 0:
+        return np.zeros(len(index), dtype=bool)
+    starts = pd.DatetimeIndex(windows["start"]).as_unit("ns").asi8
+    ends = pd.DatetimeIndex(windows["end"]).as_unit("ns").asi8
+    t = index.as_unit("ns").asi8
+    pos = np.searchsorted(starts, t, side="right") - 1
+    return (pos >= 0) & (t < ends[np.maximum(pos, 0)])
@@ -0,0 +1,25 @@
+"""
+Input and output locations of the log pipeline.
+
+Defaults are DATA/ and processed_data/ at the repository root; the
+AUTOSCALING_DATA_DIR / AUTOSCALING_OUTPUT_DIR environment variables point
+the scripts somewhere else without editing them.
+"""
+
+import os
+
+from .readers import resolve_log_path
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DATA_DIR = os.environ.get("AUTOSCALING_DATA_DIR", os.path.join(REPO_DIR, "DATA"))
+OUTPUT_DIR = os.environ.get("AUTOSCALING_OUTPUT_DIR", os.path.join(REPO_DIR, "processed_data"))
+
+# NASA HTTP log files, in time order
+LOG_NAMES = ("train.txt", "test.txt")
+
+
+def log_files(data_dir: str = DATA_DIR, names: tuple = LOG_NAMES) -> list:
+    """Existing log files of data_dir (a .gz / .bz2 version is used when only that exists)"""
+    paths = [resolve_log_path(os.path.join(data_dir, name)) for name in names]
+    return [p for p in paths if p is not None]
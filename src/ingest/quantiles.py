@@ -0,0 +1,160 @@
+"""
+Mergeable response-size quantiles per time bin (DDSketch-style).
+
+Every byte count x > 0 falls into the logarithmic bucket
+ceil(log_gamma(x)) with gamma = (1 + a) / (1 - a); answering a quantile
+with the bucket's midpoint value is then within relative accuracy a of the
+true order statistic (0 bytes has a bucket of its own). A bin's sketch is
+just its non-empty buckets with counts, kept for all bins together as
+sorted sparse (bin, bucket) keys, so a bin costs at most one entry per
+distinct bucket however many requests it holds.
+
+Sketches merge by adding bucket counts: coarser bins are built from the
+finer ones by re-keying (coarse bin, bucket) and summing, never by
+rescanning the log.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .aggregate import freq_to_seconds
+from .fastparse import BYTES_MISSING
+from .timestamps import from_datetime_index, to_datetime_index
+
+# Bin width of the sketches; coarser resolutions are rolled up from it
+QUANTILE_FREQ = "1min"
+
+# Relative accuracy of the reported quantiles
+RELATIVE_ACCURACY = 0.01
+
+# Output column -> quantile of per-request bytes
+SIZE_QUANTILES = {"bytes_p50": 0.50, "bytes_p95": 0.95, "bytes_p99": 0.99}
+
+# Buckets addressable per bin (key = bin * _BUCKETS + bucket); 4096 covers > 1e35 bytes at 1%
+_BUCKETS = 4096
+
+# Pending (uncompacted) entries tolerated before they are summed up
+_COMPACT_ENTRIES = 4_000_000
+
+
+def _sum_by_key(keys: np.ndarray, counts: np.ndarray) -> tuple:
+    """Sorted unique keys with their summed counts"""
+    uniq, inverse = np.unique(keys, return_inverse=True)
+    return uniq, np.bincount(inverse, weights=counts, minlength=len(uniq)).astype(np.int64)
+
+
+class QuantileBins:
+    """Sparse log-bucket histograms of request sizes per fixed-width time bin."""
+
+    def __init__(self, freq: str = QUANTILE_FREQ, accuracy: float = RELATIVE_ACCURACY, tz_offset: int = None):
+        self.freq = freq
+        self.width = freq_to_seconds(freq)
+        self.accuracy = accuracy
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        # UTC offset (minutes) the bins are aligned to; first record's if None
+        self.tz_offset = tz_offset
+        self._keys = np.zeros(0, dtype=np.int64)
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._pending = []
+        self._pending_n = 0
+
+    def _bucket(self, values: np.ndarray) -> np.ndarray:
+        """Bucket of each byte count (0 for 0 bytes)"""
+        values = np.asarray(values, dtype=np.float64)
+        pos = values > 0
+        idx = np.zeros(len(values), dtype=np.int64)
+        idx[pos] = 1 + np.ceil(np.log(values[pos]) / np.log(self.gamma)).astype(np.int64)
+        return np.minimum(idx, _BUCKETS - 1)
+
+    def _value(self, bucket: np.ndarray) -> np.ndarray:
+        """Representative bytes of a bucket (within the relative accuracy of all its members)"""
+        bucket = np.asarray(bucket, dtype=np.float64)
+        return np.where(bucket > 0, 2 * self.gamma ** (bucket - 1) / (self.gamma + 1), 0.0)
+
+    def _compact(self):
+        if not self._pending:
+            return
+        keys = np.concatenate([self._keys] + [k for k, _ in self._pending])
+        counts = np.concatenate([self._counts] + [c for _, c in self._pending])
+        self._keys, self._counts = _sum_by_key(keys, counts)
+        self._pending, self._pending_n = [], 0
+
+    def _push(self, keys: np.ndarray, counts: np.ndarray):
+        self._pending.append((keys, counts))
+        self._pending_n += len(keys)
+        if self._pending_n > _COMPACT_ENTRIES:
+            self._compact()
+
+    def add(self, epoch: np.ndarray, tz_offset: np.ndarray, nbytes: np.ndarray):
+        """Fold records (epoch seconds, UTC offset minutes, bytes; BYTES_MISSING is skipped)"""
+        if len(epoch) == 0:
+            return
+        if self.tz_offset is None:
+            self.tz_offset = int(tz_offset[0])
+        nbytes = np.asarray(nbytes)
+        valid = nbytes != BYTES_MISSING
+        if nbytes.dtype.kind == "f":
+            valid &= ~np.isnan(nbytes)
+        if not valid.any():
+            return
+        b = (np.asarray(epoch, dtype=np.int64)[valid] + self.tz_offset * 60) // self.width
+        keys, counts = np.unique(b * _BUCKETS + self._bucket(nbytes[valid]), return_counts=True)
+        self._push(keys, counts.astype(np.int64))
+
+    def add_block(self, block: dict):
+        """Fold a parsed fastparse block"""
+        self.add(block["epoch"], block["tz_offset"], block["bytes"])
+
+    def add_frame(self, df: pd.DataFrame):
+        """Fold a parsed-log DataFrame (tz-aware 'timestamp' column, NaN bytes skipped)"""
+        ok, epoch, tz_offset = from_datetime_index(df["timestamp"])
+        self.add(epoch[ok], tz_offset[ok], df["bytes"].to_numpy(dtype=np.float64, na_value=np.nan)[ok])
+
+    def merge(self, other: "QuantileBins"):
+        """Add another QuantileBins of the same width and accuracy into this one"""
+        if other.width != self.width or other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches of different widths or accuracies")
+        other._compact()
+        if len(other._keys) == 0:
+            return
+        if self.tz_offset is None:
+            self.tz_offset = other.tz_offset
+        elif other.tz_offset != self.tz_offset:
+            raise ValueError("Cannot merge sketches aligned to different UTC offsets")
+        self._push(other._keys, other._counts)
+
+    def rollup(self, freq: str) -> "QuantileBins":
+        """Coarser QuantileBins: bucket counts summed per coarse bin, O(entries)"""
+        out = QuantileBins(freq, self.accuracy, self.tz_offset)
+        if out.width % self.width:
+            raise ValueError(f"{freq} is not a multiple of {self.freq}")
+        self._compact()
+        bins, buckets = np.divmod(self._keys, _BUCKETS)
+        out._keys, out._counts = _sum_by_key(bins * self.width // out.width * _BUCKETS + buckets, self._counts)
+        return out
+
+    def quantiles(self, qs) -> tuple:
+        """(bin numbers, {q: values}) for every non-empty bin; values are in bytes"""
+        self._compact()
+        bins, buckets = np.divmod(self._keys, _BUCKETS)
+        if len(bins) == 0:
+            return bins, {q: np.zeros(0) for q in qs}
+        starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+        cum = np.cumsum(self._counts)
+        before = np.r_[0, cum[starts[1:] - 1]]
+        totals = np.r_[cum[starts[1:] - 1], cum[-1]] - before
+        out = {}
+        for q in qs:
+            # first bucket whose cumulative count passes rank q * (n - 1), like np.quantile(method="lower")
+            rank = np.floor(q * (totals - 1))
+            pos = np.searchsorted(cum, before + rank, side="right")
+            out[q] = self._value(buckets[pos])
+        return bins[starts], out
+
+    def to_frame(self, columns: dict = None) -> pd.DataFrame:
+        """Quantile columns (default SIZE_QUANTILES, whole bytes) indexed by bin start, tz-aware"""
+        columns = columns or SIZE_QUANTILES
+        bins, values = self.quantiles(list(columns.values()))
+        epoch = bins * self.width - (self.tz_offset or 0) * 60
+        index = to_datetime_index(epoch, np.full(len(bins), self.tz_offset or 0))
+        return pd.DataFrame({col: np.rint(values[q]) for col, q in columns.items()}, index=index)
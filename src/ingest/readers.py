@@ -0,0 +1,155 @@
+"""
+Transparent reading of plain, gzip and bz2 access logs.
+
+Compressed files are never decompressed to disk: a background thread
+decompresses fixed-size chunks and hands them to the parser through a
+bounded queue, so decompression (zlib/bz2 release the GIL) overlaps with
+parsing while memory stays at QUEUE_CHUNKS * CHUNK_SIZE.
+
+- open_log():        text file object, same lines as open(path, "r", ...)
+- iter_line_chunks(): newline-aligned byte chunks for the NumPy parser
+"""
+
+import bz2
+import gzip
+import io
+import os
+import queue
+import threading
+
+# Decompressed bytes handed over per queue item
+CHUNK_SIZE = 4 * 1024 * 1024
+
+# Chunks buffered between the decompression thread and the parser
+QUEUE_CHUNKS = 8
+
+# Compressed formats recognised by file extension
+COMPRESSED_OPENERS = {".gz": gzip.open, ".bz2": bz2.open}
+
+
+def compression_of(path: str):
+    """'.gz' / '.bz2' for compressed logs, None for plain text"""
+    ext = os.path.splitext(path)[1].lower()
+    return ext if ext in COMPRESSED_OPENERS else None
+
+
+def is_compressed(path: str) -> bool:
+    return compression_of(path) is not None
+
+
+def resolve_log_path(path: str):
+    """path itself, or its .gz / .bz2 version when only that exists (None if neither)"""
+    for candidate in [path] + [path + ext for ext in COMPRESSED_OPENERS]:
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+class _DecompressThread(threading.Thread):
+    """Producer: decompress a file into CHUNK_SIZE pieces on a bounded queue."""
+
+    def __init__(self, path: str, chunk_size: int, queue_size: int):
+        super().__init__(name=f"decompress:{os.path.basename(path)}", daemon=True)
+        self.path = path
+        self.chunk_size = chunk_size
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.stopped = threading.Event()
+
+    def _put(self, item):
+        # time out regularly so an abandoned reader does not block us forever
+        while not self.stopped.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def run(self):
+        try:
+            with COMPRESSED_OPENERS[compression_of(self.path)](self.path, "rb") as f:
+                while not self.stopped.is_set():
+                    chunk = f.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    self._put(chunk)
+        except Exception as e:
+            # re-raised in the consuming thread
+            self._put(e)
+        self._put(None)
+
+
+def iter_raw_chunks(path: str, chunk_size: int = CHUNK_SIZE, queue_size: int = QUEUE_CHUNKS):
+    """Yield the (decompressed) bytes of a log file in chunks"""
+    if not is_compressed(path):
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    producer = _DecompressThread(path, chunk_size, queue_size)
+    producer.start()
+    try:
+        while True:
+            item = producer.queue.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        producer.stopped.set()
+
+
+def iter_line_chunks(path: str, chunk_size: int = CHUNK_SIZE, queue_size: int = QUEUE_CHUNKS):
+    """Yield newline-aligned byte chunks (the last one may lack a trailing newline)"""
+    tail = b""
+    for chunk in iter_raw_chunks(path, chunk_size, queue_size):
+        data = tail + chunk
+        cut = data.rfind(b"\n") + 1
+        tail = data[cut:]
+        if cut:
+            yield data[:cut]
+    if tail:
+        yield tail
+
+
+class _ChunkStream(io.RawIOBase):
+    """Raw binary stream over an iterator of byte chunks"""
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self._buf = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self._buf:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._buf = memoryview(chunk)
+        n = min(len(b), len(self._buf))
+        b[:n] = self._buf[:n]
+        self._buf = self._buf[n:]
+        return n
+
+    def close(self):
+        if hasattr(self._chunks, "close"):
+            self._chunks.close()
+        super().close()
+
+
+def open_log(path: str, encoding: str = "latin-1", errors: str = "replace"):
+    """
+    Open a plain or compressed log for line iteration.
+
+    Same lines (universal newlines) as open(path, "r", encoding=..., errors=...);
+    compressed files are decompressed on a background thread.
+    """
+    if not is_compressed(path):
+        return open(path, "r", encoding=encoding, errors=errors)
+    raw = _ChunkStream(iter_raw_chunks(path))
+    return io.TextIOWrapper(io.BufferedReader(raw, buffer_size=CHUNK_SIZE), encoding=encoding, errors=errors)
@@ -0,0 +1,173 @@
+"""
+Compact typed in-memory request log (Layer 1 before it is written).
+
+A DataFrame built from per-request dicts holds host, url, method and
+protocol as Python strings in object columns plus float64 bytes, several
+hundred bytes per row. RequestLog keeps the same records in preallocated,
+geometrically grown NumPy arrays:
+
+- epoch:     int64 seconds since 1970-01-01 UTC
+- tz_offset: int16 UTC offset in minutes
+- status:    int16
+- bytes:     int32, BYTES_MISSING for '-' (widened to int64 only if needed)
+- host, method, url, protocol: int32 codes into one interned dictionary
+  per column, -1 for None
+
+That is 34 bytes per row plus one copy of every distinct string. Parsed
+blocks are appended as they come (interning only each block's distinct
+values), partial logs from worker processes are concatenated with their
+codes remapped, and to_frame() exports Categorical text columns and a
+nullable Int32 bytes column without re-expanding the strings.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .fastparse import BYTES_MISSING
+from .timestamps import to_datetime_index
+
+TEXT_FIELDS = ("host", "method", "url", "protocol")
+
+# Column name -> dtype of the numeric arrays
+NUMERIC_DTYPES = {"epoch": np.int64, "tz_offset": np.int16, "status": np.int16, "bytes": np.int32}
+
+# Rows allocated by the first append
+INITIAL_CAPACITY = 1 << 16
+
+
+class Interner:
+    """String dictionary: value -> int32 code, in first-seen order."""
+
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def encode(self, values) -> np.ndarray:
+        """int32 codes of an array of strings (None -> -1); each distinct value is looked up once"""
+        local, uniques = pd.factorize(np.asarray(values, dtype=object), use_na_sentinel=True)
+        lut = np.empty(len(uniques) + 1, dtype=np.int32)
+        for i, value in enumerate(uniques.tolist()):
+            code = self.codes.get(value)
+            if code is None:
+                code = self.codes[value] = len(self.values)
+                self.values.append(value)
+            lut[i] = code
+        # local -1 (None) indexes the trailing -1
+        lut[-1] = -1
+        return lut[local]
+
+    def remap(self, other: "Interner") -> np.ndarray:
+        """Codes of other's values in this dictionary (adding the new ones); -1 maps to -1"""
+        return np.append(self.encode(np.array(other.values, dtype=object)), np.int32(-1))
+
+
+class RequestLog:
+    """Parsed requests as typed growable columns plus interned text dictionaries."""
+
+    def __init__(self, fields: bool = True):
+        self.fields = fields
+        self.n = 0
+        self.lines = 0
+        self.matched = 0
+        self.dicts = {name: Interner() for name in TEXT_FIELDS} if fields else {}
+        names = dict(NUMERIC_DTYPES, **{name: np.int32 for name in self.dicts})
+        self._cols = {name: np.zeros(0, dtype=dtype) for name, dtype in names.items()}
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __getstate__(self) -> dict:
+        # pickle (e.g. back from a worker process) the filled rows only, not the spare capacity
+        state = dict(self.__dict__)
+        state["_cols"] = {name: self.column(name) for name in self._cols}
+        return state
+
+    def _reserve(self, extra: int):
+        """Room for extra more rows; capacity doubles so appends stay amortised O(1)"""
+        need = self.n + extra
+        cap = len(self._cols["epoch"])
+        if need <= cap:
+            return
+        cap = max(need, 2 * cap, INITIAL_CAPACITY)
+        for name, arr in self._cols.items():
+            grown = np.empty(cap, dtype=arr.dtype)
+            grown[:self.n] = arr[:self.n]
+            self._cols[name] = grown
+
+    def _put(self, name: str, values: np.ndarray):
+        """Write values at rows n.. of one column (before n is advanced)"""
+        arr = self._cols[name]
+        if name == "bytes" and len(values) and values.max() > np.iinfo(arr.dtype).max:
+            # a response over 2 GiB: this column alone goes int64
+            arr = self._cols[name] = arr.astype(np.int64)
+        arr[self.n:self.n + len(values)] = values
+
+    def append_block(self, block: dict):
+        """Append a parsed block (fastparse layout; text fields needed when self.fields)"""
+        k = len(block["epoch"])
+        self.lines += block["lines"]
+        self.matched += block["matched"]
+        self._reserve(k)
+        for name in NUMERIC_DTYPES:
+            self._put(name, block[name])
+        for name, interner in self.dicts.items():
+            self._put(name, interner.encode(block[name]))
+        self.n += k
+
+    def extend(self, other: "RequestLog"):
+        """Append another log's rows (e.g. a worker's byte range), remapping its text codes"""
+        k = other.n
+        self.lines += other.lines
+        self.matched += other.matched
+        self._reserve(k)
+        for name in NUMERIC_DTYPES:
+            self._put(name, other.column(name))
+        for name, interner in self.dicts.items():
+            lut = interner.remap(other.dicts[name])
+            # other's -1 codes index lut[-1] == -1
+            self._put(name, lut[other.column(name)])
+        self.n += k
+
+    @classmethod
+    def from_blocks(cls, blocks, fields: bool = True) -> "RequestLog":
+        log = cls(fields)
+        for block in blocks:
+            log.append_block(block)
+        return log
+
+    def column(self, name: str) -> np.ndarray:
+        """View of one column's filled rows (epoch, status, bytes, host codes, ...)"""
+        return self._cols[name][:self.n]
+
+    def block(self) -> dict:
+        """The numeric columns as a fastparse-style block (views, no copy; bytes as int64)"""
+        out = {name: self.column(name) for name in ("epoch", "tz_offset", "status")}
+        out["bytes"] = self.column("bytes").astype(np.int64)
+        out["lines"], out["matched"] = self.lines, self.matched
+        return out
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the filled rows plus an estimate of the dictionary strings"""
+        rows = sum(self.column(name).nbytes for name in self._cols)
+        strings = sum(len(v) + 49 for d in self.dicts.values() for v in d.values)
+        return rows + strings
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        DataFrame with the columns of the parsed log: tz-aware timestamp,
+        Categorical host/method/url/protocol, int16 status and nullable
+        Int32 bytes (<NA> for '-').
+        """
+        if self.n == 0:
+            return pd.DataFrame()
+        out = {"timestamp": to_datetime_index(self.column("epoch"), self.column("tz_offset"))}
+        for name, interner in self.dicts.items():
+            out[name] = pd.Categorical.from_codes(self.column(name), categories=pd.Index(interner.values, dtype=object))
+        out["status"] = self.column("status").copy()
+        nbytes = self.column("bytes")
+        out["bytes"] = pd.arrays.IntegerArray(nbytes.copy(), nbytes == BYTES_MISSING)
+        return pd.DataFrame(out)
@@ -0,0 +1,273 @@
+"""
+Per-route traffic: a sparse matrix of time bins x URL prefixes.
+
+A route is a URL's leading directories ("/shuttle/", "/shuttle/missions/"
+at depth 2, "/" for top-level files). RouteBins counts requests and bytes
+per (bin, route) at ROUTE_MAX_DEPTH in the ingest pass, as sparse sorted
+keys, so it only grows with the (bin, route) pairs that actually occur.
+Prefixes are computed once per distinct URL.
+
+to_matrix(top_n, depth) folds the routes to the wanted depth, keeps the
+top_n busiest ones (the rest become the OTHER_ROUTE column) and returns a
+RouteMatrix in CSR form (rows = bins): indptr / indices / requests /
+bytes arrays, saved with save_route_matrix. Slicing a route set and a
+time range only touches the rows in range.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from .aggregate import freq_to_seconds
+from .fastparse import BYTES_MISSING
+from .timestamps import from_datetime_index, to_datetime_index
+
+# Bin width of the route matrix
+ROUTE_FREQ = "1min"
+
+# Directory levels recorded during ingest; to_matrix can fold to any depth up to this
+ROUTE_MAX_DEPTH = 3
+
+# Defaults for the saved matrix
+ROUTE_DEPTH = 1
+ROUTE_TOP_N = 50
+
+# Column collecting every route outside the top N
+OTHER_ROUTE = "(other)"
+
+# Route ids per bin in the combined (bin, route) key
+_ROUTE_STRIDE = 1 << 24
+
+# Pending (uncompacted) entries tolerated before they are summed up
+_COMPACT_ENTRIES = 4_000_000
+
+# URL -> prefix memo entries kept before the memo is cleared
+_MEMO_LIMIT = 1_000_000
+
+
+def route_prefix(url: str, depth: int = ROUTE_DEPTH) -> str:
+    """Leading `depth` directories of a URL path ('/' for top-level files)"""
+    if not isinstance(url, str):
+        return "/"
+    path = url.partition("?")[0]
+    dirs = [d for d in path.split("/")[:-1] if d][:depth]
+    return "/" + "".join(d + "/" for d in dirs)
+
+
+def _sum_by_key(keys: np.ndarray, *values) -> tuple:
+    """Sorted unique keys with each value array summed per key"""
+    uniq, inverse = np.unique(keys, return_inverse=True)
+    return (uniq,) + tuple(np.rint(np.bincount(inverse, weights=v, minlength=len(uniq))).astype(np.int64)
+                           for v in values)
+
+
+class RouteBins:
+    """Requests and bytes per (time bin, URL prefix), accumulated sparsely."""
+
+    def __init__(self, freq: str = ROUTE_FREQ, max_depth: int = ROUTE_MAX_DEPTH, tz_offset: int = None):
+        self.freq = freq
+        self.width = freq_to_seconds(freq)
+        self.max_depth = max_depth
+        # UTC offset (minutes) the bins are aligned to; first record's if None
+        self.tz_offset = tz_offset
+        # prefix -> route id, in first-seen order
+        self.routes = {}
+        self._prefix_memo = {}
+        self._keys = np.zeros(0, dtype=np.int64)
+        self._requests = np.zeros(0, dtype=np.int64)
+        self._bytes = np.zeros(0, dtype=np.int64)
+        self._pending = []
+        self._pending_n = 0
+
+    def _route_ids(self, urls) -> np.ndarray:
+        """Route id of every URL (prefixes computed once per distinct URL)"""
+        codes, uniques = pd.factorize(np.asarray(urls, dtype=object))
+        if len(self._prefix_memo) + len(uniques) > _MEMO_LIMIT:
+            self._prefix_memo.clear()
+        lut = np.empty(len(uniques) + 1, dtype=np.int64)
+        for i, url in enumerate(uniques):
+            prefix = self._prefix_memo.get(url)
+            if prefix is None:
+                prefix = self._prefix_memo[url] = route_prefix(url, self.max_depth)
+            lut[i] = self.routes.setdefault(prefix, len(self.routes))
+        lut[-1] = self.routes.setdefault("/", len(self.routes))
+        if len(self.routes) >= _ROUTE_STRIDE:
+            raise ValueError("Too many distinct routes")
+        return lut[codes]
+
+    def _compact(self):
+        if not self._pending:
+            return
+        parts = [(self._keys, self._requests, self._bytes)] + self._pending
+        self._keys, self._requests, self._bytes = _sum_by_key(
+            *(np.concatenate([p[i] for p in parts]) for i in range(3)))
+        self._pending, self._pending_n = [], 0
+
+    def _push(self, keys: np.ndarray, requests: np.ndarray, nbytes: np.ndarray):
+        self._pending.append((keys, requests, nbytes))
+        self._pending_n += len(keys)
+        if self._pending_n > _COMPACT_ENTRIES:
+            self._compact()
+
+    def add(self, epoch: np.ndarray, tz_offset: np.ndarray, urls: np.ndarray, nbytes: np.ndarray):
+        """Fold records (epoch seconds, UTC offset minutes, url, bytes with BYTES_MISSING for '-')"""
+        if len(epoch) == 0:
+            return
+        if self.tz_offset is None:
+            self.tz_offset = int(tz_offset[0])
+        b = (np.asarray(epoch, dtype=np.int64) + self.tz_offset * 60) // self.width
+        nbytes = np.asarray(nbytes, dtype=np.float64)
+        weights = np.where((nbytes == BYTES_MISSING) | np.isnan(nbytes), 0.0, nbytes)
+        keys = b * _ROUTE_STRIDE + self._route_ids(urls)
+        self._push(*_sum_by_key(keys, np.ones(len(keys)), weights))
+
+    def add_block(self, block: dict):
+        """Fold a parsed block that carries urls (fastparse fields=True)"""
+        self.add(block["epoch"], block["tz_offset"], block["url"], block["bytes"])
+
+    def add_frame(self, df: pd.DataFrame):
+        """Fold a parsed-log DataFrame (tz-aware 'timestamp' column, NaN bytes count as 0)"""
+        ok, epoch, tz_offset = from_datetime_index(df["timestamp"])
+        nbytes = df["bytes"].to_numpy(dtype=np.float64, na_value=np.nan)
+        self.add(epoch[ok], tz_offset[ok], df["url"].to_numpy(dtype=object)[ok], nbytes[ok])
+
+    def merge(self, other: "RouteBins"):
+        """Add another RouteBins of the same width into this one (route ids are remapped)"""
+        if other.width != self.width or other.max_depth != self.max_depth:
+            raise ValueError("Cannot merge route bins of different widths or depths")
+        other._compact()
+        if len(other._keys) == 0:
+            return
+        if self.tz_offset is None:
+            self.tz_offset = other.tz_offset
+        elif other.tz_offset != self.tz_offset:
+            raise ValueError("Cannot merge route bins aligned to different UTC offsets")
+        remap = np.array([self.routes.setdefault(p, len(self.routes)) for p in other.routes], dtype=np.int64)
+        bins, rid = np.divmod(other._keys, _ROUTE_STRIDE)
+        self._push(*_sum_by_key(bins * _ROUTE_STRIDE + remap[rid], other._requests, other._bytes))
+
+    def to_matrix(self, top_n: int = ROUTE_TOP_N, depth: int = ROUTE_DEPTH) -> "RouteMatrix":
+        """CSR matrix of bins x the top_n busiest routes at depth (+ OTHER_ROUTE)"""
+        if depth > self.max_depth:
+            raise ValueError(f"Routes were recorded down to depth {self.max_depth}, not {depth}")
+        self._compact()
+        bins, rid = np.divmod(self._keys, _ROUTE_STRIDE)
+
+        # fold the recorded prefixes to depth, then rank by total requests
+        # (a dummy file name after each prefix keeps all of its directories)
+        folded = pd.Index([route_prefix(p + "x", depth) for p in self.routes])
+        fcodes, fnames = pd.factorize(folded)
+        fid = fcodes[rid] if len(rid) else np.zeros(0, dtype=np.int64)
+        totals = np.bincount(fid, weights=self._requests, minlength=len(fnames))
+        ranked = np.argsort(-totals, kind="stable")
+        top = ranked[:top_n]
+        names = [str(fnames[i]) for i in top]
+        col = np.full(len(fnames), len(top), dtype=np.int64)
+        col[top] = np.arange(len(top))
+        if len(ranked) > len(top):
+            names.append(OTHER_ROUTE)
+
+        first = int(bins.min()) if len(bins) else 0
+        n_bins = int(bins.max()) - first + 1 if len(bins) else 0
+        n_cols = len(names)
+        keys, requests, nbytes = _sum_by_key((bins - first) * n_cols + col[fid], self._requests, self._bytes)
+        rows, indices = np.divmod(keys, n_cols)
+        indptr = np.r_[0, np.cumsum(np.bincount(rows, minlength=n_bins))].astype(np.int64)
+        return RouteMatrix(self.freq, self.tz_offset, first, names, indptr, indices, requests, nbytes)
+
+
+class RouteMatrix:
+    """CSR traffic matrix: one row per time bin, one column per route."""
+
+    def __init__(self, freq: str, tz_offset: int, first_bin: int, routes: list,
+                 indptr: np.ndarray, indices: np.ndarray, requests: np.ndarray, nbytes: np.ndarray):
+        self.freq = freq
+        self.width = freq_to_seconds(freq)
+        self.tz_offset = tz_offset or 0
+        self.first_bin = first_bin
+        self.routes = list(routes)
+        self.indptr = indptr
+        self.indices = indices
+        self.requests = requests
+        self.bytes = nbytes
+
+    @property
+    def shape(self) -> tuple:
+        return len(self.indptr) - 1, len(self.routes)
+
+    def timestamps(self, rows: np.ndarray = None) -> pd.DatetimeIndex:
+        """Bin start of the given rows (default all), tz-aware"""
+        rows = np.arange(self.shape[0]) if rows is None else np.asarray(rows)
+        epoch = (self.first_bin + rows.astype(np.int64)) * self.width - self.tz_offset * 60
+        return to_datetime_index(epoch, np.full(len(rows), self.tz_offset))
+
+    def _row(self, when, default: int) -> int:
+        """Row of the bin containing a timestamp (naive ones are taken as local), clipped"""
+        if when is None:
+            return default
+        ts = pd.Timestamp(when)
+        if ts.tz is not None:
+            ts = ts.tz_convert("UTC").tz_localize(None) + pd.Timedelta(minutes=self.tz_offset)
+        second = (ts - pd.Timestamp(0)) // pd.Timedelta(seconds=1)
+        return int(min(max(second // self.width - self.first_bin, 0), self.shape[0]))
+
+    def slice(self, routes: list = None, start=None, end=None, measure: str = "requests") -> pd.DataFrame:
+        """
+        Dense per-route series (columns = routes, default all) for the bins
+        from start up to (not including) the bin containing end.
+        """
+        routes = self.routes if routes is None else list(routes)
+        unknown = [r for r in routes if r not in self.routes]
+        if unknown:
+            raise KeyError(f"Routes not in matrix: {unknown}")
+        values = {"requests": self.requests, "bytes": self.bytes}[measure]
+        lo, hi = self._row(start, 0), self._row(end, self.shape[0])
+        hi = max(hi, lo)
+
+        pos = np.full(len(self.routes), -1, dtype=np.int64)
+        pos[[self.routes.index(r) for r in routes]] = np.arange(len(routes))
+        a, b = self.indptr[lo], self.indptr[hi]
+        rows = np.repeat(np.arange(lo, hi), np.diff(self.indptr[lo:hi + 1])) - lo
+        cols = pos[self.indices[a:b]]
+        keep = cols >= 0
+
+        dense = np.zeros((hi - lo, len(routes)), dtype=np.int64)
+        dense[rows[keep], cols[keep]] = values[a:b][keep]
+        return pd.DataFrame(dense, index=self.timestamps(np.arange(lo, hi)).rename("timestamp"), columns=routes)
+
+    def rollup(self, freq: str) -> "RouteMatrix":
+        """Coarser RouteMatrix: rows summed per coarse bin"""
+        width = freq_to_seconds(freq)
+        if width % self.width:
+            raise ValueError(f"{freq} is not a multiple of {self.freq}")
+        rows = np.repeat(np.arange(self.shape[0], dtype=np.int64), np.diff(self.indptr))
+        coarse = (self.first_bin + rows) * self.width // width
+        first = (self.first_bin * self.width) // width
+        n_cols = len(self.routes)
+        keys, requests, nbytes = _sum_by_key((coarse - first) * n_cols + self.indices, self.requests, self.bytes)
+        out_rows, indices = np.divmod(keys, n_cols)
+        n_bins = ((self.first_bin + self.shape[0] - 1) * self.width // width) - first + 1 if self.shape[0] else 0
+        indptr = np.r_[0, np.cumsum(np.bincount(out_rows, minlength=n_bins))].astype(np.int64)
+        return RouteMatrix(freq, self.tz_offset, first, self.routes, indptr, indices, requests, nbytes)
+
+    def to_scipy(self, measure: str = "requests"):
+        """scipy.sparse.csr_matrix view (scipy is optional)"""
+        from scipy.sparse import csr_matrix
+        values = {"requests": self.requests, "bytes": self.bytes}[measure]
+        return csr_matrix((values, self.indices, self.indptr), shape=self.shape)
+
+
+def save_route_matrix(path: str, matrix: RouteMatrix):
+    """Write a RouteMatrix to one compressed .npz"""
+    meta = {"freq": matrix.freq, "tz_offset": matrix.tz_offset, "first_bin": matrix.first_bin, "routes": matrix.routes}
+    np.savez_compressed(path, meta=np.array(json.dumps(meta)), indptr=matrix.indptr,
+                        indices=matrix.indices.astype(np.int32), requests=matrix.requests, bytes=matrix.bytes)
+
+
+def load_route_matrix(path: str) -> RouteMatrix:
+    """Read a RouteMatrix written by save_route_matrix"""
+    with np.load(path) as z:
+        meta = json.loads(str(z["meta"]))
+        return RouteMatrix(meta["freq"], meta["tz_offset"], meta["first_bin"], meta["routes"],
+                           z["indptr"], z["indices"].astype(np.int64), z["requests"], z["bytes"])
@@ -0,0 +1,575 @@
+"""
+Round-robin multi-resolution traffic store (RRD-style).
+
+Every archive holds one resolution for a fixed retention window, in a
+ring of retention // width slots allocated on the first write to it, so
+its size on disk and in memory stays the same however long it runs (and
+an archive no data ever reaches, e.g. 1s under a 1min feed, costs nothing):
+
+    processed_data/traffic_rrd/
+        meta.json          archives, metrics, UTC offset, newest bin per archive
+        1s/bins.npy        int64 bin number held by each slot (EMPTY if none)
+        1s/data.npy        float64 (slots, metrics, 4): sum, max, min, count
+        1min/ ...  5min/ ...  15min/ ...  1h/ ...
+
+Bin b of an archive lives in slot b % slots. A write only replaces a slot
+holding an older bin, so once the ring has wrapped the newest bins
+overwrite the oldest. Data is written at one archive's resolution (live
+1s bins, the pipeline's 1min table) and every coarser archive is compacted
+from the next finer one: a coarse bin is recomputed from its finer bins
+(sum of sums, max of maxes, min of mins, sum of counts) while all of them
+are still retained, and keeps that summary after they have aged out.
+Recomputing rather than adding makes writing the same bins twice
+harmless, and long writes go in chunks so that no finer bin is overwritten
+before it has been compacted.
+
+Only metrics whose coarse value follows from those summaries are kept:
+the counters (request_count, total_bytes, status_*) and per-bin maxima
+(peak_rps, max_second_bytes). is_outage is taken from the first finer
+bin: like apply_outage_mask at any resolution, a bin is an outage when its
+start lies inside an outage window. p95_rps, distinct counts, quantiles,
+content classes and sessions stay in the per-resolution exports, and
+read_traffic_history() joins them back onto the store's rows.
+
+to_frame() gives a traffic table like the CSVs (counters summed, maxima
+maxed, metrics NaN in outage bins and where a bin has no data), fetch()
+all four summaries of every metric, and series() an archive as a
+window-searchable traffic series.
+"""
+
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from .aggregate import TRAFFIC_COLUMNS, freq_to_seconds
+from .store import read_traffic
+from .timestamps import epoch_seconds, to_datetime_index
+from .windows import WindowIndex, to_epoch
+
+FORMAT_VERSION = 1
+
+# Store directories next to the traffic CSVs: pipeline output, and live ingest bins
+RRD_NAME = "traffic_rrd"
+LIVE_RRD_NAME = "live_traffic_rrd"
+
+# (resolution, retention), finest first. Each resolution is a multiple of the
+# one before it and each retention at least as long as the one before it.
+DEFAULT_ARCHIVES = (
+    ("1s", "1D"),
+    ("1min", "90D"),
+    ("5min", "180D"),
+    ("15min", "365D"),
+    ("1h", "1825D"),
+)
+
+# Metrics kept per bin; MAX_METRICS are consolidated by max, FIRST_METRICS take
+# the value of the first finer bin, the others are summed
+MAX_METRICS = ("peak_rps", "max_second_bytes")
+FIRST_METRICS = ("is_outage",)
+RRD_METRICS = TRAFFIC_COLUMNS + MAX_METRICS + FIRST_METRICS
+
+SUMMARIES = ("sum", "max", "min", "count")
+
+# Traffic file suffix (nasa_traffic_<suffix>.csv) -> archive resolution
+SUFFIX_FREQS = {"1s": "1s", "10s": "10s", "1m": "1min", "5m": "5min", "15m": "15min", "1h": "1h"}
+
+# Bin number of a slot that has never been written
+EMPTY = np.iinfo(np.int64).min
+
+
+def parse_retention(specs: list, archives: tuple = DEFAULT_ARCHIVES) -> tuple:
+    """
+    Archives with retentions overridden (or archives added) by specs such as
+    ["1s=6h", "1min=30D"]; sorted finest first.
+    """
+    out = dict(archives)
+    for spec in specs or ():
+        freq, sep, retention = spec.partition("=")
+        if not sep:
+            raise ValueError(f"Retention must look like FREQ=PERIOD (e.g. 1min=30D): {spec}")
+        freq_to_seconds(freq)
+        pd.Timedelta(retention)
+        out[freq] = retention
+    return tuple(sorted(out.items(), key=lambda a: freq_to_seconds(a[0])))
+
+
+def _layout(archives: tuple) -> list:
+    """[(freq, width, slots)] of archive specs, checked for a usable compaction ladder"""
+    layout = []
+    for freq, retention in archives:
+        width = freq_to_seconds(freq)
+        slots = int(pd.Timedelta(retention).total_seconds()) // width
+        if slots < 1:
+            raise ValueError(f"Retention of the {freq} archive is shorter than one bin: {retention}")
+        layout.append((freq, width, slots))
+    for (f1, w1, s1), (f2, w2, s2) in zip(layout, layout[1:]):
+        if w2 <= w1 or w2 % w1:
+            raise ValueError(f"{f2} is not a coarser multiple of {f1}")
+        if s2 * w2 < s1 * w1:
+            raise ValueError(f"The {f2} archive must retain at least as long as the {f1} archive")
+        if s1 < 2 * (w2 // w1):
+            raise ValueError(f"The {f1} archive must retain at least two {f2} bins to be compacted")
+    return layout
+
+
+def _summaries(values: np.ndarray) -> np.ndarray:
+    """(bins, metrics, 4) summaries of single values (NaN: no data, count 0)"""
+    ok = ~np.isnan(values)
+    return np.stack([np.where(ok, values, 0.0), values, values, ok.astype(np.float64)], axis=-1)
+
+
+class Archive:
+    """One resolution: a ring of slots, each holding a bin number and its summaries."""
+
+    def __init__(self, path: str, freq: str, slots: int, n_metrics: int, head: int = None, first: int = None):
+        self.path = path
+        self.freq = freq
+        self.width = freq_to_seconds(freq)
+        self.slots = slots
+        self.n_metrics = n_metrics
+        # newest and oldest bin ever written (None while empty)
+        self.head = head
+        self.first = first
+        self._bins = self._data = None
+        self._writable = False
+
+    @property
+    def allocated(self) -> bool:
+        return os.path.exists(os.path.join(self.path, "data.npy"))
+
+    def create(self):
+        os.makedirs(self.path)
+        bins = np.lib.format.open_memmap(os.path.join(self.path, "bins.npy"), mode="w+",
+                                         dtype=np.int64, shape=(self.slots,))
+        bins[:] = EMPTY
+        bins.flush()
+        # zero-filled, so the unwritten part of the ring stays sparse on disk
+        np.lib.format.open_memmap(os.path.join(self.path, "data.npy"), mode="w+", dtype=np.float64,
+                                  shape=(self.slots, self.n_metrics, len(SUMMARIES))).flush()
+
+    def _open(self, writable: bool = False):
+        if self._bins is None or (writable and not self._writable):
+            mode = "r+" if writable else "r"
+            self._bins = np.load(os.path.join(self.path, "bins.npy"), mmap_mode=mode)
+            self._data = np.load(os.path.join(self.path, "data.npy"), mmap_mode=mode)
+            self._writable = writable
+
+    @property
+    def oldest(self):
+        """Oldest bin inside the retention window (None while empty)"""
+        return None if self.head is None else self.head - self.slots + 1
+
+    @property
+    def start(self):
+        """Oldest bin that can still be held: the window start, or the first bin if the ring has not wrapped"""
+        return None if self.head is None else max(self.oldest, self.first)
+
+    def write(self, bins: np.ndarray, data: np.ndarray) -> int:
+        """Store summaries of sorted bins, skipping bins older than the slot (or window) holds; returns bins stored"""
+        if len(bins) == 0:
+            return 0
+        if not self.allocated:
+            self.create()
+        self._open(writable=True)
+        head = int(bins[-1]) if self.head is None else max(self.head, int(bins[-1]))
+        slot = bins % self.slots
+        keep = (bins > head - self.slots) & (bins >= self._bins[slot])
+        self._bins[slot[keep]] = bins[keep]
+        self._data[slot[keep]] = data[keep]
+        self.head = head
+        if keep.any():
+            self.first = int(bins[keep][0]) if self.first is None else min(self.first, int(bins[keep][0]))
+        return int(keep.sum())
+
+    def read(self, bins: np.ndarray) -> tuple:
+        """(held, summaries) of the given bins; bins not held get sum 0, max/min NaN, count 0"""
+        if self.head is None:
+            data = np.zeros((len(bins), self.n_metrics, len(SUMMARIES)))
+            data[..., 1:3] = np.nan
+            return np.zeros(len(bins), dtype=bool), data
+        self._open()
+        slot = bins % self.slots
+        held = (self._bins[slot] == bins) & (bins >= self.oldest)
+        data = np.array(self._data[slot])
+        data[~held] = 0.0
+        data[~held, :, 1:3] = np.nan
+        return held, data
+
+    def flush(self):
+        if self._writable:
+            self._bins.flush()
+            self._data.flush()
+
+
+class ArchiveSeries:
+    """Snapshot of one archive as a traffic series (the reading interface of store.TrafficSeries)."""
+
+    def __init__(self, name: str, df: pd.DataFrame, epoch: np.ndarray, tz_offset: int = None):
+        self.name = name
+        self.tz_offset = tz_offset
+        self.epoch = epoch
+        self.index = pd.DatetimeIndex(df["timestamp"])
+        self.columns = [c for c in df.columns if c != "timestamp"]
+        self._df = df
+        self.windows = WindowIndex(epoch, self.column, self.columns, tz_offset)
+
+    def __len__(self) -> int:
+        return len(self._df)
+
+    def column(self, name: str) -> np.ndarray:
+        if name not in self.columns:
+            raise KeyError(f"Column not in traffic series {self.name}: {name}")
+        return self._df[name].to_numpy(dtype=np.float64)
+
+    def to_frame(self, columns: list = None, start=None, end=None) -> pd.DataFrame:
+        """Rows with start <= timestamp < end (binary search) of the given columns"""
+        lo, hi = self.windows.bounds(start, end)
+        columns = self.columns if columns is None else list(columns)
+        return self._df.iloc[lo:hi][["timestamp"] + columns].reset_index(drop=True)
+
+
+class RoundRobinStore:
+    """Fixed-size multi-resolution traffic archives with compaction from fine to coarse."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._series = {}
+        self._load()
+
+    @property
+    def meta_path(self) -> str:
+        return os.path.join(self.path, "meta.json")
+
+    def _load(self):
+        with open(self.meta_path, encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported round-robin store version: {self.meta.get('version')}")
+        self.metrics = list(self.meta["metrics"])
+        self.tz_offset = self.meta["tz_offset"]
+        self.archives = [Archive(os.path.join(self.path, a["freq"]), a["freq"], a["slots"], len(self.metrics),
+                                 a["head"], a["first"]) for a in self.meta["archives"]]
+        self._mtime = os.path.getmtime(self.meta_path)
+
+    def _refresh(self):
+        """Pick up writes made by another process (the pipeline, a live listener)"""
+        if os.path.getmtime(self.meta_path) != self._mtime:
+            self._load()
+
+    def _save_meta(self):
+        for spec, archive in zip(self.meta["archives"], self.archives):
+            archive.flush()
+            spec["head"] = archive.head
+            spec["first"] = archive.first
+        self.meta["tz_offset"] = self.tz_offset
+        self.meta["updated"] = time.time()
+        tmp = self.meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.meta, f, indent=2)
+        os.replace(tmp, self.meta_path)
+        self._mtime = os.path.getmtime(self.meta_path)
+
+    @classmethod
+    def create(cls, path: str, archives: tuple = DEFAULT_ARCHIVES, metrics: tuple = RRD_METRICS,
+               tz_offset: int = None) -> "RoundRobinStore":
+        """New empty store (each archive is allocated in full on its first write)"""
+        layout = _layout(archives)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        os.makedirs(path)
+        meta = {
+            "version": FORMAT_VERSION,
+            "metrics": list(metrics),
+            "tz_offset": tz_offset,
+            "archives": [{"freq": freq, "retention": retention, "width": width, "slots": slots,
+                          "head": None, "first": None}
+                         for (freq, retention), (_, width, slots) in zip(archives, layout)],
+            "updated": time.time(),
+        }
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        return cls(path)
+
+    @classmethod
+    def open_or_create(cls, path: str, archives: tuple = DEFAULT_ARCHIVES,
+                       metrics: tuple = RRD_METRICS) -> "RoundRobinStore":
+        """The store at path, created if missing and rebuilt if its archives or metrics differ"""
+        if not os.path.exists(os.path.join(path, "meta.json")):
+            return cls.create(path, archives, metrics)
+        store = cls(path)
+        if store.layout() != [(f, r) for f, r in archives] or store.metrics != list(metrics):
+            store = store.rebuild(archives, metrics)
+        return store
+
+    def layout(self) -> list:
+        return [(a["freq"], a["retention"]) for a in self.meta["archives"]]
+
+    def rebuild(self, archives: tuple, metrics: tuple = None) -> "RoundRobinStore":
+        """
+        Copy the data into a store with other archives / metrics and replace
+        this one with it. Coarse archives go first, so the finer ones then
+        recompute only the bins they still cover.
+        """
+        metrics = list(self.metrics if metrics is None else metrics)
+        new = RoundRobinStore.create(self.path + ".tmp", archives, metrics, self.tz_offset)
+        for archive in reversed(self.archives):
+            level = new._find(archive.width)
+            if archive.head is None or level is None:
+                continue
+            bins = np.arange(archive.start, archive.head + 1, dtype=np.int64)
+            held, data = archive.read(bins)
+            out = np.zeros((int(held.sum()), len(metrics), len(SUMMARIES)))
+            out[..., 1:3] = np.nan
+            for i, name in enumerate(metrics):
+                if name in self.metrics:
+                    out[:, i] = data[held, self.metrics.index(name)]
+            new._write(level, bins[held], out)
+        new._save_meta()
+        shutil.rmtree(self.path)
+        os.replace(new.path, self.path)
+        return RoundRobinStore(self.path)
+
+    def _find(self, width: int):
+        for level, archive in enumerate(self.archives):
+            if archive.width == width:
+                return level
+        return None
+
+    def _level(self, freq: str = None) -> int:
+        if freq is None:
+            return 0
+        level = self._find(freq_to_seconds(freq))
+        if level is None:
+            raise KeyError(f"No {freq} archive in round-robin store {self.path}")
+        return level
+
+    def has(self, freq: str) -> bool:
+        """True when the store has a freq archive holding data"""
+        self._refresh()
+        level = self._find(freq_to_seconds(freq))
+        return level is not None and self.archives[level].head is not None
+
+    def update(self, df: pd.DataFrame, freq: str = None) -> int:
+        """
+        Write a traffic table ('timestamp' plus metric columns) whose rows are
+        bins of the freq archive (default the finest), then compact every
+        coarser archive over the written range. Columns that are not store
+        metrics are ignored, missing ones count as no data. Rows older than
+        the archive's retention window are skipped; returns the rows stored.
+        """
+        self._refresh()
+        level = self._level(freq)
+        archive = self.archives[level]
+        if len(df) == 0:
+            return 0
+        epoch, tz_offset = epoch_seconds(df["timestamp"])
+        if all(a.head is None for a in self.archives):
+            self.tz_offset = tz_offset
+        elif tz_offset != self.tz_offset:
+            raise ValueError(f"Round-robin store bins are aligned to UTC offset {self.tz_offset}, not {tz_offset}")
+        local = epoch + (self.tz_offset or 0) * 60
+        if (local % archive.width).any():
+            raise ValueError(f"Timestamps are not aligned to {archive.freq} bins")
+
+        values = np.column_stack([
+            df[name].to_numpy(dtype=np.float64, na_value=np.nan) if name in df.columns else np.full(len(df), np.nan)
+            for name in self.metrics
+        ])
+        bins = local // archive.width
+        order = np.argsort(bins, kind="stable")
+        written = self._write(level, bins[order], _summaries(values[order]))
+        self._save_meta()
+        return written
+
+    def _write(self, level: int, bins: np.ndarray, data: np.ndarray) -> int:
+        """Write sorted bins to one archive and compact upwards, in chunks the ring can hold"""
+        archive = self.archives[level]
+        ratio = self.archives[level + 1].width // archive.width if level + 1 < len(self.archives) else 0
+        # a chunk leaves the previous coarse bin's finer bins in the ring until they are compacted
+        step = archive.slots - ratio
+        written = 0
+        i = 0
+        while i < len(bins):
+            j = int(np.searchsorted(bins, bins[i] + step, side="left"))
+            written += archive.write(bins[i:j], data[i:j])
+            self._compact(level, int(bins[i]), int(bins[j - 1]))
+            i = j
+        return written
+
+    def _compact(self, level: int, lo: int, hi: int):
+        """Recompute the coarser archive's bins over finer bins lo..hi, then the next one up"""
+        if level + 1 >= len(self.archives):
+            return
+        fine, coarse = self.archives[level], self.archives[level + 1]
+        ratio = coarse.width // fine.width
+        keys = np.arange(lo // ratio, hi // ratio + 1, dtype=np.int64)
+        held, data = fine.read(np.arange(keys[0] * ratio, (keys[-1] + 1) * ratio, dtype=np.int64))
+        held = held.reshape(len(keys), ratio)
+        data = data.reshape(len(keys), ratio, len(self.metrics), len(SUMMARIES))
+        out = np.empty((len(keys), len(self.metrics), len(SUMMARIES)))
+        out[..., 0] = data[..., 0].sum(axis=1)
+        out[..., 1] = np.fmax.reduce(data[..., 1], axis=1)
+        out[..., 2] = np.fmin.reduce(data[..., 2], axis=1)
+        out[..., 3] = data[..., 3].sum(axis=1)
+        for name in FIRST_METRICS:
+            if name in self.metrics:
+                i = self.metrics.index(name)
+                out[:, i] = data[:, 0, i]
+        # only coarse bins whose finer bins are all still in the ring; older ones keep their summary
+        keep = (keys * ratio >= fine.oldest) & held.any(axis=1)
+        coarse.write(keys[keep], out[keep])
+        self._compact(level + 1, int(keys[0]), int(keys[-1]))
+
+    def archive_for(self, start=None) -> str:
+        """
+        Resolution a query from start should read: the finest archive whose
+        retention window reaches back to start (the whole history if None).
+        """
+        self._refresh()
+        filled = [a for a in self.archives if a.head is not None]
+        if not filled:
+            raise KeyError(f"Round-robin store {self.path} holds no data")
+        oldest = [a.start * a.width - (self.tz_offset or 0) * 60 for a in filled]
+        t = min(oldest) if start is None else to_epoch(start, self.tz_offset)
+        for archive, first in zip(filled, oldest):
+            if first <= t:
+                return archive.freq
+        return filled[int(np.argmin(oldest))].freq
+
+    def _read_range(self, freq: str, start=None, end=None) -> tuple:
+        """(epoch, held, summaries) of the freq archive's bins in [start, end), from its first held bin"""
+        archive = self.archives[self._level(freq)]
+        if archive.head is None:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool), np.zeros((0, len(self.metrics), len(SUMMARIES)))
+        shift = (self.tz_offset or 0) * 60
+        lo, hi = archive.start, archive.head + 1
+        if start is not None:
+            lo = max(lo, -(-(to_epoch(start, self.tz_offset) + shift) // archive.width))
+        if end is not None:
+            hi = min(hi, -(-(to_epoch(end, self.tz_offset) + shift) // archive.width))
+        bins = np.arange(lo, max(lo, hi), dtype=np.int64)
+        held, data = archive.read(bins)
+        first = int(np.argmax(held)) if held.any() else len(bins)
+        return bins[first:] * archive.width - shift, held[first:], data[first:]
+
+    def _timestamps(self, epoch: np.ndarray) -> pd.DatetimeIndex:
+        if self.tz_offset is None:
+            return pd.DatetimeIndex(epoch.astype("datetime64[s]")).as_unit("ns")
+        return to_datetime_index(epoch, np.full(len(epoch), self.tz_offset, dtype=np.int16))
+
+    def fetch(self, start=None, end=None, freq: str = None, metrics: list = None) -> pd.DataFrame:
+        """
+        Summaries (<metric>_sum, _max, _min, _count) of the bins in [start, end)
+        at freq, or at the finest resolution still covering start. The
+        resolution read is in df.attrs["freq"].
+        """
+        self._refresh()
+        freq = freq or self.archive_for(start)
+        metrics = self.metrics if metrics is None else list(metrics)
+        for name in metrics:
+            if name not in self.metrics:
+                raise KeyError(f"Unknown metric: {name}")
+        epoch, _, data = self._read_range(freq, start, end)
+        df = pd.DataFrame({"timestamp": self._timestamps(epoch)})
+        for name in metrics:
+            i = self.metrics.index(name)
+            for j, summary in enumerate(SUMMARIES):
+                df[f"{name}_{summary}"] = data[:, i, j].astype(np.int64) if summary == "count" else data[:, i, j]
+        df.attrs["freq"] = self.archives[self._level(freq)].freq
+        return df
+
+    def to_frame(self, freq: str = None, columns: list = None, start=None, end=None) -> pd.DataFrame:
+        """
+        Traffic table of one archive (default the finest): counters summed,
+        MAX_METRICS maxed, NaN where a bin has no data. is_outage is 1 when
+        the bin starts inside an outage, and the other metrics of those bins
+        are NaN (as apply_outage_mask leaves them).
+        """
+        self._refresh()
+        columns = self.metrics if columns is None else list(columns)
+        for name in columns:
+            if name not in self.metrics:
+                raise KeyError(f"Unknown metric: {name}")
+        epoch, _, data = self._read_range(freq or self.archives[0].freq, start, end)
+        df = pd.DataFrame({"timestamp": self._timestamps(epoch)})
+        outage = np.zeros(len(epoch), dtype=bool)
+        if "is_outage" in self.metrics:
+            i = self.metrics.index("is_outage")
+            outage = (data[:, i, 3] > 0) & (data[:, i, 0] > 0)
+        for name in columns:
+            i = self.metrics.index(name)
+            if name == "is_outage":
+                df[name] = outage.astype("int8")
+                continue
+            value = data[:, i, 1 if name in MAX_METRICS else 0]
+            df[name] = np.where((data[:, i, 3] > 0) & ~outage, value, np.nan)
+        return df
+
+    def series(self, freq: str) -> ArchiveSeries:
+        """One archive as a window-searchable traffic series; rebuilt only after the store changes"""
+        self._refresh()
+        cached = self._series.get(freq)
+        if cached is None or cached[0] != self._mtime:
+            df = self.to_frame(freq)
+            epoch, _ = epoch_seconds(df["timestamp"]) if len(df) else (np.zeros(0, dtype=np.int64), None)
+            name = f"{os.path.basename(self.path)}/{freq}"
+            cached = self._series[freq] = (self._mtime, ArchiveSeries(name, df, epoch, self.tz_offset))
+        return cached[1]
+
+    def spans(self) -> dict:
+        """{freq: (first, last) bin timestamp} of the archives holding data"""
+        self._refresh()
+        shift = (self.tz_offset or 0) * 60
+        return {a.freq: tuple(self._timestamps(np.array([a.start, a.head]) * a.width - shift))
+                for a in self.archives if a.head is not None}
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes allocated on disk for the archives written so far (each fixed once allocated)"""
+        return sum(a.slots * (8 + len(self.metrics) * len(SUMMARIES) * 8) for a in self.archives if a.allocated)
+
+
+# One store object per directory, so archives stay mapped across calls
+_RRDS = {}
+
+
+def open_rrd(path: str):
+    """Round-robin store at path (cached), or None if there is none"""
+    path = os.path.abspath(path)
+    if not os.path.exists(os.path.join(path, "meta.json")):
+        _RRDS.pop(path, None)
+        return None
+    store = _RRDS.get(path)
+    if store is None:
+        store = _RRDS[path] = RoundRobinStore(path)
+    return store
+
+
+def read_traffic_history(csv_path: str, columns: list = None) -> pd.DataFrame:
+    """
+    Traffic table of a traffic CSV (nasa_traffic_<suffix>.csv) read through
+    the round-robin store next to it when that store holds the resolution,
+    with the columns the store does not keep (p95_rps, unique_hosts, ...)
+    joined from the CSV by timestamp; otherwise from the binary store / CSV
+    (store.read_traffic).
+    """
+    directory, filename = os.path.split(os.path.abspath(csv_path))
+    freq = SUFFIX_FREQS.get(os.path.splitext(filename)[0].rsplit("_", 1)[-1])
+    rrd = open_rrd(os.path.join(directory, RRD_NAME))
+    if rrd is None or freq is None or not rrd.has(freq):
+        return read_traffic(csv_path, columns)
+    df = rrd.to_frame(freq, [c for c in columns if c in rrd.metrics] if columns is not None else None)
+    if columns is not None and all(c in rrd.metrics for c in columns):
+        return df
+    if not os.path.exists(csv_path):
+        # exports skipped (--no-export): the store's metrics only
+        return df if columns is None else df[["timestamp"] + [c for c in columns if c in df.columns]]
+    extra = read_traffic(csv_path)
+    order = list(extra.columns) + [c for c in df.columns if c not in extra.columns]
+    extra = extra[["timestamp"] + [c for c in extra.columns if c != "timestamp" and c not in rrd.metrics]]
+    df = df.merge(extra, on="timestamp", how="left")
+    return df[order if columns is None else ["timestamp"] + list(columns)]
@@ -0,0 +1,182 @@
+"""
+Streaming sessionization of the (host, timestamp) stream.
+
+A session is a run of requests from one host with no gap longer than
+SESSION_TIMEOUT. SessionBins keeps only the sessions that may still grow,
+in an OrderedDict ordered by last activity, so expiry pops from the front
+and memory is bounded by MAX_SESSIONS (the least recently active session
+is closed early when the bound is hit).
+
+Blocks are handled vectorized: records are sorted by (host, time), gaps
+split them into session segments, and only the first segment of each host
+is matched against the open sessions in Python. Every session is counted
+exactly once, when it closes:
+
+- new_sessions:    sessions starting in the bin,
+- active_sessions: sessions whose [first, last request] span overlaps the bin,
+
+kept as difference arrays per output resolution (active counts of coarse
+bins cannot be summed from finer bins). Input must be time-ordered up to
+small reordering, e.g. the k-way merged stream or a whole DataFrame.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .aggregate import TrafficBins, freq_to_seconds
+from .timestamps import from_datetime_index
+
+# Inactivity (seconds) that ends a session
+SESSION_TIMEOUT = 30 * 60
+
+# Open sessions kept at most
+MAX_SESSIONS = 1_000_000
+
+# Resolutions the session counts are kept for
+SESSION_FREQS = ("1min", "5min", "15min")
+
+SESSION_COLUMNS = ("active_sessions", "new_sessions")
+
+
+class _SessionCounts(TrafficBins):
+    """Per-bin session starts and a difference array of active sessions."""
+
+    COLUMNS = ("new_sessions", "active_delta")
+
+    def count(self, starts: np.ndarray, ends: np.ndarray):
+        """Count closed sessions spanning [starts, ends] (epoch seconds)"""
+        first = (starts + self.tz_offset * 60) // self.width
+        after = (ends + self.tz_offset * 60) // self.width + 1
+        lo, hi = int(first.min()), int(after.max())
+        self._reserve(lo, hi)
+        n = hi - lo + 1
+        sums = np.zeros((n, 2), dtype=np.int64)
+        sums[:, 0] = np.bincount(first - lo, minlength=n)
+        sums[:, 1] = sums[:, 0] - np.bincount(after - lo, minlength=n)
+        start = lo - self.first_bin
+        self._counts[start:start + n] += sums
+
+
+class SessionBins:
+    """Inactivity-timeout sessions per host, counted per bin."""
+
+    def __init__(self, timeout: int = SESSION_TIMEOUT, freqs: tuple = SESSION_FREQS,
+                 max_sessions: int = MAX_SESSIONS, tz_offset: int = None):
+        self.timeout = timeout
+        self.freqs = tuple(freqs)
+        self.freq = self.freqs[0]
+        self.width = freq_to_seconds(self.freq)
+        self.max_sessions = max_sessions
+        # UTC offset (minutes) the bins are aligned to; first record's if None
+        self.tz_offset = tz_offset
+        # host -> [first, last] epoch of the open session, least recently active first
+        self.open = OrderedDict()
+        self.max_seen = None
+        self.evicted = 0
+        self._counts = {f: _SessionCounts(f, tz_offset) for f in self.freqs}
+
+    def _close(self, starts, ends):
+        if len(starts) == 0:
+            return
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        for c in self._counts.values():
+            c.count(starts, ends)
+
+    def _expire(self):
+        """Close sessions idle for longer than the timeout, and the oldest ones over the bound"""
+        cutoff = self.max_seen - self.timeout
+        starts, ends = [], []
+        while self.open:
+            host, (first, last) = next(iter(self.open.items()))
+            if last >= cutoff and len(self.open) <= self.max_sessions:
+                break
+            if last >= cutoff:
+                self.evicted += 1
+            del self.open[host]
+            starts.append(first)
+            ends.append(last)
+        self._close(starts, ends)
+
+    def add(self, epoch: np.ndarray, tz_offset: np.ndarray, hosts: np.ndarray):
+        """Fold records (epoch seconds, UTC offset minutes, host; None is skipped)"""
+        if len(epoch) == 0:
+            return
+        if self.tz_offset is None:
+            self.tz_offset = int(tz_offset[0])
+            for c in self._counts.values():
+                c.tz_offset = self.tz_offset
+
+        codes, uniques = pd.factorize(np.asarray(hosts, dtype=object))
+        valid = codes >= 0
+        if not valid.any():
+            return
+        epoch = np.asarray(epoch, dtype=np.int64)[valid]
+        codes = codes[valid]
+        order = np.lexsort((epoch, codes))
+        c, t = codes[order], epoch[order]
+
+        # session segments: a new host or a gap longer than the timeout starts one
+        first_of_host = np.r_[True, c[1:] != c[:-1]]
+        brk = first_of_host | (np.r_[0, np.diff(t)] > self.timeout)
+        seg = np.flatnonzero(brk)
+        seg_host = c[seg]
+        seg_t0 = t[seg]
+        seg_t1 = t[np.r_[seg[1:] - 1, len(t) - 1]]
+        seg_last = np.r_[seg_host[1:] != seg_host[:-1], True]
+
+        # the first segment of a host may continue its open session
+        closed_t0, closed_t1 = [], []
+        for i in np.flatnonzero(first_of_host[seg]).tolist():
+            prev = self.open.pop(uniques[seg_host[i]], None)
+            if prev is None:
+                continue
+            if seg_t0[i] - prev[1] <= self.timeout:
+                seg_t0[i] = min(seg_t0[i], prev[0])
+                seg_t1[i] = max(seg_t1[i], prev[1])
+            else:
+                closed_t0.append(prev[0])
+                closed_t1.append(prev[1])
+
+        # segments followed by another one of the same host are finished sessions
+        done = ~seg_last
+        self._close(np.r_[closed_t0, seg_t0[done]], np.r_[closed_t1, seg_t1[done]])
+
+        # the last segment of each host stays open, re-queued by last activity
+        last = np.flatnonzero(seg_last)
+        last = last[np.argsort(seg_t1[last], kind="stable")]
+        for host, t0, t1 in zip(uniques[seg_host[last]], seg_t0[last].tolist(), seg_t1[last].tolist()):
+            self.open[host] = [t0, t1]
+
+        top = int(t.max())
+        self.max_seen = top if self.max_seen is None else max(self.max_seen, top)
+        self._expire()
+
+    def add_block(self, block: dict):
+        """Fold a parsed block that carries hosts (fastparse fields=True)"""
+        self.add(block["epoch"], block["tz_offset"], block["host"])
+
+    def add_frame(self, df: pd.DataFrame):
+        """Fold a whole parsed-log DataFrame (tz-aware 'timestamp' column)"""
+        ok, epoch, tz_offset = from_datetime_index(df["timestamp"])
+        self.add(epoch[ok], tz_offset[ok], df["host"].to_numpy(dtype=object)[ok])
+
+    def finish(self):
+        """End of input: close every open session"""
+        sessions = list(self.open.values())
+        self.open.clear()
+        self._close([s[0] for s in sessions], [s[1] for s in sessions])
+
+    def to_frame(self, freq: str) -> pd.DataFrame:
+        """Timestamp, active_sessions and new_sessions at one of self.freqs (closes open sessions)"""
+        if freq not in self._counts:
+            raise ValueError(f"Session counts are kept for {self.freqs}, not {freq}")
+        self.finish()
+        df = self._counts[freq].to_frame()
+        df["active_sessions"] = df.pop("active_delta").cumsum()
+        # drop the trailing bin that only holds the last sessions' decrement
+        busy = np.flatnonzero(df["active_sessions"].to_numpy())
+        df = df.iloc[:busy[-1] + 1] if len(busy) else df.iloc[:0]
+        return df[["timestamp"] + list(SESSION_COLUMNS)].reset_index(drop=True)
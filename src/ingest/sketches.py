@@ -0,0 +1,207 @@
+"""
+Bounded-memory heavy-hitter sketches (Space-Saving) per time bin.
+
+TopKBins keeps, for every SKETCH_FREQ bin, a summary of at most `capacity`
+values of one text field (url, host, ...) with an overestimated count and
+its maximum error:
+
+    keys      values kept for the bin
+    counts    estimated count per key (never below the true count)
+    errors    how much of the count may be overestimate
+    floor     bound on the count of any key that is not kept
+
+so memory per bin is fixed however many requests the bin receives. A
+summary is merged with another by adding counts (an absent key counts as
+the other summary's floor) and keeping the `capacity` largest, which is
+how blocks are folded into bins and how top() answers a time range: every
+value whose true count exceeds the range's floor is guaranteed to be kept.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from .aggregate import _block_starts, freq_to_seconds
+from .timestamps import from_datetime_index
+
+# Bin width of the sketches
+SKETCH_FREQ = "5min"
+
+# Values kept per bin and field
+SKETCH_CAPACITY = 50
+
+# Text fields sketched by the log pipeline
+SKETCH_FIELDS = ("url", "host")
+
+
+def _truncate(keys: np.ndarray, counts: np.ndarray, errors: np.ndarray, floor: int, capacity: int) -> tuple:
+    """Keep the capacity largest counts (descending); dropped counts raise the floor"""
+    if len(keys) > capacity:
+        part = np.argpartition(-counts, capacity)
+        floor = max(floor, int(counts[part[capacity:]].max()))
+        keep = part[:capacity]
+        keys, counts, errors = keys[keep], counts[keep], errors[keep]
+    order = np.argsort(-counts, kind="stable")
+    return keys[order], counts[order], errors[order], floor
+
+
+def merge_summaries(parts: list, capacity: int) -> tuple:
+    """Merge (keys, counts, errors, floor) summaries into one of at most capacity keys"""
+    if len(parts) == 1:
+        return _truncate(*parts[0], capacity)
+    keys = np.concatenate([p[0] for p in parts])
+    counts = np.concatenate([p[1] for p in parts])
+    errors = np.concatenate([p[2] for p in parts])
+    floors = np.array([p[3] for p in parts], dtype=np.int64)
+    own_floor = np.repeat(floors, [len(p[0]) for p in parts])
+    total_floor = int(floors.sum())
+
+    # a key absent from a summary is charged that summary's floor
+    codes, uniques = pd.factorize(keys)
+    est = np.bincount(codes, weights=counts - own_floor, minlength=len(uniques))
+    err = np.bincount(codes, weights=errors - own_floor, minlength=len(uniques))
+    est = np.rint(est).astype(np.int64) + total_floor
+    err = np.rint(err).astype(np.int64) + total_floor
+    return _truncate(np.asarray(uniques, dtype=object), est, err, total_floor, capacity)
+
+
+class TopKBins:
+    """Space-Saving summaries of one text field per fixed-width time bin."""
+
+    def __init__(self, field: str, freq: str = SKETCH_FREQ, capacity: int = SKETCH_CAPACITY, tz_offset: int = None):
+        self.field = field
+        self.freq = freq
+        self.width = freq_to_seconds(freq)
+        self.capacity = capacity
+        # UTC offset (minutes) the bins are aligned to; first record's if None
+        self.tz_offset = tz_offset
+        # bin number -> (keys, counts, errors, floor)
+        self.summaries = {}
+
+    def __len__(self) -> int:
+        return len(self.summaries)
+
+    def _fold(self, b: int, summary: tuple):
+        old = self.summaries.get(b)
+        self.summaries[b] = merge_summaries([old, summary] if old is not None else [summary], self.capacity)
+
+    def add(self, epoch: np.ndarray, tz_offset: np.ndarray, keys: np.ndarray):
+        """Fold records (epoch seconds, UTC offset minutes, field values; None is skipped)"""
+        if len(epoch) == 0:
+            return
+        if self.tz_offset is None:
+            self.tz_offset = int(tz_offset[0])
+
+        codes, uniques = pd.factorize(np.asarray(keys, dtype=object))
+        valid = codes >= 0
+        if not valid.any():
+            return
+        b = (np.asarray(epoch, dtype=np.int64)[valid] + self.tz_offset * 60) // self.width
+        lo = int(b.min())
+        n_keys = len(uniques)
+
+        # exact (bin, key) counts of the block, grouped by bin
+        pairs, counts = np.unique((b - lo) * n_keys + codes[valid], return_counts=True)
+        pair_bins = pairs // n_keys + lo
+        values = np.asarray(uniques, dtype=object)[pairs % n_keys]
+        starts = _block_starts(pair_bins)
+        for s, e in zip(starts, np.r_[starts[1:], len(pairs)]):
+            c = counts[s:e].astype(np.int64)
+            self._fold(int(pair_bins[s]), (values[s:e], c, np.zeros(len(c), dtype=np.int64), 0))
+
+    def add_block(self, block: dict):
+        """Fold a parsed block that carries the field (fastparse fields=True)"""
+        self.add(block["epoch"], block["tz_offset"], block[self.field])
+
+    def add_frame(self, df: pd.DataFrame):
+        """Fold a parsed-log DataFrame (tz-aware 'timestamp' column)"""
+        ok, epoch, tz_offset = from_datetime_index(df["timestamp"])
+        self.add(epoch[ok], tz_offset[ok], df[self.field].to_numpy(dtype=object)[ok])
+
+    def merge(self, other: "TopKBins"):
+        """Add another TopKBins of the same field and width into this one"""
+        if other.width != self.width:
+            raise ValueError("Cannot merge sketches of different widths")
+        if not other.summaries:
+            return
+        if self.tz_offset is None:
+            self.tz_offset = other.tz_offset
+        elif other.tz_offset != self.tz_offset:
+            raise ValueError("Cannot merge sketches aligned to different UTC offsets")
+        for b, summary in other.summaries.items():
+            self._fold(b, summary)
+
+    def _local_second(self, when) -> int:
+        """Bin-aligned wall-clock second of a timestamp (naive ones are taken as local)"""
+        ts = pd.Timestamp(when)
+        if ts.tz is not None:
+            return int((ts.tz_convert("UTC").tz_localize(None) - pd.Timestamp(0)) // pd.Timedelta(seconds=1)) \
+                + (self.tz_offset or 0) * 60
+        return int((ts - pd.Timestamp(0)) // pd.Timedelta(seconds=1))
+
+    def top(self, k: int = 10, start=None, end=None) -> pd.DataFrame:
+        """
+        The k most frequent values over the bins overlapping [start, end)
+        (default: everything), as a DataFrame with the field, its estimated
+        count and the maximum overestimate (error) of that count.
+        """
+        lo = self._local_second(start) // self.width if start is not None else -np.inf
+        hi = -(-self._local_second(end) // self.width) if end is not None else np.inf
+        parts = [s for b, s in self.summaries.items() if lo <= b < hi]
+        if not parts:
+            return pd.DataFrame({self.field: [], "count": [], "error": []})
+        keys, counts, errors, _ = merge_summaries(parts, max(self.capacity, k))
+        return pd.DataFrame({self.field: keys[:k], "count": counts[:k], "error": errors[:k]})
+
+    def state(self) -> dict:
+        """Arrays describing the sketches (for np.savez / from_state)"""
+        bins = np.array(sorted(self.summaries), dtype=np.int64)
+        parts = [self.summaries[b] for b in bins]
+        keys = np.concatenate([p[0] for p in parts]) if parts else np.zeros(0, dtype=object)
+        codes, vocab = pd.factorize(keys)
+        meta = {"field": self.field, "freq": self.freq, "capacity": self.capacity, "tz_offset": self.tz_offset}
+        return {
+            "meta": np.array(json.dumps(meta)),
+            "vocab": np.array(json.dumps([str(v) for v in vocab])),
+            "bins": bins,
+            "offsets": np.cumsum([0] + [len(p[0]) for p in parts]).astype(np.int64),
+            "codes": codes.astype(np.int32),
+            "counts": np.concatenate([p[1] for p in parts]) if parts else np.zeros(0, dtype=np.int64),
+            "errors": np.concatenate([p[2] for p in parts]) if parts else np.zeros(0, dtype=np.int64),
+            "floors": np.array([p[3] for p in parts], dtype=np.int64),
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "TopKBins":
+        """Rebuild sketches saved with state()"""
+        meta = json.loads(str(state["meta"]))
+        sk = cls(meta["field"], meta["freq"], meta["capacity"], meta["tz_offset"])
+        vocab = np.array(json.loads(str(state["vocab"])), dtype=object)
+        offsets = state["offsets"]
+        for i, b in enumerate(state["bins"]):
+            lo, hi = offsets[i], offsets[i + 1]
+            sk.summaries[int(b)] = (vocab[state["codes"][lo:hi]], np.array(state["counts"][lo:hi]),
+                                    np.array(state["errors"][lo:hi]), int(state["floors"][i]))
+        return sk
+
+
+def save_topk(path: str, sketches: dict):
+    """Write {field: TopKBins} to one compressed .npz"""
+    arrays = {}
+    for field, sk in sketches.items():
+        arrays.update({f"{field}/{k}": v for k, v in sk.state().items()})
+    np.savez_compressed(path, **arrays)
+
+
+def load_topk(path: str) -> dict:
+    """Read {field: TopKBins} written by save_topk"""
+    with np.load(path) as z:
+        fields = sorted({name.split("/", 1)[0] for name in z.files})
+        return {f: TopKBins.from_state({k.split("/", 1)[1]: z[k] for k in z.files if k.startswith(f + "/")})
+                for f in fields}
+
+
+def query_topk(path: str, field: str, k: int = 10, start=None, end=None) -> pd.DataFrame:
+    """Top-k values of field over [start, end) from a save_topk file"""
+    return load_topk(path)[field].top(k, start, end)
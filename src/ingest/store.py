@@ -0,0 +1,246 @@
+"""
+Memory-mapped binary traffic store.
+
+Every traffic table (nasa_traffic_1m, nasa_traffic_15m, ...) is kept as one
+directory of .npy columns next to its CSV, which stays as an export format:
+
+    processed_data/traffic_store/
+        nasa_traffic_15m/
+            meta.json             rows, UTC offset, column dtypes, source
+            timestamp.npy         int64 epoch seconds (UTC)
+            request_count.npy     int32, or float32 when it holds NaN
+            total_bytes.npy       ...
+        nasa_traffic_5m/ ...
+
+Columns are opened with np.load(mmap_mode="r"): opening a series reads
+only meta.json and the .npy headers, column access is zero-copy, and
+every process that opens the same series shares the same page-cache pages.
+Integer-valued columns are int32 (int64 if needed); columns with NaN or
+fractions are float32 unless float32 would change a value, then float64.
+
+read_traffic() is a drop-in for pd.read_csv(path, parse_dates=["timestamp"])
+on a traffic CSV: it opens the store entry, importing the CSV into the
+store first if the entry is missing or older than the CSV.
+"""
+
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from .timestamps import epoch_seconds, to_datetime_index
+from .windows import WindowIndex
+
+FORMAT_VERSION = 1
+
+# Store directory created next to the traffic CSVs
+STORE_NAME = "traffic_store"
+
+
+def _column_dtype(values: np.ndarray) -> np.dtype:
+    """Smallest on-disk type that keeps every value of a numeric column"""
+    if values.dtype.kind == "b":
+        return np.dtype(np.int8)
+    if values.dtype.kind in "iu":
+        fits = not len(values) or (values.min() >= np.iinfo(np.int32).min and values.max() <= np.iinfo(np.int32).max)
+        return np.dtype(np.int32 if fits else np.int64)
+    finite = values[np.isfinite(values)]
+    if len(finite) == len(values) and np.array_equal(finite, np.round(finite)):
+        return _column_dtype(finite.astype(np.int64))
+    if np.array_equal(finite.astype(np.float32).astype(values.dtype), finite):
+        return np.dtype(np.float32)
+    return np.dtype(np.float64)
+
+
+class TrafficSeries:
+    """One stored traffic table: memory-mapped columns, materialised on demand."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported traffic store version: {self.meta.get('version')}")
+        self.name = os.path.basename(path)
+        self.tz_offset = self.meta["tz_offset"]
+        self.columns = list(self.meta["columns"])
+        self._mapped = {}
+        self._index = None
+        self._windows = None
+
+    def __len__(self) -> int:
+        return self.meta["rows"]
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only memory-mapped column ('timestamp' is int64 epoch seconds)"""
+        arr = self._mapped.get(name)
+        if arr is None:
+            if name != "timestamp" and name not in self.meta["columns"]:
+                raise KeyError(f"Column not in traffic series {self.name}: {name}")
+            arr = self._mapped[name] = np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r")
+        return arr
+
+    @property
+    def epoch(self) -> np.ndarray:
+        return self.column("timestamp")
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        """Timestamps as a DatetimeIndex (tz-aware unless the source was naive); built once"""
+        if self._index is None:
+            epoch = np.asarray(self.epoch)
+            if self.tz_offset is None:
+                self._index = pd.DatetimeIndex(epoch.astype("datetime64[s]")).as_unit("ns")
+            else:
+                self._index = to_datetime_index(epoch, np.full(len(epoch), self.tz_offset, dtype=np.int16))
+        return self._index
+
+    @property
+    def windows(self) -> WindowIndex:
+        """Time-range index (binary search + prefix sums) over this series; built once"""
+        if self._windows is None:
+            self._windows = WindowIndex.for_series(self)
+        return self._windows
+
+    def to_frame(self, columns: list = None, start=None, end=None) -> pd.DataFrame:
+        """
+        Table as read_csv(parse_dates=["timestamp"]) returned it: columns are
+        copied out of the maps and widened back to their source dtypes.
+        start / end restrict it to the bins in [start, end) (binary search,
+        only those rows are copied).
+        """
+        columns = self.columns if columns is None else list(columns)
+        lo, hi = self.windows.bounds(start, end) if start is not None or end is not None else (0, len(self))
+        out = {"timestamp": self.index[lo:hi]}
+        for name in columns:
+            out[name] = self.column(name)[lo:hi].astype(self.meta["columns"][name]["source_dtype"])
+        return pd.DataFrame(out)
+
+
+class TrafficStore:
+    """Directory of TrafficSeries, written by the pipeline and opened by every reader."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._open = {}
+
+    def series_path(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def __contains__(self, name: str) -> bool:
+        return os.path.exists(os.path.join(self.series_path(name), "meta.json"))
+
+    def names(self) -> list:
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(n for n in os.listdir(self.path) if n in self)
+
+    def written(self, name: str) -> float:
+        """Time the series was last written (0 if absent)"""
+        if name not in self:
+            return 0.0
+        return TrafficSeries(self.series_path(name)).meta["written"]
+
+    def write(self, name: str, df: pd.DataFrame, source: str = None) -> dict:
+        """
+        Store a traffic table ('timestamp' column plus numeric metrics),
+        replacing any previous version. Returns the metadata written.
+        """
+        if "timestamp" not in df.columns:
+            raise ValueError("Traffic store needs a 'timestamp' column")
+        epoch, tz_offset = epoch_seconds(df["timestamp"])
+
+        columns, schema = {}, {}
+        for col in df.columns:
+            if col == "timestamp":
+                continue
+            values = df[col]
+            if values.dtype.kind not in "iufb":
+                raise ValueError(f"Traffic store holds numeric columns only: {col} is {values.dtype}")
+            if values.isna().any():
+                arr = values.to_numpy(dtype=np.float64, na_value=np.nan)
+            else:
+                arr = values.to_numpy(dtype=getattr(values.dtype, "numpy_dtype", values.dtype))
+            dtype = _column_dtype(arr)
+            columns[col] = arr.astype(dtype)
+            # to_frame() widens back to what the table held (float64 where NaN was)
+            schema[col] = {"dtype": dtype.name, "source_dtype": arr.dtype.name}
+
+        # write a fresh directory, then swap it in (readers never see half a series)
+        final = self.series_path(name)
+        tmp = final + ".tmp"
+        if os.path.isdir(tmp):
+            shutil.rmtree(tmp)
+        os.makedirs(tmp)
+        np.save(os.path.join(tmp, "timestamp.npy"), epoch)
+        for col, arr in columns.items():
+            np.save(os.path.join(tmp, f"{col}.npy"), arr)
+        meta = {
+            "version": FORMAT_VERSION,
+            "rows": int(len(df)),
+            "tz_offset": tz_offset,
+            "columns": schema,
+            "source": source,
+            "written": time.time(),
+        }
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        if os.path.isdir(final):
+            shutil.rmtree(final)
+        os.replace(tmp, final)
+        self._open.pop(name, None)
+        return meta
+
+    def open(self, name: str) -> TrafficSeries:
+        """Memory-mapped series (cached per store; reopened after a write)"""
+        series = self._open.get(name)
+        if series is None or series.meta["written"] != self.written(name):
+            if name not in self:
+                raise KeyError(f"Traffic series not in store {self.path}: {name}")
+            series = self._open[name] = TrafficSeries(self.series_path(name))
+        return series
+
+    def import_csv(self, csv_path: str, name: str = None) -> dict:
+        """Convert a traffic CSV into a store entry (named after the file by default)"""
+        name = name or os.path.splitext(os.path.basename(csv_path))[0]
+        df = pd.read_csv(csv_path, parse_dates=["timestamp"])
+        return self.write(name, df, source=os.path.abspath(csv_path))
+
+
+# One store object per directory, so series stay mapped across calls
+_STORES = {}
+
+
+def get_store(path: str) -> TrafficStore:
+    path = os.path.abspath(path)
+    store = _STORES.get(path)
+    if store is None:
+        store = _STORES[path] = TrafficStore(path)
+    return store
+
+
+def open_traffic(csv_path: str) -> TrafficSeries:
+    """
+    Series of a traffic CSV from the store next to it. The CSV is imported
+    first when the store has no entry for it or the CSV is newer.
+    """
+    directory, filename = os.path.split(os.path.abspath(csv_path))
+    name = os.path.splitext(filename)[0]
+    store = get_store(os.path.join(directory, STORE_NAME))
+    if os.path.exists(csv_path) and os.path.getmtime(csv_path) > store.written(name):
+        store.import_csv(csv_path, name)
+    return store.open(name)
+
+
+def read_traffic(csv_path: str, columns: list = None) -> pd.DataFrame:
+    """Drop-in for pd.read_csv(csv_path, parse_dates=['timestamp']) served from the binary store"""
+    try:
+        series = open_traffic(csv_path)
+    except (OSError, ValueError):
+        # read-only data directory or a table the store cannot hold: plain CSV
+        df = pd.read_csv(csv_path, parse_dates=["timestamp"])
+        return df if columns is None else df[["timestamp"] + list(columns)]
+    return series.to_frame(columns)
@@ -0,0 +1,246 @@
+"""
+Fixed-width decoder for Common Log Format timestamps.
+
+NASA-style logs always write '01/Jul/1995:00:00:01 -0400' (26 characters),
+and many consecutive lines share the same second. Instead of running
+datetime.strptime / pd.to_datetime on every string, the fields are read by
+position, the month goes through a lookup table and the result is turned
+straight into an int64 epoch. Both the scalar and the array decoder
+memoize the last second seen, so repeated timestamps are free.
+
+Anything that is not in that exact layout is handed to strptime, so the
+results (and the errors) are always the same as
+datetime.strptime(ts, CLF_TS_FORMAT).
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+CLF_TS_FORMAT = "%d/%b/%Y:%H:%M:%S %z"
+TS_LEN = 26
+
+MONTHS = {m: i + 1 for i, m in enumerate(
+    ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"])}
+
+# Month abbreviation packed into an int (3 chars) -> month number, sorted for searchsorted
+_MONTH_KEYS = np.array(sorted((ord(m[0]) << 16) | (ord(m[1]) << 8) | ord(m[2]) for m in MONTHS))
+_MONTH_OF_KEY = np.array([MONTHS[chr(k >> 16) + chr((k >> 8) & 255) + chr(k & 255)] for k in _MONTH_KEYS])
+_DAYS_IN_MONTH = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+# Positions of the separator and digit characters inside the timestamp
+_SEPS = {2: "/", 6: "/", 11: ":", 14: ":", 17: ":", 20: " "}
+_DIGITS = np.array([0, 1, 7, 8, 9, 10, 12, 13, 15, 16, 18, 19, 22, 23, 24, 25])
+
+# Epoch seconds representable as datetime64[ns]
+_NS_MIN_EPOCH, _NS_MAX_EPOCH = -9223372036, 9223372036
+
+_TZ_CACHE = {}
+
+
+def tz_from_offset(minutes: int) -> timezone:
+    """Shared fixed-offset tzinfo for a UTC offset in minutes"""
+    tz = _TZ_CACHE.get(minutes)
+    if tz is None:
+        tz = _TZ_CACHE[minutes] = timezone(timedelta(minutes=minutes))
+    return tz
+
+
+def days_from_civil(y, m, d):
+    """Days since 1970-01-01 for proleptic Gregorian dates (scalars or arrays)"""
+    y = y - (m <= 2)
+    era = y // 400
+    yoe = y - era * 400
+    mp = (m + 9) % 12
+    doy = (153 * mp + 2) // 5 + d - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+def decode_fixed_width(g: np.ndarray) -> tuple:
+    """
+    Decode timestamps laid out one per row of the integer array g
+    (byte or code-point values, at least TS_LEN columns).
+
+    Returns (ok, epoch, tz_offset_minutes); ok is False wherever the row is
+    not a valid timestamp in exactly the fixed-width layout.
+    """
+    ok = np.ones(len(g), dtype=bool)
+    for off, ch in _SEPS.items():
+        ok &= g[:, off] == ord(ch)
+    sign = g[:, 21]
+    ok &= (sign == ord("+")) | (sign == ord("-"))
+
+    digits = g[:, _DIGITS].astype(np.int32) - 48
+    ok &= ((digits >= 0) & (digits <= 9)).all(axis=1)
+    day = digits[:, 0] * 10 + digits[:, 1]
+    year = digits[:, 2] * 1000 + digits[:, 3] * 100 + digits[:, 4] * 10 + digits[:, 5]
+    hour = digits[:, 6] * 10 + digits[:, 7]
+    minute = digits[:, 8] * 10 + digits[:, 9]
+    second = digits[:, 10] * 10 + digits[:, 11]
+    tz_h = digits[:, 12] * 10 + digits[:, 13]
+    tz_m = digits[:, 14] * 10 + digits[:, 15]
+
+    key = (g[:, 3].astype(np.int64) << 16) | (g[:, 4].astype(np.int64) << 8) | g[:, 5].astype(np.int64)
+    pos = np.minimum(np.searchsorted(_MONTH_KEYS, key), len(_MONTH_KEYS) - 1)
+    ok &= _MONTH_KEYS[pos] == key
+    month = _MONTH_OF_KEY[pos]
+
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    dim = _DAYS_IN_MONTH[month] + ((month == 2) & leap)
+    ok &= (year >= 1) & (day >= 1) & (day <= dim)
+    ok &= (hour <= 23) & (minute <= 59) & (second <= 59)
+    ok &= (tz_h <= 23) & (tz_m <= 59)
+
+    tz_offset = np.where(sign == ord("-"), -1, 1) * (tz_h * 60 + tz_m)
+    epoch = (days_from_civil(year.astype(np.int64), month, day) * 86400
+             + hour * 3600 + minute * 60 + second - tz_offset * 60)
+    return ok, epoch, tz_offset
+
+
+class ClfTimestampDecoder:
+    """Scalar decoder with a one-entry memo of the last timestamp string seen."""
+
+    def __init__(self):
+        self._last_ts = None
+        self._last = None
+
+    def _decode(self, ts: str) -> tuple:
+        """(datetime, epoch, tz_offset_minutes) for one timestamp string"""
+        if (len(ts) == TS_LEN and ts[2] == "/" and ts[6] == "/" and ts[11] == ":"
+                and ts[14] == ":" and ts[17] == ":" and ts[20] == " " and ts[21] in "+-"):
+            digits = ts[0:2] + ts[7:11] + ts[12:14] + ts[15:17] + ts[18:20] + ts[22:26]
+            month = MONTHS.get(ts[3:6])
+            if month and digits.isascii() and digits.isdigit():
+                day, year = int(ts[0:2]), int(ts[7:11])
+                hour, minute, second = int(ts[12:14]), int(ts[15:17]), int(ts[18:20])
+                tz_h, tz_m = int(ts[22:24]), int(ts[24:26])
+                if tz_h <= 23 and tz_m <= 59:
+                    offset = (-1 if ts[21] == "-" else 1) * (tz_h * 60 + tz_m)
+                    try:
+                        dt = datetime(year, month, day, hour, minute, second, tzinfo=tz_from_offset(offset))
+                    except ValueError:
+                        dt = None
+                    if dt is not None:
+                        epoch = (days_from_civil(year, month, day) * 86400
+                                 + hour * 3600 + minute * 60 + second - offset * 60)
+                        return dt, epoch, offset
+
+        # anything unusual: strptime decides (and raises on invalid input)
+        dt = datetime.strptime(ts, CLF_TS_FORMAT)
+        offset = int(dt.utcoffset().total_seconds() // 60)
+        return dt, int(dt.timestamp()), offset
+
+    def decode(self, ts: str) -> tuple:
+        """(datetime, epoch, tz_offset_minutes); raises ValueError like strptime"""
+        if ts == self._last_ts:
+            return self._last
+        result = self._decode(ts)
+        self._last_ts, self._last = ts, result
+        return result
+
+    def datetime(self, ts: str) -> datetime:
+        """Same value as datetime.strptime(ts, CLF_TS_FORMAT)"""
+        return self.decode(ts)[0]
+
+    def epoch(self, ts: str) -> int:
+        """Seconds since 1970-01-01 UTC"""
+        return self.decode(ts)[1]
+
+
+def decode_clf_timestamps(values) -> tuple:
+    """
+    Decode an array-like of timestamp strings into (ok, epoch, tz_offset).
+
+    Consecutive duplicates are decoded once (memo of the last second seen);
+    strings that are not fixed-width go through the strptime path.
+    """
+    # one spare column tells strings longer than TS_LEN apart
+    u = np.asarray(values, dtype=f"U{TS_LEN + 1}")
+    n = len(u)
+    codes = u.view(np.uint32).reshape(n, TS_LEN + 1)
+
+    head = np.ones(n, dtype=bool)
+    if n > 1:
+        head[1:] = (codes[1:] != codes[:-1]).any(axis=1)
+    run = np.cumsum(head) - 1
+
+    g = codes[head]
+    ok, epoch, tz_offset = decode_fixed_width(g)
+    ok &= (g[:, TS_LEN] == 0) & (g[:, TS_LEN - 1] != 0)
+
+    # strptime fallback for the (few) non-canonical distinct strings
+    decoder = ClfTimestampDecoder()
+    heads = np.flatnonzero(head)
+    raw = np.asarray(values, dtype=object)
+    for i in np.flatnonzero(~ok):
+        value = raw[heads[i]]
+        try:
+            _, epoch[i], tz_offset[i] = decoder.decode(value)
+            ok[i] = True
+        except (TypeError, ValueError):
+            pass
+
+    return ok[run], epoch[run].astype(np.int64), tz_offset[run].astype(np.int16)
+
+
+def to_datetime_index(epoch: np.ndarray, tz_offset: np.ndarray, ok: np.ndarray = None) -> pd.DatetimeIndex:
+    """
+    Build a tz-aware DatetimeIndex (ns) from epoch seconds; rows where ok is
+    False (or that fall outside the ns range) become NaT. A single UTC offset keeps that fixed offset (like
+    pd.to_datetime with '%z'); mixed offsets are normalised to UTC.
+    """
+    epoch = np.asarray(epoch, dtype=np.int64)
+    valid = (epoch > _NS_MIN_EPOCH) & (epoch < _NS_MAX_EPOCH)
+    if ok is not None:
+        valid &= ok
+    ns = np.where(valid, epoch * 10**9, np.iinfo(np.int64).min).view("datetime64[ns]")
+    idx = pd.DatetimeIndex(ns).tz_localize("UTC")
+    offsets = np.unique(np.asarray(tz_offset)[valid])
+    if len(offsets) == 1:
+        idx = idx.tz_convert(tz_from_offset(int(offsets[0])))
+    return idx
+
+
+def clf_to_datetime(values) -> pd.DatetimeIndex:
+    """
+    Drop-in for pd.to_datetime(values, format=CLF_TS_FORMAT, errors='coerce')
+    on CLF timestamp strings: invalid strings become NaT.
+    """
+    ok, epoch, tz_offset = decode_clf_timestamps(values)
+    return to_datetime_index(epoch, tz_offset, ok)
+
+
+def from_datetime_index(values) -> tuple:
+    """
+    Inverse of to_datetime_index: (ok, epoch seconds, UTC offset minutes)
+    of tz-aware timestamps (a tz-aware column, or objects with mixed offsets).
+    """
+    idx = pd.DatetimeIndex(pd.to_datetime(values, utc=True))
+    ok = ~idx.isna()
+    utc = idx.tz_localize(None)
+    epoch = np.where(ok, (utc - pd.Timestamp(0)) // pd.Timedelta(seconds=1), 0).astype(np.int64)
+
+    values = pd.Series(values)
+    if isinstance(values.dtype, pd.DatetimeTZDtype):
+        local = pd.DatetimeIndex(values).tz_localize(None)
+        tz_offset = np.where(ok, (local - utc) // pd.Timedelta(minutes=1), 0)
+    else:
+        tz_offset = np.array([v.utcoffset().total_seconds() // 60 if not pd.isna(v) else 0
+                              for v in values], dtype=np.int64)
+    return ok, epoch, tz_offset.astype(np.int16)
+
+
+def epoch_seconds(values) -> tuple:
+    """
+    (epoch seconds, UTC offset minutes) of a timestamp column sharing one
+    UTC offset. Naive timestamps are read as UTC and get offset None.
+    """
+    ts = pd.DatetimeIndex(values)
+    if ts.tz is None:
+        return ((ts - pd.Timestamp(0)) // pd.Timedelta(seconds=1)).to_numpy(np.int64), None
+    ok, epoch, offsets = from_datetime_index(ts)
+    if not ok.all() or len(np.unique(offsets)) > 1:
+        raise ValueError("Timestamps must be valid and share a single UTC offset")
+    return epoch, int(offsets[0]) if len(offsets) else 0
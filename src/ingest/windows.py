@@ -0,0 +1,119 @@
+"""
+Time-range index over a sorted traffic series.
+
+Window boundaries are found by binary search (np.searchsorted) on the
+int64 epoch column, so locating [start, end) costs O(log n) whatever the
+window. For each metric a prefix-sum array of its values (NaN counted as
+0) and one of its non-NaN row counts are built once, on first use; after
+the lookup, sum, mean and count over any window are two subtractions:
+
+    sum[lo:hi]   = csum[hi] - csum[lo]
+    count[lo:hi] = ccount[hi] - ccount[lo]
+    mean         = sum / count        (NaN rows, e.g. outages, skipped)
+
+Timestamps may be tz-aware (any zone) or naive; naive ones are read in the
+series' own local time, like the timestamps of the traffic CSVs.
+"""
+
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from .timestamps import epoch_seconds
+
+
+def to_epoch(t, tz_offset: int = None) -> int:
+    """
+    Epoch seconds of a timestamp (str, datetime, pd.Timestamp or epoch
+    number); naive timestamps are wall-clock time at UTC offset tz_offset.
+    """
+    if isinstance(t, (int, np.integer)):
+        return int(t)
+    ts = pd.Timestamp(t)
+    if ts.tz is None:
+        return int((ts - pd.Timestamp(0)) // pd.Timedelta(seconds=1)) - (tz_offset or 0) * 60
+    return int((ts.tz_convert("UTC").tz_localize(None) - pd.Timestamp(0)) // pd.Timedelta(seconds=1))
+
+
+class WindowIndex:
+    """Binary-search window lookup plus per-metric prefix sums over one series."""
+
+    def __init__(self, epoch: np.ndarray, column: Callable, columns: list, tz_offset: int = None):
+        # sorted int64 epoch seconds, one per bin
+        self.epoch = epoch
+        # name -> values; a metric is only read when its prefix sums are first needed
+        self.column = column
+        self.columns = list(columns)
+        self.tz_offset = tz_offset
+        self._prefix = {}
+
+    @classmethod
+    def for_series(cls, series) -> "WindowIndex":
+        """Index over a store.TrafficSeries (its columns stay memory-mapped until used)"""
+        return cls(series.epoch, series.column, series.columns, series.tz_offset)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "WindowIndex":
+        """Index over a traffic DataFrame sorted by its 'timestamp' column"""
+        epoch, tz_offset = epoch_seconds(df["timestamp"])
+        metrics = [c for c in df.columns if c != "timestamp" and df[c].dtype.kind in "iufb"]
+        return cls(epoch, lambda name: df[name].to_numpy(dtype=np.float64, na_value=np.nan), metrics, tz_offset)
+
+    def __len__(self) -> int:
+        return len(self.epoch)
+
+    def to_epoch(self, t) -> int:
+        return to_epoch(t, self.tz_offset)
+
+    def bounds(self, start=None, end=None) -> tuple:
+        """Row range [lo, hi) of the bins with start <= timestamp < end (None: open-ended)"""
+        lo = 0 if start is None else int(np.searchsorted(self.epoch, self.to_epoch(start), side="left"))
+        hi = len(self.epoch) if end is None else int(np.searchsorted(self.epoch, self.to_epoch(end), side="left"))
+        return lo, max(lo, hi)
+
+    def _prefix_sums(self, name: str) -> tuple:
+        prefix = self._prefix.get(name)
+        if prefix is None:
+            if name not in self.columns:
+                raise KeyError(f"Unknown metric: {name}")
+            values = np.asarray(self.column(name), dtype=np.float64)
+            ok = ~np.isnan(values)
+            csum = np.zeros(len(values) + 1, dtype=np.float64)
+            np.cumsum(np.where(ok, values, 0.0), out=csum[1:])
+            ccount = np.zeros(len(values) + 1, dtype=np.int64)
+            np.cumsum(ok, out=ccount[1:])
+            prefix = self._prefix[name] = (csum, ccount)
+        return prefix
+
+    def sum(self, name: str, start=None, end=None) -> float:
+        lo, hi = self.bounds(start, end)
+        csum, _ = self._prefix_sums(name)
+        return float(csum[hi] - csum[lo])
+
+    def count(self, name: str, start=None, end=None) -> int:
+        """Non-NaN values of a metric in the window"""
+        lo, hi = self.bounds(start, end)
+        _, ccount = self._prefix_sums(name)
+        return int(ccount[hi] - ccount[lo])
+
+    def mean(self, name: str, start=None, end=None) -> float:
+        """Mean of the non-NaN values in the window (NaN when there are none)"""
+        lo, hi = self.bounds(start, end)
+        return self._stats(name, lo, hi)["mean"]
+
+    def _stats(self, name: str, lo: int, hi: int) -> dict:
+        csum, ccount = self._prefix_sums(name)
+        total = float(csum[hi] - csum[lo])
+        count = int(ccount[hi] - ccount[lo])
+        return {"sum": total, "count": count, "mean": total / count if count else float("nan")}
+
+    def stats(self, start=None, end=None, columns: list = None) -> dict:
+        """
+        {"lo", "hi", "rows", "metrics": {name: {"sum", "count", "mean"}}}
+        for every metric (or the given ones) over the window [start, end).
+        """
+        lo, hi = self.bounds(start, end)
+        names = self.columns if columns is None else columns
+        return {"lo": lo, "hi": hi, "rows": hi - lo,
+                "metrics": {name: self._stats(name, lo, hi) for name in names}}
@@ -1,94 +1,49 @@
-import re
-import pandas as pd
-from datetime import datetime
-import glob
+import argparse
+
+from ingest.aggregate import TrafficBins
+from ingest.backends import BACKENDS, get_backend
+from ingest.merge import merge_blocks
+from ingest.paths import OUTPUT_DIR, log_files as nasa_log_files
 import os
 
 # Define paths
-DATA_DIR = r"c:\Users\eleven\Documents\AUTOSCALING_ANALYSIS\DATA"
-OUTPUT_DIR = r"c:\Users\eleven\Documents\AUTOSCALING_ANALYSIS\processed_data"
 OUTPUT_FILE = os.path.join(OUTPUT_DIR, "nasa_traffic_1m.csv")
 
-# Regex Pattern
-# IP - - [Timestamp] "Method URL Protocol" Status Size
-LOG_PATTERN = re.compile(r'^(\S+) \S+ \S+ \[(.*?)\] "(?:GET|POST|HEAD|PUT|DELETE) (\S+) .*?" \d+ (\d+|-)')
+def parse_logs(file_paths, engine="numpy"):
+    # Fold every file straight into 1 minute bins (no per-request rows)
+    print(f"Parsing files: {file_paths}")
+    backend = get_backend(engine)
+    bins = TrafficBins("1min")
 
-def parse_log_line(line):
-    match = LOG_PATTERN.match(line)
-    if match:
-        # timestamp = match.group(2)
-        # size_str = match.group(4)
-        return match.group(2), match.group(4)
-    return None, None
+    # plain, .gz or .bz2 (decompressed on a background thread), merged in time order
+    streams = [backend.iter_blocks(path) for path in file_paths]
+    for block in merge_blocks(streams):
+        bins.add_block(block)
 
-def parse_logs(file_paths):
-    data = []
-    print(f"Parsing files: {file_paths}")
-    
-    for file_path in file_paths:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            for line in f:
-                ts_str, size_str = parse_log_line(line)
-                if ts_str:
-                    # Handle size '-'
-                    size = 0 if size_str == '-' else int(size_str)
-                    data.append((ts_str, size))
-    
-    return data
+    return bins
 
 def main():
-    # Find log files 
-    # specific to the user's files: test.txt and train.txt seem to be the ones
-    log_files = [
-        os.path.join(DATA_DIR, "train.txt"), # Usually larger, start with this or both
-        os.path.join(DATA_DIR, "test.txt")
-    ]
-    
-    # Filter only existing files
-    log_files = [f for f in log_files if os.path.exists(f)]
-    
+    parser = argparse.ArgumentParser(description="Count requests and bytes per minute")
+    parser.add_argument("--engine", choices=tuple(BACKENDS), default="numpy", help="log parser backend")
+    args = parser.parse_args()
+
+    # train.txt and test.txt of the data directory (compressed versions also accepted)
+    log_files = nasa_log_files()
+
     if not log_files:
         print("No log files found in DATA directory.")
         return
 
-    # Parse
-    raw_data = parse_logs(log_files)
-    print(f"Parsed {len(raw_data)} records.")
-
-    # Create DataFrame
-    df = pd.DataFrame(raw_data, columns=['timestamp_str', 'bytes'])
-
-    # Convert timestamp
-    # Format: 01/Jul/1995:00:00:01 -0400
-    print("Converting timestamps...")
-    df['timestamp'] = pd.to_datetime(df['timestamp_str'], format='%d/%b/%Y:%H:%M:%S %z', errors='coerce')
-    
-    # Drop invalid dates if any
-    df = df.dropna(subset=['timestamp'])
-
-    # Set index
-    df.set_index('timestamp', inplace=True)
-    
-    # Sort
-    df.sort_index(inplace=True)
-
-    # Convert bytes to numeric just in case
-    df['bytes'] = pd.to_numeric(df['bytes'])
+    # Parse + aggregate to 1 minute
+    bins = parse_logs(log_files, engine=args.engine)
+    print(f"Parsed {bins.total():,} records.")
 
-    # Aggregate to 1 minute
-    print("Resampling to 1 minute...")
-    df_1m = df.resample('1min').agg({
-        'bytes': ['count', 'sum']
-    })
-    
-    # Flatten columns
-    df_1m.columns = ['request_count', 'total_bytes']
-    
-    # Fill NaN with 0 (no traffic in that minute)
-    df_1m = df_1m.fillna(0)
+    # Empty minutes are 0 (no traffic in that minute)
+    df_1m = bins.to_frame().set_index("timestamp")[["request_count", "total_bytes"]]
 
     # Save
     print(f"Saving to {OUTPUT_FILE}...")
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
     df_1m.to_csv(OUTPUT_FILE)
     print("Done.")
 
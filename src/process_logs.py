@@ -5,131 +5,353 @@ Follows the pipeline from note.md:
 - Regex 1: parse host/timestamp/request/status/bytes
 - Regex 2: parse request into method/url/protocol
 - Resample: count + sum(bytes) + status groups
-- Outage: mark + mask NaN for 01/08-03/08 period
+- Outage: detect unexpected zero-traffic runs, mark + mask NaN
 """
 
-import re
+import argparse
+import numpy as np
 import pandas as pd
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 import os
 
-# === REGEX PATTERNS ===
+from ingest.backends import BACKENDS, get_backend
+from ingest.requestlog import RequestLog
+from ingest.aggregate import TrafficBins, freq_to_seconds, rollup, status_class_counts, status_code_matrix
+from ingest.layer1 import write_layer1
+from ingest.incremental import IncrementalIngest
+from ingest.readers import is_compressed
+from ingest.paths import OUTPUT_DIR, log_files as nasa_log_files
+from ingest.merge import MergeStats, merge_blocks
+from ingest.sketches import SKETCH_FIELDS, TopKBins, save_topk
+from ingest.cardinality import DISTINCT_COLUMNS, DistinctBins
+from ingest.quantiles import QuantileBins
+from ingest.content import ContentBins
+from ingest.routes import ROUTE_DEPTH, ROUTE_MAX_DEPTH, ROUTE_TOP_N, RouteBins, save_route_matrix
+from ingest.sessions import SessionBins
+from ingest.store import STORE_NAME, get_store, read_traffic
+from ingest.rrd import RRD_NAME, RoundRobinStore, parse_retention, read_traffic_history
+from ingest.outages import OUTAGE_FREQ, OUTAGE_MIN_GAP, detect_outages, outage_mask
 
-# Regex 1: Parse log line into host/timestamp/request/status/bytes
-LOG_RE = re.compile(
-    r'^(?P<host>\S+)\s+'          # host/ip
-    r'\S+\s+\S+\s+'               # ignore ident/user (- -)
-    r'\[(?P<ts>[^\]]+)\]\s+'      # [23/Aug/1995:00:00:00 -0400]
-    r'"(?P<request>[^"]*)"\s+'    # "GET /... HTTP/1.0"
-    r'(?P<status>\d{3})\s+'       # 200
-    r'(?P<bytes>\S+)\s*$'         # 7087 or -
-)
+# === PARALLEL INGEST ===
+# Byte ranges handed out per worker process (>1 balances uneven ranges)
+RANGES_PER_WORKER = 4
 
-# Regex 2: Parse request into method/url/protocol
-REQ_RE = re.compile(
-    r'^(?P<method>\S+)\s+(?P<url>\S+)(?:\s+(?P<protocol>\S+))?$'
-)
+# Parser engines (ingest.backends): "regex" (LOG_RE per line), "numpy" (ingest.fastparse), ...
+ENGINES = tuple(BACKENDS)
 
-# === OUTAGE PERIOD ===
-OUTAGE_START = pd.Timestamp("1995-08-01 14:52:01-04:00")
-OUTAGE_END   = pd.Timestamp("1995-08-03 04:36:13-04:00")
+# === STREAMING AGGREGATION ===
 
+# Output resolutions: pandas freq -> file suffix. The first (finest) one is
+# aggregated from the log, the others are rolled up from it.
+RESOLUTIONS = [("1s", "1s"), ("10s", "10s"), ("1min", "1m"), ("5min", "5m"), ("15min", "15m")]
 
-def parse_ts(ts: str):
-    """Parse timestamp with timezone"""
-    # '%z' reads offset -0400
-    return datetime.strptime(ts, "%d/%b/%Y:%H:%M:%S %z")
+# Base resolutions selectable with --base-freq; every coarser one is also written
+BASE_FREQS = ("1s", "10s", "1min")
 
+# Per-bin accumulators folded in the same pass as the traffic counters:
+# name -> (factory, needs the parsed text fields). Top-K sketches are keyed
+# by their field, the others by the output column(s) they produce.
+EXTRAS = {
+    "url": (partial(TopKBins, "url"), True),
+    "host": (partial(TopKBins, "host"), True),
+    **{col: (partial(DistinctBins, field), True) for col, field in DISTINCT_COLUMNS.items()},
+    "bytes_quantiles": (QuantileBins, False),
+    "content": (ContentBins, True),
+    "routes": (RouteBins, True),
+    "sessions": (SessionBins, True),
+}
 
-def parse_log_file(path: str) -> pd.DataFrame:
-    """Parse a log file into DataFrame with all fields"""
-    rows = []
-    line_count = 0
-    matched_count = 0
-    
-    print(f"Processing: {path}")
-    
-    with open(path, "r", encoding="latin-1", errors="replace") as f:
-        for line in f:
-            line_count += 1
-            line = line.rstrip("\n")
-            m = LOG_RE.match(line)
-            if not m:
-                continue
-            
-            matched_count += 1
-            d = m.groupdict()
-
-            # timestamp
-            try:
-                ts = parse_ts(d["ts"])
-            except:
+# Extras that need the records in time order (no merge of partial results):
+# folded by the serial k-way merge (a separate pass when the rest runs in workers)
+ORDERED_EXTRAS = ("sessions",)
+
+
+def split_byte_ranges(path: str, n_ranges: int) -> list:
+    """Split a file into newline-aligned [start, end) byte ranges"""
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+
+    bounds = [0]
+    with open(path, "rb") as f:
+        for i in range(1, max(1, n_ranges)):
+            target = size * i // n_ranges
+            if target <= bounds[-1]:
                 continue
+            # move to the first byte after the next newline
+            f.seek(target)
+            f.readline()
+            pos = f.tell()
+            if pos >= size:
+                break
+            if pos > bounds[-1]:
+                bounds.append(pos)
+    bounds.append(size)
+    return [(path, start, end) for start, end in zip(bounds[:-1], bounds[1:])]
 
-            # status
-            status = int(d["status"])
-
-            # bytes: '-' => NaN
-            b = d["bytes"]
-            bytes_ = None if b == "-" else int(b)
-
-            # request split
-            req = d["request"]
-            method = url = protocol = None
-            rm = REQ_RE.match(req)
-            if rm:
-                method = rm.group("method")
-                url = rm.group("url")
-                protocol = rm.group("protocol")
-
-            rows.append({
-                "timestamp": ts,
-                "host": d["host"],
-                "method": method,
-                "url": url,
-                "protocol": protocol,
-                "status": status,
-                "bytes": bytes_,
-            })
-    
+
+def _read_range(path: str, start: int, end: int) -> bytes:
+    """Bytes [start, end) of a plain file"""
+    with open(path, "rb") as f:
+        f.seek(start)
+        return f.read(end - start)
+
+
+def _log_tasks(path: str, n_ranges: int) -> list:
+    """Byte-range tasks for a file; compressed files cannot be split (one whole-file task)"""
+    if is_compressed(path):
+        return [(path, None, None)]
+    return split_byte_ranges(path, n_ranges)
+
+
+def _parse_byte_range(task: tuple) -> RequestLog:
+    """Worker: parse one newline-aligned byte range (or a whole compressed file) into a partial RequestLog"""
+    path, start, end, engine = task
+    backend = get_backend(engine)
+    if start is None:
+        blocks = backend.iter_blocks(path, fields=True)
+    else:
+        blocks = [backend.parse_buffer(_read_range(path, start, end), fields=True)]
+    # typed columns + dictionaries pickle as a few arrays, far cheaper than per-row Python objects
+    return RequestLog.from_blocks(blocks)
+
+
+def _report(path: str, line_count: int, matched_count: int):
+    """Print per-file parse statistics"""
+    print(f"Processing: {path}")
     print(f"  Total lines: {line_count:,}")
     print(f"  Matched: {matched_count:,}")
     print(f"  Match rate: {matched_count/line_count*100:.2f}%" if line_count > 0 else "  No lines")
 
-    df = pd.DataFrame(rows)
-    if len(df) > 0:
-        # Ensure proper types
-        df["timestamp"] = pd.to_datetime(df["timestamp"], utc=False)
-        df["status"] = df["status"].astype("int16")
-    return df
 
+def parse_request_logs(paths: list, workers: int = 1, engine: str = "regex") -> list:
+    """
+    Parse several log files into one compact RequestLog each.
+
+    engine names a parser backend (ingest.backends); "numpy" uses the
+    vectorized whole-buffer parser (regex only for lines it rejects) and
+    yields the same records as the "regex" reference.
+
+    With workers > 1 every file is split into newline-aligned byte ranges
+    and all ranges (of all files) are parsed on one shared process pool;
+    the partial logs are concatenated back in file order, so the output is
+    identical to the single-process parse.
+    """
+    backend = get_backend(engine)
+
+    if workers <= 1:
+        logs = []
+        for path in paths:
+            log = RequestLog.from_blocks(backend.iter_blocks(path, fields=True))
+            _report(path, log.lines, log.matched)
+            logs.append(log)
+        return logs
+
+    # a few ranges per worker keeps the pool balanced and each range small
+    tasks = {path: _log_tasks(path, workers * RANGES_PER_WORKER) for path in paths}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {path: [pool.submit(_parse_byte_range, t + (engine,)) for t in ts]
+                   for path, ts in tasks.items()}
+        logs = []
+        for path in paths:
+            log = RequestLog()
+            for f in futures[path]:
+                log.extend(f.result())
+            _report(path, log.lines, log.matched)
+            logs.append(log)
+    return logs
+
+
+def parse_log_files(paths: list, workers: int = 1, engine: str = "regex") -> list:
+    """Parse several log files into one DataFrame each (see parse_request_logs and RequestLog.to_frame)"""
+    return [log.to_frame() for log in parse_request_logs(paths, workers=workers, engine=engine)]
+
+
+def parse_log_file(path: str, workers: int = 1, engine: str = "regex") -> pd.DataFrame:
+    """Parse a log file into DataFrame with all fields"""
+    return parse_log_files([path], workers=workers, engine=engine)[0]
+
+
+def _iter_log_blocks(path: str, engine: str, fields: bool = False):
+    """Yield parsed blocks of a log file without holding the whole file's records"""
+    yield from get_backend(engine).iter_blocks(path, fields=fields)
+
+
+def _counted_blocks(path: str, engine: str, counts: list, fields: bool = False):
+    """_iter_log_blocks that also tallies [lines, matched] into counts"""
+    for block in _iter_log_blocks(path, engine, fields):
+        counts[0] += block["lines"]
+        counts[1] += block["matched"]
+        yield block
+
+
+def _aggregate_byte_range(task: tuple) -> tuple:
+    """Worker: fold one newline-aligned byte range (or a whole compressed file) into per-resolution bins"""
+    path, start, end, engine, freqs, extras = task
+    fields = any(EXTRAS[name][1] for name in extras)
+    if start is None:
+        blocks = _iter_log_blocks(path, engine, fields)
+    else:
+        blocks = [get_backend(engine).parse_buffer(_read_range(path, start, end), fields=fields)]
+
+    bins = _accumulators(freqs, extras)
+    line_count = matched_count = 0
+    for block in blocks:
+        for b in bins.values():
+            b.add_block(block)
+        line_count += block["lines"]
+        matched_count += block["matched"]
+    return bins, line_count, matched_count
+
+
+def _accumulators(freqs: list, extras: tuple = ()) -> dict:
+    """{freq: TrafficBins} plus one {name: accumulator} per EXTRAS name"""
+    acc = {freq: TrafficBins(freq) for freq in freqs}
+    acc.update({name: EXTRAS[name][0]() for name in extras})
+    return acc
 
-def make_traffic_ts(df_log: pd.DataFrame, freq: str) -> pd.DataFrame:
-    """Resample log data into traffic time series with status breakdown"""
-    d = df_log.copy()
-    d = d.set_index("timestamp").sort_index()
 
-    # bytes NaN -> 0 for sum
-    bytes_series = d["bytes"].fillna(0)
+def _fold_merged(paths: list, engine: str, accs: list, fields: bool, report: bool = True):
+    """Fold the k-way merge of the per-file streams (time-ordered batches, no global sort) into accs"""
+    counts = {path: [0, 0] for path in paths}
+    stats = MergeStats()
+    streams = [_counted_blocks(path, engine, counts[path], fields) for path in paths]
+    for cols in merge_blocks(streams, stats=stats):
+        for b in accs:
+            b.add_block(cols)
+    if report:
+        for path in paths:
+            _report(path, *counts[path])
+    print(f"  Merged {stats.records:,} records in {stats.batches:,} batches "
+          f"({stats.late:,} later than the reorder window)")
+
+
+def aggregate_log_files(paths: list, freqs: list, workers: int = 1, engine: str = "numpy",
+                        extras: tuple = ()) -> dict:
+    """
+    Streaming mode: fold every parsed record of the given files directly
+    into TrafficBins (one per freq) without building per-request rows.
+    Serially the files are k-way merged in time order on the way in;
+    with workers > 1 byte ranges are binned in parallel and merged as bins,
+    and the ORDERED_EXTRAS then take one serial pass over the merged stream.
+
+    Returns {freq: TrafficBins}; TrafficBins.to_frame() equals
+    make_traffic_ts() on the parsed DataFrame of the same files. Each of
+    extras (names in EXTRAS, e.g. "url", "unique_hosts") adds its
+    accumulator under that name, whatever the number of workers.
+    """
+    get_backend(engine)
+
+    bins = _accumulators(freqs, extras)
+    if workers <= 1:
+        _fold_merged(paths, engine, list(bins.values()), any(EXTRAS[name][1] for name in extras))
+        return bins
+
+    ordered = tuple(name for name in extras if name in ORDERED_EXTRAS)
+    mergeable = tuple(name for name in extras if name not in ORDERED_EXTRAS)
+    tasks = {path: _log_tasks(path, workers * RANGES_PER_WORKER) for path in paths}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {path: [pool.submit(_aggregate_byte_range, t + (engine, freqs, mergeable)) for t in ts]
+                   for path, ts in tasks.items()}
+        for path in paths:
+            parts = [f.result() for f in futures[path]]
+            for part_bins, _, _ in parts:
+                for key, b in part_bins.items():
+                    bins[key].merge(b)
+            _report(path, sum(p[1] for p in parts), sum(p[2] for p in parts))
+    if ordered:
+        print(f"  Folding {', '.join(ordered)} over the time-ordered merge (serial pass)")
+        _fold_merged(paths, engine, [bins[name] for name in ordered],
+                     any(EXTRAS[name][1] for name in ordered), report=False)
+    return bins
+
+
+def _add_extra_columns(ts_df: pd.DataFrame, freq: str, acc: dict):
+    """Add the columns of every EXTRAS accumulator whose bins fit into freq (in place)"""
+    index = pd.DatetimeIndex(ts_df["timestamp"])
+    width = freq_to_seconds(freq)
+    for name, a in acc.items():
+        if isinstance(a, (TopKBins, RouteBins)) or width % a.width:
+            continue
+        if isinstance(a, SessionBins):
+            # active counts do not roll up; they are kept per output resolution
+            if freq in a.freqs:
+                cols = a.to_frame(freq).set_index("timestamp").reindex(index, fill_value=0)
+                for col in cols.columns:
+                    ts_df[col] = cols[col].to_numpy()
+            continue
+        a = a if a.width == width else a.rollup(freq)
+        if isinstance(a, DistinctBins):
+            est = a.to_series(name).reindex(index, fill_value=0).to_numpy()
+            # an estimate can overshoot a bin with only a few requests
+            ts_df[name] = np.minimum(est, ts_df["request_count"].to_numpy())
+        elif isinstance(a, QuantileBins):
+            cols = a.to_frame().reindex(index)
+            for col in cols.columns:
+                ts_df[col] = cols[col].to_numpy()
+        else:
+            cols = a.to_frame().set_index("timestamp").reindex(index, fill_value=0)
+            for col in cols.columns:
+                ts_df[col] = cols[col].to_numpy()
+
+
+def make_traffic_ts(df_log: pd.DataFrame, freq: str, status_codes: bool = False):
+    """
+    Resample log data into traffic time series with status breakdown.
+
+    The status columns come from one bincount of (bin, status // 100).
+    With status_codes=True the same pass also counts every distinct code and
+    (traffic, codes, matrix) is returned, matrix being an int32
+    bins x codes array (see ingest.aggregate.status_code_matrix).
+    """
+    d = df_log.set_index("timestamp").sort_index()
+
+    # bytes NaN / <NA> -> 0 for sum (a float sum when any were '-', like resample of a NaN column)
+    bytes_series = d["bytes"]
+    bytes_series = bytes_series.astype("float64").fillna(0) if bytes_series.isna().any() else bytes_series.astype("int64")
 
     base = pd.DataFrame({
         "request_count": d["status"].resample(freq).size(),
         "total_bytes": bytes_series.resample(freq).sum(),
     })
 
-    # status groups
-    s = d["status"]
-    base["status_2xx"] = (s.between(200, 299)).resample(freq).sum()
-    base["status_3xx"] = (s.between(300, 399)).resample(freq).sum()
-    base["status_4xx"] = (s.between(400, 499)).resample(freq).sum()
-    base["status_5xx"] = (s.between(500, 599)).resample(freq).sum()
+    # status groups: bin of every record (rows are sorted, bins are the resample labels)
+    idx = base.index.searchsorted(d.index, side="right") - 1
+    status = d["status"].to_numpy()
+    counts = status_class_counts(idx, status, len(base))
+    for i, col in enumerate(("status_2xx", "status_3xx", "status_4xx", "status_5xx")):
+        base[col] = counts[:, i]
 
     base = base.reset_index()  # timestamp back to column
+    if status_codes:
+        codes, matrix = status_code_matrix(idx, status, len(base))
+        return base, codes, matrix
     return base
 
 
-def apply_outage_mask(ts_df: pd.DataFrame, freq: str) -> pd.DataFrame:
-    """Mark outage period and mask metrics with NaN"""
+def keep_previous_rows(ts_df: pd.DataFrame, path: str) -> pd.DataFrame:
+    """
+    Incremental run: ts_df (the bins still in the checkpoint) on top of the
+    previous export at path. Rows before ts_df's first timestamp are final
+    and kept as exported; later rows take ts_df's columns, and the columns
+    ts_df does not produce (per-bin sketches, content classes, sessions)
+    keep their previous values (NaN for new bins). is_outage is recomputed.
+    """
+    if len(ts_df) == 0 or not os.path.exists(path):
+        return ts_df
+    prev = read_traffic(path).drop(columns=["is_outage"], errors="ignore")
+    prev["timestamp"] = pd.DatetimeIndex(prev["timestamp"]).as_unit("ns")
+    ts_df = ts_df.assign(timestamp=pd.DatetimeIndex(ts_df["timestamp"]).as_unit("ns"))
+    kept = [c for c in prev.columns if c not in ts_df.columns]
+    new = ts_df.merge(prev[["timestamp"] + kept], on="timestamp", how="left")
+    old = prev[prev["timestamp"] < ts_df["timestamp"].min()]
+    columns = list(prev.columns) + [c for c in new.columns if c not in prev.columns]
+    return pd.concat([old, new], ignore_index=True)[columns]
+
+
+def apply_outage_mask(ts_df: pd.DataFrame, freq: str, outages: pd.DataFrame) -> pd.DataFrame:
+    """Mark bins starting inside the outage windows (detect_outages) and mask their metrics with NaN"""
     t = ts_df.copy()
     t["timestamp"] = pd.to_datetime(t["timestamp"])
     t = t.set_index("timestamp").sort_index()
@@ -138,8 +360,8 @@ def apply_outage_mask(ts_df: pd.DataFrame, freq: str) -> pd.DataFrame:
     full_idx = pd.date_range(t.index.min(), t.index.max(), freq=freq, tz=t.index.tz)
     t = t.reindex(full_idx)
 
-    # mark outage (timestamps within range)
-    is_outage = (t.index > OUTAGE_START) & (t.index < OUTAGE_END)
+    # mark outage (bin start within any window)
+    is_outage = outage_mask(t.index, outages)
     t["is_outage"] = is_outage.astype("int8")
 
     # mask metrics during outage
@@ -150,61 +372,191 @@ def apply_outage_mask(ts_df: pd.DataFrame, freq: str) -> pd.DataFrame:
 
 
 def main():
-    base_dir = r'c:\Users\eleven\Documents\AUTOSCALING_ANALYSIS'
-    data_dir = os.path.join(base_dir, 'DATA')
-    output_dir = os.path.join(base_dir, 'processed_data')
+    parser = argparse.ArgumentParser(description="Parse NASA HTTP logs into traffic time series")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes for byte-range parsing (1 = serial)")
+    parser.add_argument("--engine", choices=ENGINES, default="numpy",
+                        help="log parser: vectorized numpy fast path or per-line regex")
+    parser.add_argument("--streaming", action="store_true",
+                        help="fold records straight into time bins (no per-request DataFrame, no Layer 1 output)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="parse only lines appended since the last run (checkpointed streaming mode; "
+                             "per-bin sketch and session columns keep their previous values)")
+    parser.add_argument("--layer1-csv", action="store_true",
+                        help="also write Layer 1 as nasa_logs_parsed.csv (slow, large)")
+    parser.add_argument("--base-freq", choices=BASE_FREQS, default="1min",
+                        help="finest traffic resolution written (coarser ones are rolled up from it)")
+    parser.add_argument("--no-burst", action="store_true",
+                        help="skip peak_rps / p95_rps / max_second_bytes (aggregate at --base-freq instead of 1s)")
+    parser.add_argument("--no-topk", action="store_true",
+                        help="skip the per-bin top URL/host sketches (nasa_topk.npz)")
+    parser.add_argument("--route-depth", type=int, choices=range(1, ROUTE_MAX_DEPTH + 1), default=ROUTE_DEPTH,
+                        help="URL directory levels per route in the route matrix (nasa_routes.npz)")
+    parser.add_argument("--route-top", type=int, default=ROUTE_TOP_N,
+                        help="busiest routes kept as matrix columns (the rest are summed as '(other)')")
+    parser.add_argument("--outage-min-gap", type=float, default=OUTAGE_MIN_GAP / 60,
+                        help="shortest zero-traffic run (minutes) that can be reported as an outage")
+    parser.add_argument("--retention", action="append", metavar="FREQ=PERIOD",
+                        help="round-robin store retention per resolution, e.g. 1min=30D (repeatable; "
+                             "see ingest.rrd.DEFAULT_ARCHIVES)")
+    parser.add_argument("--no-export", action="store_true",
+                        help="only update the round-robin store (no per-resolution CSV / binary tables)")
+    args = parser.parse_args()
+
+    output_dir = OUTPUT_DIR
     
     # Create output directory if not exists
     os.makedirs(output_dir, exist_ok=True)
     
-    # Parse both files
-    all_dfs = []
-    
-    # Process train.txt
-    train_file = os.path.join(data_dir, 'train.txt')
-    if os.path.exists(train_file):
-        df = parse_log_file(train_file)
-        all_dfs.append(df)
-        print(f"  Records from train.txt: {len(df):,}\n")
-    
-    # Process test.txt
-    test_file = os.path.join(data_dir, 'test.txt')
-    if os.path.exists(test_file):
-        df = parse_log_file(test_file)
-        all_dfs.append(df)
-        print(f"  Records from test.txt: {len(df):,}\n")
-    
-    if not all_dfs:
+    # Parse train.txt and test.txt together on one worker pool (.gz/.bz2 archives also accepted)
+    log_files = nasa_log_files()
+
+    if not log_files:
         print("No log files found!")
         return
+
+    # Single pass at the finest resolution; coarser ones are block sums of it.
+    # Burst statistics need per-second counts, so that pass is at 1s unless disabled.
+    burst = not args.no_burst
+    base_freq = "1s" if burst else args.base_freq
+    resolutions = [(f, s) for f, s in RESOLUTIONS if freq_to_seconds(f) >= freq_to_seconds(args.base_freq)]
+
+    streaming = args.streaming or args.incremental
+    # Per-bin sketches and splits: top-K urls/hosts, HyperLogLog unique hosts, bytes
+    # quantiles, content classes, routes, inactivity-timeout sessions. The checkpointed
+    # incremental mode does not rebuild them: their exported columns are kept as they
+    # are (keep_previous_rows) and only the traffic columns are recomputed.
+    extras = ()
+    if not args.incremental:
+        extras = tuple(name for name in EXTRAS if not (args.no_topk and name in SKETCH_FIELDS))
+    acc = {}
+
+    if args.incremental:
+        # Offsets and base bins persist between runs; rotation restarts a file at 0
+        state = IncrementalIngest(os.path.join(output_dir, 'ingest_state.npz'), base_freq)
+        for path in log_files:
+            _report(path, *state.update(path))
+        late = state.drop_late()
+        if late:
+            print(f"  Dropped {late:,} requests for bins before the checkpoint floor (already final)")
+        base_bins = state.bins
+        print(f"Total records: {base_bins.total():,}")
+    elif args.streaming:
+        # Memory scales with the number of bins, not the number of requests
+        acc = aggregate_log_files(log_files, [base_freq], workers=args.workers, engine=args.engine,
+                                  extras=extras)
+        base_bins = acc.pop(base_freq)
+        print(f"Total records: {base_bins.total():,}")
+    else:
+        logs = parse_request_logs(log_files, workers=args.workers, engine=args.engine)
+        for path, log in zip(log_files, logs):
+            print(f"  Records from {os.path.basename(path)}: {len(log):,}\n")
+        
+        # Combine all logs (text codes remapped into one dictionary per column)
+        request_log = logs[0]
+        for log in logs[1:]:
+            request_log.extend(log)
+        print(f"Total records: {len(request_log):,} "
+              f"({request_log.nbytes / 2**20:,.1f} MB in memory, {request_log.nbytes / max(len(request_log), 1):.0f} bytes/record)")
+        df_log = request_log.to_frame()
+        
+        # Save raw parsed data (Layer 1: Detailed Log w/ Path)
+        # Columnar store: dictionary-encoded text, one partition per day
+        raw_output = os.path.join(output_dir, 'nasa_logs_parsed')
+        print(f"Saving Layer 1 (Detailed Parsed Logs) to: {raw_output} ...")
+        write_layer1(df_log, raw_output)
+        if args.layer1_csv:
+            df_log.to_csv(raw_output + '.csv', index=False)
+        print("  Done.")
+
+        base_ts = make_traffic_ts(df_log, base_freq).set_index("timestamp")
+        acc = _accumulators([], extras)
+        for a in acc.values():
+            a.add_frame(df_log)
+
+    sketches = {field: acc[field] for field in SKETCH_FIELDS if field in acc}
+    if sketches:
+        # Top-K URLs / hosts per bin; query any range with ingest.sketches.query_topk
+        topk_file = os.path.join(output_dir, 'nasa_topk.npz')
+        save_topk(topk_file, sketches)
+        print(f"Saved top-K sketches: {topk_file}")
+
+    if "routes" in acc:
+        # Sparse bins x routes matrix; slice with ingest.routes.load_route_matrix(...).slice()
+        routes = acc["routes"].to_matrix(args.route_top, args.route_depth)
+        routes_file = os.path.join(output_dir, 'nasa_routes.npz')
+        save_route_matrix(routes_file, routes)
+        print(f"Saved route matrix {routes.shape[0]:,} bins x {routes.shape[1]} routes "
+              f"({len(routes.indices):,} non-zero): {routes_file}")
     
-    # Combine all dataframes
-    df_log = pd.concat(all_dfs, ignore_index=True)
-    print(f"Total records: {len(df_log):,}")
-    
-    # Save raw parsed data (Layer 1: Detailed Log w/ Path)
-    # Note: Saving to CSV as safer option if parquet engines are missing
-    raw_output = os.path.join(output_dir, 'nasa_logs_parsed.csv')
-    print(f"Saving Layer 1 (Detailed Parsed Logs) to: {raw_output} ...")
-    df_log.to_csv(raw_output, index=False)
-    print("  Done.")
-    
+    # Outage windows: empty runs of the 1min series that the seasonal level makes unlikely
+    if streaming:
+        outage_ts = (base_bins if base_freq == OUTAGE_FREQ else base_bins.rollup(OUTAGE_FREQ)).to_frame()
+    elif base_freq == OUTAGE_FREQ:
+        outage_ts = base_ts.reset_index()
+    else:
+        outage_ts = rollup(base_ts, base_freq, OUTAGE_FREQ).reset_index()
+    if args.incremental:
+        # bins before the checkpoint floor: the exported 1min table
+        outage_ts = keep_previous_rows(outage_ts, os.path.join(output_dir, 'nasa_traffic_1m.csv'))
+    outages = detect_outages(outage_ts["timestamp"], outage_ts["request_count"].to_numpy(), OUTAGE_FREQ,
+                             min_gap=int(args.outage_min_gap * 60))
+    outages.to_csv(os.path.join(output_dir, 'nasa_outages.csv'), index=False)
+    print(f"\nDetected {len(outages)} outage window(s):")
+    for row in outages.itertuples():
+        print(f"  {row.start} -> {row.end} ({row.bins:,} min, {row.expected_requests:,.0f} requests expected)")
+
+    # Round-robin store: bounded history at every resolution. It is fed the
+    # finest table it has an archive for and compacts the coarser ones itself.
+    archives = parse_retention(args.retention)
+    rrd = RoundRobinStore.open_or_create(os.path.join(output_dir, RRD_NAME), archives)
+    archive_widths = {freq_to_seconds(f) for f, _ in archives}
+    rrd_freq = next((f for f, _ in resolutions if freq_to_seconds(f) in archive_widths), None)
+
     # Create aggregations with outage handling
     print("\n--- Creating Aggregations with Outage Handling ---")
+    store = get_store(os.path.join(output_dir, STORE_NAME))
     
-    for freq, suffix in [("1min", "1m"), ("5min", "5m"), ("15min", "15m")]:
+    for freq, suffix in resolutions:
+        if args.no_export and freq != rrd_freq:
+            continue
         print(f"\nGenerating {suffix} aggregation...")
         
-        # Create traffic time series
-        ts_df = make_traffic_ts(df_log, freq)
+        # Create traffic time series (with burst statistics from the 1s bins)
+        if streaming:
+            ts_df = (base_bins if freq == base_freq and not burst else base_bins.rollup(freq, burst=burst)).to_frame()
+        elif freq == base_freq and not burst:
+            ts_df = base_ts.reset_index()
+        else:
+            burst_from = ("request_count", "total_bytes") if burst else None
+            ts_df = rollup(base_ts, base_freq, freq, burst_from=burst_from).reset_index()
+
+        # Sketch columns, merged up from their (1min) bins
+        _add_extra_columns(ts_df, freq, acc)
         
+        since = ts_df["timestamp"].min() if len(ts_df) else None
+        if args.incremental:
+            ts_df = keep_previous_rows(ts_df, os.path.join(output_dir, f'nasa_traffic_{suffix}.csv'))
+
         # Apply outage mask
-        ts_df = apply_outage_mask(ts_df, freq)
+        ts_df = apply_outage_mask(ts_df, freq, outages)
+
+        if freq == rrd_freq:
+            if args.incremental and since is not None:
+                # the store already holds the final rows
+                written = rrd.update(ts_df[ts_df["timestamp"] >= since], freq)
+            else:
+                written = rrd.update(ts_df, freq)
+            print(f"  Round-robin store: {written:,} of {len(ts_df):,} bins written (older ones are past retention)")
+        if args.no_export:
+            continue
         
         # Save to CSV
         output_file = os.path.join(output_dir, f'nasa_traffic_{suffix}.csv')
         ts_df.to_csv(output_file, index=False)
         print(f"  Saved: {output_file}")
+        # Binary copy that every reader memory-maps (written after the CSV, so it is not re-imported)
+        store.write(f'nasa_traffic_{suffix}', ts_df, source=output_file)
         print(f"  Rows: {len(ts_df):,}")
         
         # Stats
@@ -215,7 +567,8 @@ def main():
     
     # Summary
     print("\n--- Summary ---")
-    ts_1m = pd.read_csv(os.path.join(output_dir, 'nasa_traffic_1m.csv'))
+    # read through the round-robin store (its 1min archive)
+    ts_1m = read_traffic_history(os.path.join(output_dir, 'nasa_traffic_1m.csv'))
     print(f"Date range: {ts_1m['timestamp'].min()} to {ts_1m['timestamp'].max()}")
     
     outage_rows = ts_1m[ts_1m["is_outage"] == 1]
@@ -225,6 +578,16 @@ def main():
     print(f"Total requests (non-outage): {non_outage['request_count'].sum():,.0f}")
     print(f"Total bytes (non-outage): {non_outage['total_bytes'].sum():,.0f}")
 
+    print(f"Round-robin store ({rrd.nbytes / 2**20:,.0f} MB, fixed):")
+    for freq, (first, last) in rrd.spans().items():
+        print(f"  {freq:>6}: {first} to {last}")
+
+    if args.incremental:
+        # saved once the exports are written: a failed run re-reads its lines next time
+        state.compact()
+        state.save()
+        print(f"Checkpoint: {state.bins.n_bins:,} {base_freq} bins kept (older bins are final)")
+
 
 if __name__ == '__main__':
     main()
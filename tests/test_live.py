@@ -0,0 +1,89 @@
+"""
+Live ingest: clock-skewed lines must not allocate bins for the gap, move
+the watermark or make the following on-time traffic late.
+
+Run with: python -m pytest -q
+"""
+
+import asyncio
+import time
+
+from ingest.fastparse import parse_clf_buffer
+from ingest.live import LiveIngest
+
+
+def clf_lines(epochs) -> bytes:
+    """One CLF line (UTC) per event time"""
+    return b"".join(time.strftime('h - - [%d/%b/%Y:%H:%M:%S +0000] "GET /a HTTP/1.0" 200 10\n',
+                                  time.gmtime(t)).encode() for t in epochs)
+
+
+def fold(ingest: LiveIngest, buf: bytes):
+    ingest._fold(parse_clf_buffer(buf), len(buf))
+
+
+def counted(ingest: LiveIngest) -> int:
+    return int(ingest.frame(include_open=True)["request_count"].sum())
+
+
+def test_future_line_is_dropped_and_traffic_keeps_counting():
+    now = int(time.time())
+    ingest = LiveIngest()
+    fold(ingest, clf_lines(range(now - 30, now - 20)))
+    fold(ingest, clf_lines([now + 10 * 365 * 86400]))
+    fold(ingest, clf_lines(range(now - 20, now)))
+
+    assert ingest.stats["out_of_range"] == 1
+    assert ingest.stats["late"] == 0
+    assert counted(ingest) == 30
+    assert ingest.watermark <= now
+
+
+def test_line_slightly_ahead_does_not_close_open_bins():
+    now = int(time.time())
+    ingest = LiveIngest()
+    fold(ingest, clf_lines([now + 200]))
+    fold(ingest, clf_lines(range(now - 30, now)))
+
+    assert ingest.stats["out_of_range"] == 0
+    assert ingest.stats["late"] == 0
+    assert counted(ingest) == 31
+
+
+def test_skewed_line_in_replayed_log():
+    start = 804556800  # 01/Jul/1995 00:00 UTC
+    ingest = LiveIngest()
+    fold(ingest, clf_lines(range(start, start + 60)))
+    fold(ingest, clf_lines([start + 10 * 365 * 86400]))
+    fold(ingest, clf_lines(range(start + 60, start + 120)))
+
+    assert ingest.stats["out_of_range"] == 1
+    assert ingest.stats["late"] == 0
+    assert counted(ingest) == 120
+    assert ingest.bins.n_bins == 120
+
+
+def test_skewed_line_over_tcp():
+    now = int(time.time())
+
+    async def run():
+        ingest = LiveIngest()
+        await ingest.start(host="127.0.0.1", tcp_port=0, udp_port=None)
+        port = ingest._servers[0].sockets[0].getsockname()[1]
+        _, writer = await asyncio.open_connection("127.0.0.1", port)
+        for buf in (clf_lines(range(now - 30, now - 20)), clf_lines([now + 86400]),
+                    clf_lines(range(now - 20, now))):
+            writer.write(buf)
+            await writer.drain()
+            await asyncio.sleep(0.3)
+        writer.close()
+        await writer.wait_closed()
+        await asyncio.sleep(0.3)
+        await ingest.stop()
+        return ingest
+
+    ingest = asyncio.run(run())
+    assert ingest.stats["lines"] == 31
+    assert ingest.stats["out_of_range"] == 1
+    assert ingest.stats["late"] == 0
+    assert counted(ingest) == 30
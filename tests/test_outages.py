@@ -0,0 +1,52 @@
+"""
+Outage detection: an empty stretch is flagged when traffic was expected
+there (a gap cut out of a busy afternoon), not when the seasonal level is
+low anyway (a quiet night).
+
+Run with: python -m pytest -q
+"""
+
+import numpy as np
+import pandas as pd
+
+from ingest.outages import detect_outages, outage_mask
+
+
+def diurnal_traffic(days: int = 3, seed: int = 0) -> pd.Series:
+    """1min request counts: busy days, near-silent nights (long runs of empty minutes)"""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("1995-07-01", periods=days * 1440, freq="1min", tz="-04:00")
+    hour = index.hour.to_numpy()
+    rate = np.where(hour < 6, 0.02, np.where((hour >= 8) & (hour < 20), 200.0, 30.0))
+    return pd.Series(rng.poisson(rate).astype(np.float64), index=index)
+
+
+def test_quiet_night_is_not_an_outage():
+    counts = diurnal_traffic()
+    # the nights do hold long empty runs, they are just expected
+    night = counts.between_time("00:00", "05:59")
+    assert (night == 0).mean() > 0.9
+    assert len(detect_outages(counts.index, counts.to_numpy())) == 0
+
+
+def test_gap_cut_out_of_the_afternoon_is_detected():
+    counts = diurnal_traffic()
+    start, end = pd.Timestamp("1995-07-02 14:00", tz="-04:00"), pd.Timestamp("1995-07-02 14:10", tz="-04:00")
+    # the gap's bins are missing from the series altogether
+    cut = counts[(counts.index < start) | (counts.index >= end)]
+
+    outages = detect_outages(cut.index, cut.to_numpy())
+    assert len(outages) == 1
+    row = outages.iloc[0]
+    assert row["start"] == start and row["end"] == end and row["bins"] == 10
+    assert row["expected_requests"] > 1000
+
+    mask = outage_mask(counts.index, outages)
+    assert mask.sum() == 10 and mask[(counts.index >= start) & (counts.index < end)].all()
+
+
+def test_short_gap_is_not_an_outage():
+    counts = diurnal_traffic()
+    start = pd.Timestamp("1995-07-02 14:00", tz="-04:00")
+    cut = counts[(counts.index < start) | (counts.index >= start + pd.Timedelta(minutes=3))]
+    assert len(detect_outages(cut.index, cut.to_numpy())) == 0
@@ -0,0 +1,105 @@
+"""
+Parser equivalence: the numpy engine and the byte-range split (workers > 1)
+must yield exactly the records of the single-process regex reference,
+including on malformed and edge-case lines.
+
+Run with: python -m pytest -q
+"""
+
+import pandas as pd
+import pytest
+
+import process_logs
+from ingest.backends import get_backend
+from ingest.bench import write_synthetic_log
+
+# Edge cases mixed into the generated log (one per line, no line terminator)
+EDGE_LINES = [
+    'a.example.com - - [01/Jul/1995:00:00:01 -0400] "GET /a HTTP/1.0" 200 1839',
+    'b.example.com - - [01/Jul/1995:04:00:01 +0000] "GET /b HTTP/1.0" 200 10',
+    'c.example.com - - [01/Jul/1995:09:30:01 +0530] "GET /c HTTP/1.0" 304 0',
+    'd.example.com - - [01/Jul/1995:00:00:02 -0400] "GET /d HTTP/1.0" 404 -',
+    'e.example.com - - [01/Jul/1995:00:00:02 -0400] "GET /e HTTP/1.0" 200 12x4',
+    'f.example.com - - [01/Jul/1995:00:00:03 -0400] "GET /f HTTP/1.0 extra" 200 7',
+    'g.example.com - - [01/Jul/1995:00:00:03 -0400] "" 400 -',
+    'h.example.com - - [01/Jul/1995:00:00:03 -0400] "GET" 200 5',
+    'i.example.com - - [32/Jul/1995:00:00:04 -0400] "GET /i HTTP/1.0" 200 5',
+    'j.example.com - - [01/Jul/1995:00:00:04 -0400] "GET /j HTTP/1.0" 2',
+    'k.example.com - - [01/Jul/1995:00:00:04',
+    'garbage ]]][[["" line',
+    '',
+    'l.example.com\t-\t-\t[01/Jul/1995:00:00:05 -0400] "GET /l HTTP/1.0" 200 5',
+]
+
+
+def write_edge_log(path, copies: int = 200, crlf_every: int = 3) -> None:
+    """EDGE_LINES repeated, every crlf_every-th line ending in CRLF; the last line has no newline"""
+    lines = EDGE_LINES * copies
+    with open(path, "wb") as f:
+        for i, line in enumerate(lines):
+            if i == len(lines) - 1:
+                end = ""
+            else:
+                end = "\r\n" if i % crlf_every == 0 else "\n"
+            f.write((line + end).encode())
+
+
+@pytest.fixture(params=["edge", "synthetic"])
+def log_path(request, tmp_path):
+    path = tmp_path / "access.log"
+    if request.param == "edge":
+        write_edge_log(path)
+    else:
+        write_synthetic_log(str(path), 20_000, malformed_rate=0.05, seed=1)
+    return str(path)
+
+
+def parse(path, workers: int, engine: str) -> pd.DataFrame:
+    return process_logs.parse_log_file(path, workers=workers, engine=engine)
+
+
+@pytest.mark.parametrize("engine, workers", [("numpy", 1), ("regex", 4), ("numpy", 4)])
+def test_engines_and_workers_match_regex_reference(log_path, engine, workers):
+    expected = parse(log_path, 1, "regex")
+    assert len(expected) > 0
+    pd.testing.assert_frame_equal(parse(log_path, workers, engine), expected)
+
+
+def test_backends_count_the_same_lines(log_path):
+    with open(log_path, "rb") as f:
+        data = f.read()
+    blocks = {name: get_backend(name).parse_buffer(data, fields=True) for name in ("regex", "numpy")}
+    assert blocks["numpy"]["lines"] == blocks["regex"]["lines"]
+    assert blocks["numpy"]["matched"] == blocks["regex"]["matched"]
+
+
+def test_byte_ranges_are_newline_aligned(tmp_path):
+    path = tmp_path / "access.log"
+    write_edge_log(path)
+    with open(path, "rb") as f:
+        data = f.read()
+
+    ranges = process_logs.split_byte_ranges(str(path), 16)
+    assert len(ranges) > 1
+    assert ranges[0][1] == 0 and ranges[-1][2] == len(data)
+    for (_, _, end), (_, start, _) in zip(ranges[:-1], ranges[1:]):
+        assert end == start
+        assert data[end - 1:end] == b"\n"
+    # every line is in exactly one range
+    assert sum(data[s:e].count(b"\n") for _, s, e in ranges) == data.count(b"\n")
+
+
+def test_edge_lines_parse_like_the_reference(tmp_path):
+    path = tmp_path / "access.log"
+    write_edge_log(path, copies=1)
+    df = parse(str(path), 1, "numpy")
+
+    # mixed offsets: the first three lines are the same UTC second
+    first = df[df["host"].isin(["a.example.com", "b.example.com", "c.example.com"])]
+    assert first["timestamp"].dt.tz_convert("UTC").nunique() == 1
+    # '-' and non-numeric sizes keep the record with missing bytes
+    sizes = df.set_index("host")["bytes"]
+    assert sizes[["d.example.com", "e.example.com"]].isna().all()
+    assert sizes["c.example.com"] == 0
+    # invalid date, truncated, garbage and blank lines are dropped
+    assert set(df["host"]) == {f"{c}.example.com" for c in "abcdefghl"} and len(df) == 9
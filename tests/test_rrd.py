@@ -0,0 +1,94 @@
+"""
+Round-robin store: coarse archives are consolidated from the finer ones
+exactly like a pandas resample of the data written, outage bins follow the
+first finer bin, and archives take no space until data reaches them.
+
+Run with: python -m pytest -q
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ingest.rrd import RoundRobinStore, SUMMARIES
+
+ARCHIVES = (("1s", "2h"), ("1min", "1D"), ("5min", "7D"))
+START = pd.Timestamp("1995-07-01 10:00:00-04:00")
+
+
+def traffic_1s(seconds: int = 3600, seed: int = 0) -> pd.DataFrame:
+    """Random 1s traffic with some bins without data (NaN)"""
+    rng = np.random.default_rng(seed)
+    counts = rng.poisson(20, seconds).astype(np.float64)
+    counts[rng.random(seconds) < 0.05] = np.nan
+    return pd.DataFrame({
+        "timestamp": pd.date_range(START, periods=seconds, freq="1s", unit="ns"),
+        "request_count": counts,
+        "total_bytes": counts * rng.integers(100, 5000, seconds),
+        "peak_rps": counts,
+        "is_outage": np.zeros(seconds),
+    })
+
+
+@pytest.fixture
+def store(tmp_path):
+    return RoundRobinStore.create(str(tmp_path / "rrd"), ARCHIVES)
+
+
+@pytest.mark.parametrize("freq", ["1min", "5min"])
+def test_compaction_matches_resample(store, freq):
+    df = traffic_1s()
+    store.update(df, "1s")
+
+    resampled = df.set_index("timestamp").resample(freq)
+    for metric in ("request_count", "total_bytes", "peak_rps"):
+        got = store.fetch(freq=freq, metrics=[metric]).set_index("timestamp")
+        expected = resampled[metric].agg(list(SUMMARIES))
+        expected.columns = [f"{metric}_{s}" for s in SUMMARIES]
+        pd.testing.assert_frame_equal(got, expected, check_dtype=False, check_freq=False, check_names=False)
+
+    frame = store.to_frame(freq).set_index("timestamp")
+    np.testing.assert_array_equal(frame["request_count"], resampled["request_count"].sum(min_count=1))
+    np.testing.assert_array_equal(frame["peak_rps"], resampled["peak_rps"].max())
+
+
+def test_rewriting_bins_does_not_double_count(store):
+    df = traffic_1s()
+    store.update(df, "1s")
+    store.update(df.iloc[600:1200], "1s")
+    expected = df.set_index("timestamp").resample("1min")["request_count"].sum()
+    np.testing.assert_array_equal(store.to_frame("1min")["request_count"].fillna(0), expected)
+
+
+def test_outage_follows_first_finer_bin_and_masks_metrics(store):
+    df = traffic_1s()
+    # outage from 10:10:00 to 10:14:59, and from the middle of 10:20 to the middle of 10:25
+    t = np.arange(len(df))
+    outage = ((t >= 600) & (t < 900)) | ((t >= 1230) & (t < 1530))
+    df.loc[outage, "is_outage"] = 1
+    df.loc[outage, ["request_count", "total_bytes", "peak_rps"]] = np.nan
+    store.update(df, "1s")
+
+    frame = store.to_frame("1min").set_index("timestamp")
+    first = df.set_index("timestamp").resample("1min")["is_outage"].first()
+    np.testing.assert_array_equal(frame["is_outage"], first.astype("int8"))
+    assert frame["is_outage"].sum() == 5 + 5
+    assert frame.loc[frame["is_outage"] == 1, ["request_count", "total_bytes", "peak_rps"]].isna().all().all()
+    assert frame.loc[frame["is_outage"] == 0, "request_count"].notna().all()
+
+
+def test_archives_are_allocated_on_first_write(store):
+    assert store.nbytes == 0
+    assert not any(os.path.exists(a.path) for a in store.archives)
+
+    minutes = traffic_1s().set_index("timestamp").resample("1min").sum().reset_index()
+    store.update(minutes, "1min")
+
+    fine, minute, five = store.archives
+    assert not fine.allocated and not os.path.exists(fine.path)
+    assert minute.allocated and five.allocated
+    per_slot = 8 + len(store.metrics) * len(SUMMARIES) * 8
+    assert store.nbytes == (minute.slots + five.slots) * per_slot
+    assert not store.has("1s") and store.has("5min")
@@ -0,0 +1,54 @@
+"""
+WindowIndex: prefix-sum window aggregates equal the same aggregates over
+a slice of the series, for naive (local) and tz-aware window bounds.
+
+Run with: python -m pytest -q
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ingest.windows import WindowIndex
+
+
+@pytest.fixture
+def traffic():
+    rng = np.random.default_rng(0)
+    n = 3 * 1440
+    counts = rng.poisson(50, n).astype(np.float64)
+    counts[rng.random(n) < 0.1] = np.nan
+    return pd.DataFrame({
+        "timestamp": pd.date_range("1995-07-01", periods=n, freq="1min", tz="-04:00", unit="ns"),
+        "request_count": counts,
+    })
+
+
+WINDOWS = [
+    (None, None),
+    ("1995-07-01 06:00", "1995-07-01 18:00"),
+    ("1995-07-01 23:59:30", "1995-07-02 00:00:30"),
+    (pd.Timestamp("1995-07-02 12:00", tz="UTC"), pd.Timestamp("1995-07-03 04:17:10", tz="UTC")),
+    ("1995-07-02", None),
+    (None, "1995-06-30"),
+    ("1995-07-03 10:00", "1995-07-03 09:00"),
+]
+
+
+@pytest.mark.parametrize("start, end", WINDOWS)
+def test_range_aggregates_equal_slice(traffic, start, end):
+    index = WindowIndex.from_frame(traffic)
+    ts = traffic["timestamp"]
+    tz = ts.dt.tz
+    inside = np.ones(len(traffic), dtype=bool)
+    for bound, keep in ((start, ts.__ge__), (end, ts.__lt__)):
+        if bound is not None:
+            bound = pd.Timestamp(bound)
+            inside &= keep(bound.tz_localize(tz) if bound.tz is None else bound).to_numpy()
+    values = traffic.loc[inside, "request_count"]
+
+    assert index.sum("request_count", start, end) == values.sum()
+    assert index.count("request_count", start, end) == values.count()
+    np.testing.assert_allclose(index.mean("request_count", start, end), values.mean(), equal_nan=True)
+    lo, hi = index.bounds(start, end)
+    assert hi - lo == inside.sum()